@@ -1,9 +1,22 @@
 # ----------------------------------------------------------------------------- 
 # Extracción de la tabla "By market capitalization" de Wikipedia
 # ----------------------------------------------------------------------------- 
-from bs4 import BeautifulSoup
-import requests
-import pandas as pd
+import argparse
+import sys
+from io import StringIO
+from pathlib import Path
+
+# Permite importar el paquete compartido etl_comun (ubicado en Python/ETL)
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from etl_comun.importacion import importar_diferido
+
+# Dependencias pesadas: se importan la primera vez que se usan
+bs4 = importar_diferido("bs4")
+pd = importar_diferido("pandas")
+http_cache = importar_diferido("etl_comun.http_cache")
+
+url = 'https://web.archive.org/web/20230908091635/https://en.wikipedia.org/wiki/List_of_largest_banks'
+table_attribs = ['Rank', 'Bank name', 'MC_USD_Billion']
 
 # ----------------------------------------------------------------------------- 
 # Función: extract
@@ -11,7 +24,8 @@ import pandas as pd
 def extract(url, table_attribs):
     """
     Extrae información de los bancos por capitalización de mercado desde la página web
-    de Wikipedia y la devuelve como un DataFrame de pandas.
+    de Wikipedia y la devuelve como un DataFrame de pandas. La página se obtiene
+    a través de la caché HTTP compartida (etl_comun.http_cache).
 
     Args:
         url (str): URL de la página web.
@@ -20,8 +34,8 @@ def extract(url, table_attribs):
     Returns:
         pd.DataFrame: DataFrame con Rank, Bank name y Market Cap en miles de millones de USD.
     """
-    page = requests.get(url).text
-    soup = BeautifulSoup(page, 'html.parser')
+    page = http_cache.obtener_pagina(url)
+    soup = bs4.BeautifulSoup(page, 'html.parser')
 
     # 1. Buscar el encabezado "By market capitalization"
     header = soup.find('span', {'id': 'By_market_capitalization'})
@@ -36,7 +50,7 @@ def extract(url, table_attribs):
         raise ValueError("No se encontró la tabla después del encabezado")
 
     # 3. Convertir tabla a DataFrame
-    df = pd.read_html(str(table))[0]
+    df = pd.read_html(StringIO(str(table)))[0]
 
     # 4. Limpiar la columna de Market Cap
     # Buscar columna que contenga 'Market cap' en el nombre
@@ -61,8 +75,21 @@ def extract(url, table_attribs):
 # ----------------------------------------------------------------------------- 
 # Llamada de ejemplo
 # ----------------------------------------------------------------------------- 
-url = 'https://web.archive.org/web/20230908091635/https://en.wikipedia.org/wiki/List_of_largest_banks'
-table_attribs = ['Rank', 'Bank name', 'MC_USD_Billion']
+def main(argv=None):
+    """
+    Extrae la tabla de la URL indicada (por defecto, la captura archivada) y
+    la muestra en consola.
+
+    Args:
+        argv (list | None): Argumentos (por defecto, los de sys.argv).
+    """
+    parser = argparse.ArgumentParser(description="Extrae la tabla 'By market capitalization'")
+    parser.add_argument("--url", default=url, help="Página con la lista de bancos")
+    args = parser.parse_args(argv)
+
+    df_banks = extract(args.url, table_attribs)
+    print(df_banks)
+
 
-df_banks = extract(url, table_attribs)
-print(df_banks)
+if __name__ == "__main__":
+    main()
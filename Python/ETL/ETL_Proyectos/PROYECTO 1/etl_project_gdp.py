@@ -4,32 +4,123 @@
 # Este script implementa un proceso ETL (Extracción, Transformación y Carga)
 # que obtiene datos de un sitio web con información sobre el Producto Interno
 # Bruto (PIB) nominal de distintos países, los transforma y los almacena tanto
-# en un archivo CSV como en una base de datos SQLite.
+# en un archivo CSV (y opcionalmente Parquet/Feather) como en una base de
+# datos SQLite.
 #
 # Autor: Fernando Blanco
 # Fecha: 2025-10-30
 # -----------------------------------------------------------------------------
 
 # Importación de librerías necesarias
-from bs4 import BeautifulSoup
-import requests
-import pandas as pd
-import numpy as np
-import sqlite3
-from datetime import datetime
+import argparse
+import sys
+from pathlib import Path
+
+# Permite importar el paquete compartido etl_comun (ubicado en Python/ETL)
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from etl_comun.cache_etapas import CacheEtapas
+from etl_comun.importacion import importar_diferido
+from etl_comun.metricas import Metricas
+from etl_comun.registro import obtener_registro
+from etl_comun.sqlite_pool import conexion, usar_conexion
+
+# Dependencias pesadas: se importan la primera vez que una etapa las usa, de
+# modo que importar el módulo (o ejecutar --help) no carga pandas ni requests.
+bs4 = importar_diferido("bs4")
+np = importar_diferido("numpy")
+http_cache = importar_diferido("etl_comun.http_cache")
+salidas = importar_diferido("etl_comun.salidas")
+scraping = importar_diferido("etl_comun.scraping")
+sqlite_carga = importar_diferido("etl_comun.sqlite_carga")
+sqlite_consultas = importar_diferido("etl_comun.sqlite_consultas")
+tablas_html = importar_diferido("etl_comun.tablas_html")
+
+
+# -----------------------------------------------------------------------------
+# Configuración por defecto (modificable con los argumentos de main)
+# -----------------------------------------------------------------------------
+url = 'https://web.archive.org/web/20230902185326/https://en.wikipedia.org/wiki/List_of_countries_by_GDP_%28nominal%29'
+table_attribs = ["Country", "GDP_USD_millions"]
+db_name = 'World_Economies.db'
+table_name = 'Countries_by_GDP'
+csv_path = './Countries_by_GDP.csv'
+output_formats = ['csv']     # 'csv', 'parquet' y/o 'feather' (misma ruta, otra extensión)
+log_file = './etl_project_log.txt'
+min_gdp = 100   # Umbral (miles de millones de USD) de la consulta de validación
+
+# Métricas por etapa (tiempo, CPU, memoria y filas/s); ver etl_comun.metricas
+metrics = Metricas("gdp")
+
+# Caché de la salida de extract + transform (ver etl_comun.cache_etapas)
+stage_cache = CacheEtapas()
+
+# Formato del log: "texto" (mismo formato de siempre) o "jsonl"
+log_format = "texto"
+
+
+# -----------------------------------------------------------------------------
+# Función: extraer_fila_pib
+# -----------------------------------------------------------------------------
+def extraer_fila_pib(row):
+    """
+    Obtiene el país y su PIB de una fila (<tr>) de la tabla del PIB.
+
+    Se descartan las filas sin celdas <td>, las que no tienen enlace al país
+    y aquellas cuyo PIB aparece como '—' (sin dato).
+
+    Args:
+        row (bs4.element.Tag): Fila de la tabla HTML.
+
+    Returns:
+        tuple | None: (país, PIB en millones de USD) o None si la fila se descarta.
+    """
+    col = row.find_all('td')
+    if len(col) != 0:
+        if col[0].find('a') is not None and '—' not in col[2]:
+            return col[0].a.contents[0], col[2].contents[0]
+    return None
+
+
+# -----------------------------------------------------------------------------
+# Función: extract_from_html
+# -----------------------------------------------------------------------------
+def extract_from_html(page, table_attribs):
+    """
+    Analiza el HTML de la página del PIB y devuelve la tabla de países.
+
+    Las filas se recorren una sola vez y el DataFrame se construye al final
+    (ver etl_comun.tablas_html).
+
+    Args:
+        page (str): Contenido HTML de la página.
+        table_attribs (list): Lista con los nombres de las columnas del DataFrame.
+
+    Returns:
+        pd.DataFrame: DataFrame con la información extraída (país y PIB en millones de USD).
+    """
+    data = bs4.BeautifulSoup(page, 'html.parser')
+
+    # Localiza las tablas dentro del HTML y selecciona la correspondiente al PIB
+    tables = data.find_all('tbody')
+    rows = tables[2].find_all('tr')
+
+    # Recorre las filas una sola vez y construye el DataFrame al final
+    return tablas_html.construir_dataframe(rows, table_attribs, extraer_fila_pib)
 
 
 # -----------------------------------------------------------------------------
 # Función: extract
 # -----------------------------------------------------------------------------
+@metrics.instrumentar()
 def extract(url, table_attribs):
     """
     Extrae información sobre países y su PIB desde una página web y la almacena
     en un DataFrame de pandas.
 
-    La función realiza una solicitud HTTP al sitio web, analiza el contenido HTML
-    utilizando BeautifulSoup, y filtra los datos correspondientes a los países
-    y su PIB nominal en millones de USD.
+    La función obtiene la página a través de la caché HTTP compartida
+    (etl_comun.http_cache), analiza el contenido HTML utilizando BeautifulSoup,
+    y filtra los datos correspondientes a los países y su PIB nominal en
+    millones de USD.
 
     Args:
         url (str): URL de la página web a extraer.
@@ -38,32 +129,35 @@ def extract(url, table_attribs):
     Returns:
         pd.DataFrame: DataFrame con la información extraída (país y PIB en millones de USD).
     """
-    page = requests.get(url).text
-    data = BeautifulSoup(page, 'html.parser')
-    df = pd.DataFrame(columns=table_attribs)
+    page = http_cache.obtener_pagina(url)
+    return extract_from_html(page, table_attribs)
 
-    # Localiza las tablas dentro del HTML y selecciona la correspondiente al PIB
-    tables = data.find_all('tbody')
-    rows = tables[2].find_all('tr')
 
-    # Recorre las filas y extrae los valores relevantes
-    for row in rows:
-        col = row.find_all('td')
-        if len(col) != 0:
-            if col[0].find('a') is not None and '—' not in col[2]:
-                data_dict = {
-                    "Country": col[0].a.contents[0],
-                    "GDP_USD_millions": col[2].contents[0]
-                }
-                df1 = pd.DataFrame(data_dict, index=[0])
-                df = pd.concat([df, df1], ignore_index=True)
+# -----------------------------------------------------------------------------
+# Función: extract_snapshots
+# -----------------------------------------------------------------------------
+@metrics.instrumentar()
+def extract_snapshots(urls, table_attribs, max_workers=8):
+    """
+    Extrae la tabla del PIB de varias capturas de la página (por ejemplo,
+    distintas fechas en web.archive.org) de forma concurrente.
+
+    Args:
+        urls (list): URLs de las capturas a extraer.
+        table_attribs (list): Lista con los nombres de las columnas del DataFrame.
+        max_workers (int): Número máximo de descargas simultáneas.
 
-    return df
+    Returns:
+        pd.DataFrame: DataFrame combinado con la columna adicional 'Snapshot'.
+    """
+    return scraping.extraer_snapshots(urls, lambda page: extract_from_html(page, table_attribs),
+                                      max_workers=max_workers)
 
 
 # -----------------------------------------------------------------------------
 # Función: transform
 # -----------------------------------------------------------------------------
+@metrics.instrumentar()
 def transform(df):
     """
     Transforma la columna del PIB de millones a miles de millones (billones) de USD
@@ -85,9 +179,34 @@ def transform(df):
     return df
 
 
+# -----------------------------------------------------------------------------
+# Función: extract_transform
+# -----------------------------------------------------------------------------
+@metrics.instrumentar()
+@stage_cache.cachear(dependencias=(extract, extract_from_html, extraer_fila_pib, transform, tablas_html))
+def extract_transform(url, table_attribs):
+    """
+    Ejecuta extract y transform, reutilizando el resultado de una ejecución
+    anterior si la URL, las columnas y el código de las etapas no cambiaron
+    (el DataFrame se abre mapeado en memoria desde la caché de etapas, sin
+    volver a descargar ni analizar la página).
+
+    Args:
+        url (str): URL de la página web a extraer.
+        table_attribs (list): Lista con los nombres de las columnas del DataFrame.
+
+    Returns:
+        pd.DataFrame: Datos transformados.
+    """
+    df = extract(url, table_attribs)
+    log_progress('Extracción de datos completada. Iniciando transformación.')
+    return transform(df)
+
+
 # -----------------------------------------------------------------------------
 # Función: load_to_csv
 # -----------------------------------------------------------------------------
+@metrics.instrumentar()
 def load_to_csv(df, csv_path):
     """
     Guarda el DataFrame final como un archivo CSV en la ruta especificada.
@@ -99,93 +218,228 @@ def load_to_csv(df, csv_path):
     df.to_csv(csv_path, index=False)
 
 
+# -----------------------------------------------------------------------------
+# Función: load_to_file
+# -----------------------------------------------------------------------------
+@metrics.instrumentar()
+def load_to_file(df, output_path, output_format=None, compression=None,
+                 row_group_size=None, partition_by=None):
+    """
+    Guarda el DataFrame final en CSV, Parquet o Feather (etl_comun.salidas).
+
+    Los formatos columnares ocupan menos en disco, conservan los tipos de las
+    columnas y se vuelven a leer mucho más rápido que el CSV.
+
+    Args:
+        df (pd.DataFrame): DataFrame transformado a guardar.
+        output_path (str): Archivo destino (o directorio, si se particiona).
+        output_format (str | None): 'csv', 'parquet' o 'feather'. Por
+            defecto, según la extensión de output_path.
+        compression (str | None): Códec (p. ej. 'snappy', 'zstd', 'lz4', 'gzip').
+        row_group_size (int | None): Filas por grupo (Parquet) o lote (Feather).
+        partition_by (str | None): Columna por la que particionar.
+
+    Returns:
+        list: Archivos escritos.
+    """
+    return salidas.escribir_tabla(df, output_path, output_format, particion=partition_by,
+                                  compresion=compression, tamano_grupo_filas=row_group_size)
+
+
 # -----------------------------------------------------------------------------
 # Función: load_to_db
 # -----------------------------------------------------------------------------
-def load_to_db(df, sql_connection, table_name):
+@metrics.instrumentar()
+def load_to_db(df, sql_connection, table_name, key=None, delete_missing=False):
     """
     Carga el DataFrame final a una tabla en una base de datos SQLite.
 
-    Si la tabla ya existe, será reemplazada.
+    La carga se realiza en una sola transacción con inserciones por lotes
+    (etl_comun.sqlite_carga). Sin clave, si la tabla ya existe será
+    reemplazada; con clave (p. ej. 'Country'), las filas existentes se
+    actualizan y las nuevas se insertan (upsert). Con clave, las columnas
+    nuevas del DataFrame se agregan a la tabla existente y, con
+    delete_missing, se borran las filas que ya no vienen en la fuente.
 
     Args:
         df (pd.DataFrame): DataFrame a almacenar.
-        sql_connection (sqlite3.Connection): Conexión activa a la base de datos SQLite.
+        sql_connection (sqlite3.Connection | str): Conexión activa o ruta de la
+            base de datos SQLite (en ese caso se usa el pool de etl_comun.sqlite_pool).
         table_name (str): Nombre de la tabla destino.
+        key (str | list | None): Columna(s) de la clave natural para el upsert.
+        delete_missing (bool): Con clave, borra las filas cuya clave no está
+            en df (la tabla queda igual a la fuente).
     """
-    df.to_sql(table_name, sql_connection, if_exists='replace', index=False)
+    mode = 'upsert' if key is not None else 'replace'
+    with usar_conexion(sql_connection) as conn:
+        sqlite_carga.cargar_dataframe(df, conn, table_name, modo=mode, clave=key,
+                                      eliminar_faltantes=delete_missing and key is not None)
 
 
 # -----------------------------------------------------------------------------
 # Función: run_query
 # -----------------------------------------------------------------------------
-def run_query(query_statement, sql_connection):
+@metrics.instrumentar()
+def run_query(query_statement, sql_connection, params=None, limit=None):
     """
     Ejecuta una sentencia SQL sobre la base de datos y muestra los resultados
     en la consola.
 
+    El resultado se lee del cursor por bloques (etl_comun.sqlite_consultas),
+    por lo que la memoria no depende del tamaño de la tabla: se imprimen las
+    primeras filas y el total de filas leídas.
+
     Args:
         query_statement (str): Consulta SQL a ejecutar.
-        sql_connection (sqlite3.Connection): Conexión a la base de datos SQLite.
+        sql_connection (sqlite3.Connection | str): Conexión o ruta de la base de
+            datos SQLite (en ese caso se usa el pool de etl_comun.sqlite_pool).
+        params (tuple | dict | None): Parámetros de la consulta ('?' o ':nombre').
+        limit (int | None): Número máximo de filas a leer.
+
+    Returns:
+        dict: Resumen de la consulta (filas, columnas, vista previa y
+        estadísticas de las columnas numéricas).
     """
     print(query_statement)
-    query_output = pd.read_sql(query_statement, sql_connection)
-    print(query_output)
+    with usar_conexion(sql_connection) as conn:
+        return sqlite_consultas.mostrar_consulta(conn, query_statement, params, limite=limit)
 
 
 # -----------------------------------------------------------------------------
 # Función: log_progress
 # -----------------------------------------------------------------------------
-def log_progress(message):
+def log_progress(message, **fields):
     """
     Registra en un archivo de log un mensaje con marca temporal (timestamp).
 
+    La escritura se delega al registro asíncrono de `etl_comun.registro`
+    (en formato jsonl, cada línea incluye además el tiempo transcurrido
+    desde el mensaje anterior).
+
     Args:
         message (str): Mensaje descriptivo del progreso o estado del proceso.
+        **fields: Datos adicionales del mensaje (p. ej. filas procesadas).
     """
-    timestamp_format = '%Y-%m-%d-%H:%M:%S'  # Formato: Año-Mes-Día-Hora-Minuto-Segundo
-    now = datetime.now()
-    timestamp = now.strftime(timestamp_format)
-    with open("./etl_project_log.txt", "a") as f:
-        f.write(f"{timestamp} : {message}\n")
+    obtener_registro(log_file, formato=log_format).log(message, **fields)
 
 
 # -----------------------------------------------------------------------------
-# Ejecución del Proceso ETL
+# Función: log_phase
 # -----------------------------------------------------------------------------
-# A continuación se definen los parámetros de entrada y se ejecutan las fases
-# del proceso ETL en orden: extracción, transformación, carga y consulta.
-
-url = 'https://web.archive.org/web/20230902185326/https://en.wikipedia.org/wiki/List_of_countries_by_GDP_%28nominal%29'
-table_attribs = ["Country", "GDP_USD_millions"]
-db_name = 'World_Economies.db'
-table_name = 'Countries_by_GDP'
-csv_path = './Countries_by_GDP.csv'
+def log_phase(name):
+    """
+    Registra el inicio y el fin de una fase del pipeline con su duración
+    (context manager; ver RegistroAsincrono.fase en `etl_comun.registro`).
 
-log_progress('Configuración inicial completada. Iniciando proceso ETL.')
+    Args:
+        name (str): Nombre de la fase (p. ej. "Carga a base de datos").
+    """
+    return obtener_registro(log_file, formato=log_format).fase(name)
 
-# Fase de extracción
-df = extract(url, table_attribs)
-log_progress('Extracción de datos completada. Iniciando transformación.')
 
-# Fase de transformación
-df = transform(df)
-log_progress('Transformación de datos completada. Iniciando carga.')
+# -----------------------------------------------------------------------------
+# Función: run_pipeline
+# -----------------------------------------------------------------------------
+def run_pipeline(url=url, table_attribs=table_attribs, db_name=db_name, table_name=table_name,
+                 csv_path=csv_path, min_gdp=min_gdp, output_formats=output_formats,
+                 output_options=None):
+    """
+    Ejecuta las fases del proceso ETL en orden: extracción, transformación,
+    carga (archivos y SQLite) y consulta de validación.
 
-# Fase de carga a CSV
-load_to_csv(df, csv_path)
-log_progress('Datos almacenados en archivo CSV.')
+    Args:
+        url (str): URL de la página con el PIB por país.
+        table_attribs (list): Columnas a extraer.
+        db_name (str): Base de datos SQLite destino.
+        table_name (str): Tabla destino.
+        csv_path (str): Archivo CSV destino; los demás formatos usan la misma
+            ruta con su extensión (.parquet, .feather).
+        min_gdp (float): PIB mínimo (miles de millones de USD) de la consulta
+            de validación.
+        output_formats (list): Formatos de archivo a escribir.
+        output_options (dict | None): Argumentos de load_to_file
+            (compression, row_group_size, partition_by).
 
-# Fase de carga a base de datos SQLite
-sql_connection = sqlite3.connect(db_name)
-log_progress('Conexión con base de datos SQLite establecida.')
+    Returns:
+        pd.DataFrame: Datos transformados y cargados.
+    """
+    log_progress('Configuración inicial completada. Iniciando proceso ETL.')
+
+    # Fases de extracción y transformación (o su resultado desde la caché de etapas)
+    with log_phase('Extracción y transformación'):
+        hits = stage_cache.aciertos
+        df = extract_transform(url, table_attribs)
+        if stage_cache.aciertos > hits:
+            log_progress('Datos transformados recuperados de la caché de etapas.')
+    log_progress('Transformación de datos completada. Iniciando carga.')
+
+    # Fase de carga a archivos (CSV y/o formatos columnares)
+    with log_phase('Carga a archivos'):
+        for output_format in output_formats:
+            if output_format == 'csv' and not output_options:
+                load_to_csv(df, csv_path)
+            else:
+                path = str(Path(csv_path).with_suffix(salidas.FORMATOS[output_format]))
+                load_to_file(df, path, output_format, **(output_options or {}))
+            log_progress(f'Datos almacenados en archivo {output_format.upper()}.')
+
+    # Fase de carga a base de datos SQLite (conexión prestada por el pool compartido)
+    with conexion(db_name) as sql_connection:
+        log_progress('Conexión con base de datos SQLite establecida.')
+
+        # Recarga completa: upsert por clave y borrado de las filas que ya no están en la fuente
+        with log_phase('Carga a base de datos'):
+            load_to_db(df, sql_connection, table_name, key='Country', delete_missing=True)
+        log_progress('Datos cargados en base de datos. Ejecutando consulta de validación.')
+
+        # Ejecución de una consulta de verificación. Tras un upsert el orden de las filas en la
+        # tabla no sigue el PIB: se ordena explícitamente
+        with log_phase('Consulta de validación'):
+            query_statement = (f"SELECT * FROM {table_name} WHERE GDP_USD_billions >= ? "
+                               "ORDER BY GDP_USD_billions DESC")
+            run_query(query_statement, sql_connection, params=(min_gdp,))
+        log_progress('Proceso ETL completado correctamente.')
+    return df
 
-load_to_db(df, sql_connection, table_name)
-log_progress('Datos cargados en base de datos. Ejecutando consulta de validación.')
 
-# Ejecución de una consulta de verificación
-query_statement = f"SELECT * FROM {table_name} WHERE GDP_USD_billions >= 100"
-run_query(query_statement, sql_connection)
-log_progress('Proceso ETL completado correctamente.')
+# -----------------------------------------------------------------------------
+# Función: main
+# -----------------------------------------------------------------------------
+def main(argv=None):
+    """
+    Punto de entrada de línea de comandos.
 
-sql_connection.close()
+    Args:
+        argv (list | None): Argumentos (por defecto, los de sys.argv).
+    """
+    global log_file, log_format
+    parser = argparse.ArgumentParser(description="ETL del PIB nominal por país")
+    parser.add_argument("--url", default=url, help="Página con el PIB por país")
+    parser.add_argument("--csv", default=csv_path, help="CSV destino")
+    parser.add_argument("--output-format", nargs="+", choices=("csv", "parquet", "feather"),
+                        default=output_formats, help="Formatos de archivo a escribir")
+    parser.add_argument("--compression", help="Códec de compresión (snappy, zstd, lz4, gzip, ...)")
+    parser.add_argument("--row-group-size", type=int, help="Filas por grupo (Parquet) o lote (Feather)")
+    parser.add_argument("--partition-by", help="Columna por la que particionar los archivos")
+    parser.add_argument("--db", default=db_name, help="Base de datos SQLite destino")
+    parser.add_argument("--table", default=table_name, help="Tabla destino")
+    parser.add_argument("--min-gdp", type=float, default=min_gdp,
+                        help="PIB mínimo (miles de millones de USD) de la consulta de validación")
+    parser.add_argument("--no-stage-cache", action="store_true",
+                        help="Vuelve a ejecutar extract y transform sin usar la caché de etapas")
+    parser.add_argument("--log-file", default=log_file, help="Archivo de log")
+    parser.add_argument("--log-format", choices=("texto", "jsonl"), default=log_format)
+    args = parser.parse_args(argv)
+
+    log_file, log_format = args.log_file, args.log_format
+    if args.no_stage_cache:
+        stage_cache.activa = False
+    output_options = {key: value for key, value in (("compression", args.compression),
+                                                   ("row_group_size", args.row_group_size),
+                                                   ("partition_by", args.partition_by)) if value is not None}
+    run_pipeline(url=args.url, db_name=args.db, table_name=args.table, csv_path=args.csv,
+                 min_gdp=args.min_gdp, output_formats=args.output_format, output_options=output_options)
+
+
+if __name__ == "__main__":
+    main()
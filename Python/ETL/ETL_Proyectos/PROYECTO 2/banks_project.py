@@ -4,69 +4,120 @@
 # Este script implementa un proceso ETL (Extracción, Transformación y Carga)
 # que obtiene datos de un sitio web con información sobre los bancos con mayor
 # capitalización de mercado, los transforma agregando conversiones de moneda
-# a distintas divisas, y finalmente los almacena tanto en un archivo CSV como
-# en una base de datos SQLite para su posterior consulta.
+# a distintas divisas, y finalmente los almacena tanto en un archivo CSV (y
+# opcionalmente Parquet/Feather) como en una base de datos SQLite para su
+# posterior consulta.
 #
 # Autor: Fernando Blanco
 # Fecha: 2025-11-03
 # -----------------------------------------------------------------------------
 
 # Importación de librerías necesarias
-from datetime import datetime
-import pandas as pd
-import numpy as np
-from bs4 import BeautifulSoup
-import requests
-import sqlite3
+import argparse
+import sys
+from pathlib import Path
+
+# Permite importar el paquete compartido etl_comun (ubicado en Python/ETL)
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from etl_comun.cache_etapas import CacheEtapas
+from etl_comun.importacion import importar_diferido
+from etl_comun.metricas import Metricas
+from etl_comun.registro import obtener_registro
+from etl_comun.sqlite_pool import conexion, usar_conexion
+
+# Dependencias pesadas: se importan la primera vez que una etapa las usa, de
+# modo que importar el módulo (o ejecutar --help) no carga pandas ni requests.
+pd = importar_diferido("pandas")
+np = importar_diferido("numpy")
+http_cache = importar_diferido("etl_comun.http_cache")
+salidas = importar_diferido("etl_comun.salidas")
+scraping = importar_diferido("etl_comun.scraping")
+sqlite_carga = importar_diferido("etl_comun.sqlite_carga")
+sqlite_consultas = importar_diferido("etl_comun.sqlite_consultas")
+tablas_html = importar_diferido("etl_comun.tablas_html")
+
+
+# -----------------------------------------------------------------------------
+# Configuración por defecto (modificable con los argumentos de main)
+# -----------------------------------------------------------------------------
+url = "https://web.archive.org/web/20230908091635/https://en.wikipedia.org/wiki/List_of_largest_banks"
+table_attribs = ['Bank name', 'MC_USD_Billion']
+exchange_rate_path = str(Path(__file__).with_name('exchange_rate.csv'))  # Junto al script
+output_path = './Largest_banks_data.csv'
+output_formats = ['csv']     # 'csv', 'parquet' y/o 'feather' (misma ruta, otra extensión)
+db_name = 'Banks.db'
+table_name = 'Largest_banks'
+currency_order = ['GBP', 'EUR', 'INR']   # Orden de las columnas de conversión (las demás divisas, después)
+log_file = 'code_log.txt'
+
+# Métricas por etapa (tiempo, CPU, memoria y filas/s); ver etl_comun.metricas
+metrics = Metricas("bancos")
+
+# Caché de la salida de extract + transform (ver etl_comun.cache_etapas)
+stage_cache = CacheEtapas()
+
+# Formato del log: "texto" (mismo formato de siempre) o "jsonl"
+log_format = "texto"
 
 
 # -----------------------------------------------------------------------------
 # Función: log_progress
 # -----------------------------------------------------------------------------
-def log_progress(message):
+def log_progress(message, **fields):
     """
     Registra en un archivo de log un mensaje con marca temporal (timestamp).
 
+    La escritura se delega al registro asíncrono de `etl_comun.registro`
+    (en formato jsonl, cada línea incluye además el tiempo transcurrido
+    desde el mensaje anterior).
+
     Args:
         message (str): Mensaje descriptivo del progreso o estado del proceso.
+        **fields: Datos adicionales del mensaje (p. ej. filas procesadas).
     """
-    timestamp_format = "%Y-%m-%d-%H:%M:%S"  # Formato: Año-Mes-Día-Hora-Minuto-Segundo
-    now = datetime.now()
-    timestamp = now.strftime(timestamp_format)
-    with open('code_log.txt', "a") as f:
-        f.write(f"{timestamp} : {message}\n")
+    obtener_registro(log_file, formato=log_format).log(message, **fields)
 
 
 # -----------------------------------------------------------------------------
-# Función: extract
+# Función: log_phase
 # -----------------------------------------------------------------------------
-def extract(url, table_attribs):
+def log_phase(name):
     """
-    Extrae información sobre los bancos más grandes a partir de su
-    capitalización de mercado desde una página web y la almacena en un DataFrame.
+    Registra el inicio y el fin de una fase del pipeline con su duración
+    (context manager; ver RegistroAsincrono.fase en `etl_comun.registro`).
+
+    Args:
+        name (str): Nombre de la fase (p. ej. "Carga a base de datos").
+    """
+    return obtener_registro(log_file, formato=log_format).fase(name)
 
-    La función utiliza BeautifulSoup para analizar el HTML de la página,
-    localiza la tabla correspondiente y limpia los valores de capitalización
-    de mercado, convirtiéndolos a formato numérico (float).
+
+# -----------------------------------------------------------------------------
+# Función: extract_from_html
+# -----------------------------------------------------------------------------
+def extract_from_html(page, table_attribs, backend=None):
+    """
+    Analiza el HTML de la página de bancos y devuelve la tabla de
+    capitalización de mercado.
+
+    La tabla que sigue al encabezado "By market capitalization" se localiza
+    y se convierte en DataFrame directamente (etl_comun.tablas_html), sin
+    serializarla y volver a analizarla con pd.read_html. Luego se limpian los
+    valores de capitalización de mercado, convirtiéndolos a formato numérico
+    (float).
 
     Args:
-        url (str): URL de la página web a extraer.
+        page (str): Contenido HTML de la página.
         table_attribs (list): Lista con los nombres de las columnas del DataFrame.
+        backend (str | None): Analizador HTML ('selectolax', 'lxml' o
+            'html.parser'). Por defecto, el más rápido instalado.
 
     Returns:
         pd.DataFrame: DataFrame con los nombres de los bancos y su capitalización
         de mercado en miles de millones de USD.
     """
-    page = requests.get(url).text
-    soup = BeautifulSoup(page, 'html.parser')
-
-    # Localiza el encabezado de la sección y la tabla asociada
-    header = soup.find('span', {'id': 'By_market_capitalization'})
-    h2 = header.find_parent('h2')
-    table = h2.find_next('table')
-
-    # Convierte la tabla HTML en un DataFrame
-    df = pd.read_html(str(table))[0]
+    # Localiza la tabla posterior al encabezado de la sección y la convierte en DataFrame
+    df = tablas_html.extraer_tabla_tras_ancla(page, 'By_market_capitalization', backend)
 
     # Identifica la columna de capitalización de mercado (nombre varía por formato)
     col_name = [c for c in df.columns if 'Market cap' in c or 'Market Cap' in c][0]
@@ -86,10 +137,56 @@ def extract(url, table_attribs):
     return df
 
 
+# -----------------------------------------------------------------------------
+# Función: extract
+# -----------------------------------------------------------------------------
+@metrics.instrumentar()
+def extract(url, table_attribs):
+    """
+    Extrae información sobre los bancos más grandes a partir de su
+    capitalización de mercado desde una página web y la almacena en un DataFrame.
+
+    La página se obtiene a través de la caché HTTP compartida
+    (etl_comun.http_cache) y se analiza con `extract_from_html`.
+
+    Args:
+        url (str): URL de la página web a extraer.
+        table_attribs (list): Lista con los nombres de las columnas del DataFrame.
+
+    Returns:
+        pd.DataFrame: DataFrame con los nombres de los bancos y su capitalización
+        de mercado en miles de millones de USD.
+    """
+    page = http_cache.obtener_pagina(url)
+    return extract_from_html(page, table_attribs)
+
+
+# -----------------------------------------------------------------------------
+# Función: extract_snapshots
+# -----------------------------------------------------------------------------
+@metrics.instrumentar()
+def extract_snapshots(urls, table_attribs, max_workers=8):
+    """
+    Extrae la tabla de bancos de varias capturas de la página (por ejemplo,
+    distintas fechas en web.archive.org) de forma concurrente.
+
+    Args:
+        urls (list): URLs de las capturas a extraer.
+        table_attribs (list): Lista con los nombres de las columnas del DataFrame.
+        max_workers (int): Número máximo de descargas simultáneas.
+
+    Returns:
+        pd.DataFrame: DataFrame combinado con la columna adicional 'Snapshot'.
+    """
+    return scraping.extraer_snapshots(urls, lambda page: extract_from_html(page, table_attribs),
+                                      max_workers=max_workers)
+
+
 # -----------------------------------------------------------------------------
 # Función: transform
 # -----------------------------------------------------------------------------
-def transform(df, csv_path):
+@metrics.instrumentar()
+def transform(df, csv_path, currencies=None):
     """
     Transforma los datos agregando conversiones de capitalización de mercado
     (Market Cap) a otras divisas utilizando tasas de cambio desde un archivo CSV.
@@ -98,32 +195,70 @@ def transform(df, csv_path):
     - 'Currency': Nombre de la divisa.
     - 'Rate': Tasa de conversión respecto al dólar (USD).
 
-    Se añaden tres columnas al DataFrame:
-    - MC_GBP_Billion
-    - MC_EUR_Billion
-    - MC_INR_Billion
+    Se añade una columna MC_<DIVISA>_Billion por cada divisa del archivo:
+    primero MC_GBP_Billion, MC_EUR_Billion y MC_INR_Billion, en ese orden
+    (el de siempre, ver currency_order), y luego las demás divisas en el
+    orden en que aparecen en el archivo. Todas las conversiones se calculan
+    en una sola operación vectorizada de NumPy (columna USD × vector de
+    tasas) y se agregan juntas.
 
     Args:
         df (pd.DataFrame): DataFrame con la información original.
         csv_path (str): Ruta al archivo CSV con las tasas de cambio.
+        currencies (list | None): Divisas a calcular, en el orden de las
+            columnas. Si es None, se usan todas las del archivo.
 
     Returns:
         pd.DataFrame: DataFrame con las columnas de conversión agregadas.
     """
-    dataframe = pd.read_csv(csv_path)
-    dict_rates = dataframe.set_index('Currency').to_dict()['Rate']
+    rates = pd.read_csv(csv_path)
+    if currencies is None:
+        available = list(rates['Currency'])
+        currencies = ([c for c in currency_order if c in available]
+                      + [c for c in available if c not in currency_order])
+    rates = rates.set_index('Currency').loc[list(currencies)].reset_index()
 
-    # Cálculo de conversiones y redondeo a dos decimales
-    df['MC_GBP_Billion'] = [np.round(x * dict_rates['GBP'], 2) for x in df['MC_USD_Billion']]
-    df['MC_EUR_Billion'] = [np.round(x * dict_rates['EUR'], 2) for x in df['MC_USD_Billion']]
-    df['MC_INR_Billion'] = [np.round(x * dict_rates['INR'], 2) for x in df['MC_USD_Billion']]
+    # Matriz (bancos × divisas) con las conversiones redondeadas a dos decimales
+    usd = df['MC_USD_Billion'].to_numpy(dtype=float)
+    converted = np.round(usd[:, None] * rates['Rate'].to_numpy(dtype=float)[None, :], 2)
 
-    return df
+    columns = [f"MC_{currency}_Billion" for currency in rates['Currency']]
+    df = df.drop(columns=columns, errors='ignore')
+    return pd.concat([df, pd.DataFrame(converted, columns=columns, index=df.index)], axis=1)
+
+
+# -----------------------------------------------------------------------------
+# Función: extract_transform
+# -----------------------------------------------------------------------------
+@metrics.instrumentar()
+@stage_cache.cachear(dependencias=(extract, extract_from_html, transform, tablas_html),
+                     configuracion=lambda: {"currency_order": currency_order})
+def extract_transform(url, table_attribs, exchange_rate_path):
+    """
+    Ejecuta extract y transform, reutilizando el resultado de una ejecución
+    anterior si la URL, las columnas, el archivo de tasas, el orden de las
+    divisas (currency_order) y el código de las etapas no cambiaron (el
+    DataFrame se abre mapeado en memoria desde la caché de etapas, sin
+    volver a descargar ni analizar la página; sus columnas numéricas son de
+    solo lectura).
+
+    Args:
+        url (str): URL de la página web a extraer.
+        table_attribs (list): Lista con los nombres de las columnas del DataFrame.
+        exchange_rate_path (str): Archivo CSV con las tasas de cambio.
+
+    Returns:
+        pd.DataFrame: Datos transformados.
+    """
+    df = extract(url, table_attribs)
+    log_progress('Extracción de datos completada. Iniciando transformación.')
+    return transform(df, exchange_rate_path)
 
 
 # -----------------------------------------------------------------------------
 # Función: load_to_csv
 # -----------------------------------------------------------------------------
+@metrics.instrumentar()
 def load_to_csv(df, output_path):
     """
     Guarda el DataFrame final como un archivo CSV en la ruta especificada.
@@ -135,86 +270,206 @@ def load_to_csv(df, output_path):
     df.to_csv(output_path, index=False)
 
 
+# -----------------------------------------------------------------------------
+# Función: load_to_file
+# -----------------------------------------------------------------------------
+@metrics.instrumentar()
+def load_to_file(df, output_path, output_format=None, compression=None,
+                 row_group_size=None, partition_by=None):
+    """
+    Guarda el DataFrame final en CSV, Parquet o Feather (etl_comun.salidas).
+
+    Los formatos columnares ocupan menos en disco y se vuelven a leer mucho
+    más rápido que el CSV, conservando los tipos de las columnas. Con
+    `partition_by` (p. ej. 'Snapshot' tras extract_snapshots) se escribe un
+    directorio con un subdirectorio <columna>=<valor> por valor.
+
+    Args:
+        df (pd.DataFrame): DataFrame transformado a guardar.
+        output_path (str): Archivo destino (o directorio, si se particiona).
+        output_format (str | None): 'csv', 'parquet' o 'feather'. Por
+            defecto, según la extensión de output_path.
+        compression (str | None): Códec (p. ej. 'snappy', 'zstd', 'lz4', 'gzip').
+        row_group_size (int | None): Filas por grupo (Parquet) o lote (Feather).
+        partition_by (str | None): Columna por la que particionar.
+
+    Returns:
+        list: Archivos escritos.
+    """
+    return salidas.escribir_tabla(df, output_path, output_format, particion=partition_by,
+                                  compresion=compression, tamano_grupo_filas=row_group_size)
+
+
 # -----------------------------------------------------------------------------
 # Función: load_to_db
 # -----------------------------------------------------------------------------
-def load_to_db(df, sql_connection, table_name):
+@metrics.instrumentar()
+def load_to_db(df, sql_connection, table_name, key=None, delete_missing=False):
     """
-    Carga el DataFrame final en una tabla dentro de una base de datos SQLite.
+    Carga el DataFrame final a una tabla en una base de datos SQLite.
 
-    Si la tabla ya existe, será reemplazada.
+    La carga se realiza en una sola transacción con inserciones por lotes
+    (etl_comun.sqlite_carga). Sin clave, si la tabla ya existe será
+    reemplazada; con clave (p. ej. 'Bank name'), las filas existentes se
+    actualizan y las nuevas se insertan (upsert). Con clave, las columnas
+    nuevas del DataFrame se agregan a la tabla existente y, con
+    delete_missing, se borran las filas que ya no vienen en la fuente.
 
     Args:
         df (pd.DataFrame): DataFrame a almacenar.
-        sql_connection (sqlite3.Connection): Conexión activa a la base de datos SQLite.
+        sql_connection (sqlite3.Connection | str): Conexión activa o ruta de la
+            base de datos SQLite (en ese caso se usa el pool de etl_comun.sqlite_pool).
         table_name (str): Nombre de la tabla destino.
+        key (str | list | None): Columna(s) de la clave natural para el upsert.
+        delete_missing (bool): Con clave, borra las filas cuya clave no está
+            en df (la tabla queda igual a la fuente).
     """
-    df.to_sql(table_name, sql_connection, if_exists='replace', index=False)
+    mode = 'upsert' if key is not None else 'replace'
+    with usar_conexion(sql_connection) as conn:
+        sqlite_carga.cargar_dataframe(df, conn, table_name, modo=mode, clave=key,
+                                      eliminar_faltantes=delete_missing and key is not None)
 
 
 # -----------------------------------------------------------------------------
 # Función: run_query
 # -----------------------------------------------------------------------------
-def run_query(query_statement, sql_connection):
+@metrics.instrumentar()
+def run_query(query_statement, sql_connection, params=None, limit=None):
     """
     Ejecuta una sentencia SQL sobre la base de datos y muestra los resultados
     en la consola.
 
+    El resultado se lee del cursor por bloques (etl_comun.sqlite_consultas),
+    por lo que la memoria no depende del tamaño de la tabla: se imprimen las
+    primeras filas y el total de filas leídas.
+
     Args:
         query_statement (str): Consulta SQL a ejecutar.
-        sql_connection (sqlite3.Connection): Conexión a la base de datos SQLite.
+        sql_connection (sqlite3.Connection | str): Conexión o ruta de la base de
+            datos SQLite (en ese caso se usa el pool de etl_comun.sqlite_pool).
+        params (tuple | dict | None): Parámetros de la consulta ('?' o ':nombre').
+        limit (int | None): Número máximo de filas a leer.
+
+    Returns:
+        dict: Resumen de la consulta (filas, columnas, vista previa y
+        estadísticas de las columnas numéricas).
     """
     print("\n" + query_statement)
-    query_output = pd.read_sql(query_statement, sql_connection)
-    print(query_output)
+    with usar_conexion(sql_connection) as conn:
+        return sqlite_consultas.mostrar_consulta(conn, query_statement, params, limite=limit)
 
 
 # -----------------------------------------------------------------------------
-# Ejecución del Proceso ETL
+# Función: run_pipeline
 # -----------------------------------------------------------------------------
-# A continuación se definen los parámetros de entrada y se ejecutan las fases
-# del proceso ETL en orden: extracción, transformación, carga y consulta.
-
-url = "https://web.archive.org/web/20230908091635/https://en.wikipedia.org/wiki/List_of_largest_banks"
-table_attribs = ['Bank name', 'MC_USD_Billion']
-csv_path = 'exchange_rate.csv'
-output_path = './Largest_banks_data.csv'
-db_name = 'Banks.db'
-table_name = 'Largest_banks'
-
-log_progress('Configuración inicial completada. Iniciando proceso ETL.')
-
-# Fase de extracción
-df = extract(url, table_attribs)
-log_progress('Extracción de datos completada. Iniciando transformación.')
-
-# Fase de transformación
-df = transform(df, csv_path)
-log_progress('Transformación de datos completada. Iniciando carga.')
-
-# Fase de carga a CSV
-load_to_csv(df, output_path)
-log_progress('Datos almacenados en archivo CSV.')
-
-# Fase de carga a base de datos SQLite
-sql_connection = sqlite3.connect(db_name)
-log_progress('Conexión con base de datos SQLite establecida.')
-
-load_to_db(df, sql_connection, table_name)
-log_progress('Datos cargados en base de datos. Ejecutando consultas de validación.')
+def run_pipeline(url=url, table_attribs=table_attribs, exchange_rate_path=exchange_rate_path,
+                 output_path=output_path, db_name=db_name, table_name=table_name,
+                 output_formats=output_formats, output_options=None):
+    """
+    Ejecuta las fases del proceso ETL en orden: extracción, transformación,
+    carga (archivos y SQLite) y consultas de validación.
 
-# Ejecución de consultas de verificación
-query_statement = f"SELECT * FROM {table_name}"
-run_query(query_statement, sql_connection)
+    Args:
+        url (str): URL de la página con la lista de bancos.
+        table_attribs (list): Columnas a extraer.
+        exchange_rate_path (str): Archivo CSV con las tasas de cambio.
+        output_path (str): Archivo CSV destino; los demás formatos usan la
+            misma ruta con su extensión (.parquet, .feather).
+        db_name (str): Base de datos SQLite destino.
+        table_name (str): Tabla destino.
+        output_formats (list): Formatos de archivo a escribir.
+        output_options (dict | None): Argumentos de load_to_file
+            (compression, row_group_size, partition_by).
 
-query_statement = f"SELECT AVG(MC_GBP_Billion) FROM {table_name}"
-run_query(query_statement, sql_connection)
+    Returns:
+        pd.DataFrame: Datos transformados y cargados.
+    """
+    log_progress('Configuración inicial completada. Iniciando proceso ETL.')
+
+    # Fases de extracción y transformación (o su resultado desde la caché de etapas)
+    with log_phase('Extracción y transformación'):
+        hits = stage_cache.aciertos
+        df = extract_transform(url, table_attribs, exchange_rate_path)
+        if stage_cache.aciertos > hits:
+            log_progress('Datos transformados recuperados de la caché de etapas.')
+    log_progress('Transformación de datos completada. Iniciando carga.')
+
+    # Fase de carga a archivos (CSV y/o formatos columnares)
+    with log_phase('Carga a archivos'):
+        for output_format in output_formats:
+            if output_format == 'csv' and not output_options:
+                load_to_csv(df, output_path)
+            else:
+                path = str(Path(output_path).with_suffix(salidas.FORMATOS[output_format]))
+                load_to_file(df, path, output_format, **(output_options or {}))
+            log_progress(f'Datos almacenados en archivo {output_format.upper()}.')
+
+    # Fase de carga a base de datos SQLite (conexión prestada por el pool compartido)
+    with conexion(db_name) as sql_connection:
+        log_progress('Conexión con base de datos SQLite establecida.')
+
+        # Recarga completa: upsert por clave y borrado de las filas que ya no están en la fuente
+        with log_phase('Carga a base de datos'):
+            load_to_db(df, sql_connection, table_name, key='Bank name', delete_missing=True)
+        log_progress('Datos cargados en base de datos. Ejecutando consultas de validación.')
+
+        # Ejecución de consultas de verificación. Tras un upsert el orden de las filas en la
+        # tabla (y el del índice de la clave) no sigue la capitalización: se ordena explícitamente
+        with log_phase('Consultas de validación'):
+            query_statement = f"SELECT * FROM {table_name} ORDER BY MC_USD_Billion DESC"
+            run_query(query_statement, sql_connection)
+
+            query_statement = f"SELECT AVG(MC_GBP_Billion) FROM {table_name}"
+            run_query(query_statement, sql_connection)
+
+            query_statement = f"SELECT [Bank Name] FROM {table_name} ORDER BY MC_USD_Billion DESC LIMIT 5"
+            run_query(query_statement, sql_connection)
+
+        log_progress('Proceso ETL completado correctamente.')
+
+    # La conexión vuelve al pool y se cierra al terminar el proceso
+    log_progress('Conexión con la base de datos devuelta al pool.')
+    return df
 
-query_statement = f"SELECT [Bank Name] FROM {table_name} LIMIT 5"
-run_query(query_statement, sql_connection)
 
-log_progress('Proceso ETL completado correctamente.')
+# -----------------------------------------------------------------------------
+# Función: main
+# -----------------------------------------------------------------------------
+def main(argv=None):
+    """
+    Punto de entrada de línea de comandos.
 
-# Cierre de la conexión con la base de datos
-sql_connection.close()
-log_progress('Conexión con la base de datos cerrada correctamente.')
+    Args:
+        argv (list | None): Argumentos (por defecto, los de sys.argv).
+    """
+    global log_file, log_format
+    parser = argparse.ArgumentParser(description="ETL de los bancos más grandes por capitalización de mercado")
+    parser.add_argument("--url", default=url, help="Página con la lista de bancos")
+    parser.add_argument("--exchange-rates", default=exchange_rate_path, help="CSV con las tasas de cambio")
+    parser.add_argument("--output", default=output_path, help="CSV destino")
+    parser.add_argument("--output-format", nargs="+", choices=("csv", "parquet", "feather"),
+                        default=output_formats, help="Formatos de archivo a escribir")
+    parser.add_argument("--compression", help="Códec de compresión (snappy, zstd, lz4, gzip, ...)")
+    parser.add_argument("--row-group-size", type=int, help="Filas por grupo (Parquet) o lote (Feather)")
+    parser.add_argument("--partition-by", help="Columna por la que particionar los archivos")
+    parser.add_argument("--db", default=db_name, help="Base de datos SQLite destino")
+    parser.add_argument("--table", default=table_name, help="Tabla destino")
+    parser.add_argument("--no-stage-cache", action="store_true",
+                        help="Vuelve a ejecutar extract y transform sin usar la caché de etapas")
+    parser.add_argument("--log-file", default=log_file, help="Archivo de log")
+    parser.add_argument("--log-format", choices=("texto", "jsonl"), default=log_format)
+    args = parser.parse_args(argv)
+
+    log_file, log_format = args.log_file, args.log_format
+    if args.no_stage_cache:
+        stage_cache.activa = False
+    output_options = {key: value for key, value in (("compression", args.compression),
+                                                   ("row_group_size", args.row_group_size),
+                                                   ("partition_by", args.partition_by)) if value is not None}
+    run_pipeline(url=args.url, exchange_rate_path=args.exchange_rates, output_path=args.output,
+                 db_name=args.db, table_name=args.table, output_formats=args.output_format,
+                 output_options=output_options)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,83 +4,147 @@ Autor: Fernando Blanco
 Descripción:
     Este script implementa un proceso ETL (Extract, Transform, Load) simple
     utilizando SQLite y Pandas. Su objetivo es cargar datos desde un archivo CSV
-    hacia una tabla en una base de datos SQLite, realizar consultas básicas 
+    hacia una tabla en una base de datos SQLite, realizar consultas básicas
     y demostrar cómo insertar nuevos registros programáticamente.
+
+    La carga usa el motor de etl_comun.sqlite_carga (transacción única,
+    inserciones por lotes y upsert sobre la columna ID).
+
+    Cada sección es una función reutilizable; `main()` las ejecuta en orden
+    (python db_code.py --help para ver las rutas configurables).
 """
 
-import sqlite3
-import pandas as pd
+import argparse
+import sys
+from pathlib import Path
+
+# Permite importar el paquete compartido etl_comun (ubicado en Python/ETL)
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from etl_comun.importacion import importar_diferido
+from etl_comun.sqlite_pool import obtener_pool
+
+# pandas y los módulos de carga/consulta se importan al usarse por primera vez
+pd = importar_diferido("pandas")
+sqlite_carga = importar_diferido("etl_comun.sqlite_carga")
+sqlite_consultas = importar_diferido("etl_comun.sqlite_consultas")
 
 # -----------------------------------------------------------------------------
 # 1. CONEXIÓN A LA BASE DE DATOS SQLITE
 # -----------------------------------------------------------------------------
 # Si la base de datos 'STAFF.db' no existe, SQLite la crea automáticamente.
-conn = sqlite3.connect('STAFF.db')
+# Las conexiones se toman de un pool compartido: cada sección pide prestada una
+# conexión con `with pool.conexion() as conn:` y la devuelve al terminar, de
+# modo que se reutiliza la misma conexión (y sus sentencias preparadas).
+db_name = 'STAFF.db'
 
 # -----------------------------------------------------------------------------
 # 2. DEFINICIÓN DE VARIABLES Y ESTRUCTURA DE LA TABLA
 # -----------------------------------------------------------------------------
 table_name = 'INSTRUCTOR'
 attribute_list = ['ID', 'FNAME', 'LNAME', 'CITY', 'CCODE']
+file_path = str(Path(__file__).with_name("INSTRUCTOR.csv"))   # Junto al script
+
 
 # -----------------------------------------------------------------------------
 # 3. EXTRACCIÓN DE DATOS DESDE CSV
 # -----------------------------------------------------------------------------
+def extract(file_path=file_path):
+    """
+    Carga los datos del CSV en un DataFrame.
+    'names' asigna los encabezados de columna definidos manualmente.
+    """
+    return pd.read_csv(file_path, names=attribute_list)
 
-file_path = "INSTRUCTOR.csv"
-
-# Cargamos los datos del CSV en un DataFrame.
-# 'names' asigna los encabezados de columna definidos manualmente.
-df = pd.read_csv(file_path, names=attribute_list)
 
 # -----------------------------------------------------------------------------
 # 4. CARGA DE DATOS A SQLITE (ETL - LOAD)
 # -----------------------------------------------------------------------------
-# Si la tabla ya existe, será reemplazada completamente.
-df.to_sql(table_name, conn, if_exists='replace', index=False)
-print('Tabla creada o reemplazada exitosamente.')
+def load(df, pool, table_name=table_name):
+    """
+    Si la tabla ya existe, será reemplazada completamente. La clave 'ID' crea
+    un índice único que permite luego insertar o actualizar registros (upsert).
+    """
+    with pool.conexion() as conn:
+        sqlite_carga.cargar_dataframe(df, conn, table_name, modo='replace', clave='ID')
+    print('Tabla creada o reemplazada exitosamente.')
+
 
 # -----------------------------------------------------------------------------
-# 5. CONSULTAS SQL BÁSICAS DESDE PANDAS
+# 5. CONSULTAS SQL BÁSICAS
 # -----------------------------------------------------------------------------
+def run_queries(pool, table_name=table_name):
+    """
+    Los resultados se leen por bloques desde el cursor (sin cargar la tabla
+    completa en memoria) y se muestran las primeras filas.
+    """
+    with pool.conexion() as conn:
+        # a) Consultar todos los registros
+        query_statement = f"SELECT * FROM {table_name}"
+        print("\nConsulta completa:\n", query_statement)
+        sqlite_consultas.mostrar_consulta(conn, query_statement)
 
-# a) Consultar todos los registros
-query_statement = f"SELECT * FROM {table_name}"
-query_output = pd.read_sql(query_statement, conn)
-print("\nConsulta completa:\n", query_statement)
-print(query_output)
+        # b) Consultar solo la columna FNAME
+        query_statement = f"SELECT FNAME FROM {table_name}"
+        print("\nConsulta de una columna:\n", query_statement)
+        sqlite_consultas.mostrar_consulta(conn, query_statement)
 
-# b) Consultar solo la columna FNAME
-query_statement = f"SELECT FNAME FROM {table_name}"
-query_output = pd.read_sql(query_statement, conn)
-print("\nConsulta de una columna:\n", query_statement)
-print(query_output)
+        # c) Contar el número total de registros
+        query_statement = f"SELECT COUNT(*) AS total_registros FROM {table_name}"
+        print("\nConteo de registros:\n", query_statement)
+        sqlite_consultas.mostrar_consulta(conn, query_statement)
 
-# c) Contar el número total de registros
-query_statement = f"SELECT COUNT(*) AS total_registros FROM {table_name}"
-query_output = pd.read_sql(query_statement, conn)
-print("\nConteo de registros:\n", query_statement)
-print(query_output)
 
 # -----------------------------------------------------------------------------
 # 6. INSERCIÓN DE NUEVOS DATOS PROGRAMÁTICAMENTE
 # -----------------------------------------------------------------------------
-# Se crea un nuevo DataFrame con el registro a insertar.
-data_dict = {
-    'ID': [100],
-    'FNAME': ['John'],
-    'LNAME': ['Doe'],
-    'CITY': ['Paris'],
-    'CCODE': ['FR']
-}
-data_append = pd.DataFrame(data_dict)
-
-# Agregamos el nuevo registro sin reemplazar la tabla.
-data_append.to_sql(table_name, conn, if_exists='append', index=False)
-print('\nNuevo registro agregado exitosamente.')
+def insert_record(pool, table_name=table_name):
+    """
+    Se crea un nuevo DataFrame con el registro a insertar y se agrega sin
+    reemplazar la tabla. Con upsert sobre 'ID', ejecutar el script varias
+    veces no duplica el registro.
+    """
+    data_dict = {
+        'ID': [100],
+        'FNAME': ['John'],
+        'LNAME': ['Doe'],
+        'CITY': ['Paris'],
+        'CCODE': ['FR']
+    }
+    data_append = pd.DataFrame(data_dict)
+
+    with pool.conexion() as conn:
+        sqlite_carga.cargar_dataframe(data_append, conn, table_name, modo='upsert', clave='ID')
+    print('\nNuevo registro agregado exitosamente.')
+
 
 # -----------------------------------------------------------------------------
-# 7. CIERRE DE CONEXIÓN
+# EJECUCIÓN
 # -----------------------------------------------------------------------------
-conn.close()
-print('Conexión a la base de datos cerrada correctamente.')
+def main(argv=None):
+    """
+    Ejecuta las secciones 3 a 7 en orden.
+
+    Args:
+        argv (list | None): Argumentos (por defecto, los de sys.argv).
+    """
+    parser = argparse.ArgumentParser(description="Carga INSTRUCTOR.csv en SQLite y lo consulta")
+    parser.add_argument("--csv", default=file_path, help="CSV de origen (sin encabezado)")
+    parser.add_argument("--db", default=db_name, help="Base de datos SQLite")
+    parser.add_argument("--table", default=table_name, help="Tabla destino")
+    args = parser.parse_args(argv)
+
+    pool = obtener_pool(args.db)
+    df = extract(args.csv)
+    load(df, pool, args.table)
+    run_queries(pool, args.table)
+    insert_record(pool, args.table)
+
+    # -------------------------------------------------------------------------
+    # 7. CIERRE DE CONEXIÓN
+    # -------------------------------------------------------------------------
+    pool.cerrar()
+    print('Conexión a la base de datos cerrada correctamente.')
+
+
+if __name__ == "__main__":
+    main()
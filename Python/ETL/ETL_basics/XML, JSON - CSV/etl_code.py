@@ -4,7 +4,7 @@ ETL Pipeline Script
 
 Este script implementa un proceso ETL (Extract, Transform, Load) completo,
 capaz de integrar datos desde archivos CSV, JSON y XML en un único archivo 
-transformado en formato CSV. 
+transformado en formato CSV, Parquet o Feather (según la extensión del destino). 
 
 El proceso incluye:
     1. Extracción de datos desde múltiples formatos.
@@ -17,34 +17,79 @@ Fecha: 2025-10-30
 Versión: 1.0
 """
 
+from __future__ import annotations   # Las anotaciones pd.DataFrame no importan pandas
+
+import argparse
 import glob
-import pandas as pd
+import hashlib
+import importlib.util
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Iterator, List, Optional
+
 import xml.etree.ElementTree as ET
-from datetime import datetime
+from pathlib import Path
+
+# Permite importar el paquete compartido etl_comun (ubicado en Python/ETL)
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from etl_comun.importacion import importar_diferido
+from etl_comun.metricas import Metricas
+from etl_comun.registro import obtener_registro
+
+# pandas y numpy se importan la primera vez que una etapa los usa
+np = importar_diferido("numpy")
+pd = importar_diferido("pandas")
+salidas = importar_diferido("etl_comun.salidas")
 
 # ---------------------------------------------------------------------------
 # Configuración Global
 # ---------------------------------------------------------------------------
 
 log_file = "log_file.txt"             # Archivo donde se registran logs del proceso
-target_file = "transformed_data.csv"  # Archivo destino con los datos procesados
+log_format = "texto"                  # Formato del log: "texto" o "jsonl"
+target_file = "transformed_data.csv"  # Archivo destino (.csv, .parquet o .feather)
+output_options = {}                   # Opciones de la salida: compresion, tamano_grupo_filas
+read_chunk_size = 50_000              # Registros por bloque en la lectura en streaming
+extract_workers = None                # Procesos de extracción (None = número de CPUs, 1 = secuencial)
+manifest_suffix = ".manifest.json"    # Sufijo del manifiesto de archivos procesados (junto al destino)
+metrics = Metricas("etl_code")        # Métricas por etapa (ver etl_comun.metricas)
+
+# Esquema declarado de los archivos fuente: evita la inferencia de tipos al leer
+schema = {"name": str, "height": float, "weight": float}
+
+# pyarrow es opcional: si está instalado se usa como motor de lectura
+has_pyarrow = importlib.util.find_spec("pyarrow") is not None
 
 
 # ---------------------------------------------------------------------------
 # Funciones de Extracción
 # ---------------------------------------------------------------------------
 
+def _arrow_schema():
+    """Devuelve el esquema declarado (`schema`) como tipos de pyarrow."""
+    import pyarrow as pa
+
+    types = {str: pa.string(), float: pa.float64(), int: pa.int64()}
+    return pa.schema([(column, types[dtype]) for column, dtype in schema.items()])
+
+
 def extract_from_csv(file_to_process: str) -> pd.DataFrame:
     """
     Extrae datos desde un archivo CSV y los carga en un DataFrame.
 
+    Las columnas se leen con los tipos declarados en `schema` (sin
+    inferencia) y con el motor multihilo de pyarrow cuando está instalado.
+
     Args:
         file_to_process (str): Ruta del archivo CSV a procesar.
 
     Returns:
         pd.DataFrame: DataFrame con los datos extraídos.
     """
-    dataframe = pd.read_csv(file_to_process)
+    engine = "pyarrow" if has_pyarrow else "c"
+    dataframe = pd.read_csv(file_to_process, dtype=schema, engine=engine)
     return dataframe
 
 
@@ -52,16 +97,107 @@ def extract_from_json(file_to_process: str) -> pd.DataFrame:
     """
     Extrae datos desde un archivo JSON (líneas múltiples) y los carga en un DataFrame.
 
+    Con pyarrow instalado, el archivo se analiza directamente con el esquema
+    declarado; si no, se usa pandas con los tipos de `schema`.
+
     Args:
         file_to_process (str): Ruta del archivo JSON a procesar.
 
     Returns:
         pd.DataFrame: DataFrame con los datos extraídos.
     """
-    dataframe = pd.read_json(file_to_process, lines=True)
+    if has_pyarrow:
+        import pyarrow.json as pa_json
+
+        parse_options = pa_json.ParseOptions(explicit_schema=_arrow_schema())
+        return pa_json.read_json(file_to_process, parse_options=parse_options).to_pandas()
+    dataframe = pd.read_json(file_to_process, lines=True, dtype=schema)
     return dataframe
 
 
+def iter_csv_chunks(file_to_process: str, chunk_size: int = read_chunk_size) -> Iterator[pd.DataFrame]:
+    """
+    Lee un archivo CSV por bloques con los tipos declarados en `schema`.
+
+    Con pyarrow se usa su lector en streaming (bloques por tamaño en bytes,
+    aproximado a `chunk_size` registros); sin pyarrow, `pd.read_csv` con
+    `chunksize`.
+
+    Args:
+        file_to_process (str): Ruta del archivo CSV a procesar.
+        chunk_size (int): Número aproximado de registros por bloque.
+
+    Yields:
+        pd.DataFrame: Bloques con las columnas del esquema.
+    """
+    if has_pyarrow:
+        import pyarrow.csv as pa_csv
+
+        arrow_schema = _arrow_schema()
+        reader = pa_csv.open_csv(
+            file_to_process,
+            read_options=pa_csv.ReadOptions(block_size=max(chunk_size * 32, 1 << 16)),
+            convert_options=pa_csv.ConvertOptions(
+                column_types={field.name: field.type for field in arrow_schema}
+            ),
+        )
+        for batch in reader:
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(file_to_process, dtype=schema, chunksize=chunk_size)
+
+
+def iter_json_chunks(file_to_process: str, chunk_size: int = read_chunk_size) -> Iterator[pd.DataFrame]:
+    """
+    Lee un archivo JSON (líneas múltiples) por bloques de `chunk_size`
+    registros con los tipos declarados en `schema`.
+
+    Args:
+        file_to_process (str): Ruta del archivo JSON a procesar.
+        chunk_size (int): Número máximo de registros por bloque.
+
+    Yields:
+        pd.DataFrame: Bloques con las columnas del esquema.
+    """
+    with pd.read_json(file_to_process, lines=True, dtype=schema, chunksize=chunk_size) as reader:
+        yield from reader
+
+
+def iter_xml_chunks(file_to_process: str, chunk_size: int = read_chunk_size) -> Iterator[pd.DataFrame]:
+    """
+    Lee un archivo XML en streaming (ET.iterparse) y entrega los registros
+    <person> en bloques de tamaño fijo.
+
+    Cada elemento se libera de memoria en cuanto se procesa, por lo que el
+    consumo de memoria depende de `chunk_size` y no del tamaño del archivo.
+
+    Args:
+        file_to_process (str): Ruta del archivo XML a procesar.
+        chunk_size (int): Número máximo de registros por bloque.
+
+    Yields:
+        pd.DataFrame: Bloques con las columnas name, height y weight.
+    """
+    names, heights, weights = [], [], []
+    context = ET.iterparse(file_to_process, events=("start", "end"))
+    _, root = next(context)  # Elemento raíz: se vacía tras cada <person>
+
+    for event, elem in context:
+        if event != "end" or elem.tag != "person":
+            continue
+        names.append(elem.findtext("name"))
+        heights.append(float(elem.findtext("height")))
+        weights.append(float(elem.findtext("weight")))
+        root.clear()
+
+        if len(names) >= chunk_size:
+            yield pd.DataFrame({"name": names, "height": heights, "weight": weights})
+            names, heights, weights = [], [], []
+
+    if names:
+        yield pd.DataFrame({"name": names, "height": heights, "weight": weights})
+
+
 def extract_from_xml(file_to_process: str) -> pd.DataFrame:
     """
     Extrae datos desde un archivo XML y los carga en un DataFrame.
@@ -72,61 +208,120 @@ def extract_from_xml(file_to_process: str) -> pd.DataFrame:
     Returns:
         pd.DataFrame: DataFrame con los datos extraídos del XML.
     """
-    dataframe = pd.DataFrame(columns=["name", "height", "weight"])
-    tree = ET.parse(file_to_process)
-    root = tree.getroot()
-
-    for person in root:
-        name = person.find("name").text
-        height = float(person.find("height").text)
-        weight = float(person.find("weight").text)
-        dataframe = pd.concat(
-            [dataframe, pd.DataFrame([{"name": name, "height": height, "weight": weight}])],
-            ignore_index=True
-        )
+    chunks = list(iter_xml_chunks(file_to_process))
+    if not chunks:
+        return pd.DataFrame(columns=["name", "height", "weight"])
+    return pd.concat(chunks, ignore_index=True)
 
-    return dataframe
 
+def list_source_files(directory: str = ".", target: str = target_file) -> List[str]:
+    """
+    Lista los archivos fuente (CSV, JSON y XML) de un directorio, excluyendo
+    el archivo destino del proceso y su manifiesto.
 
-def extract() -> pd.DataFrame:
+    Los archivos se devuelven agrupados por formato (CSV, JSON, XML) y
+    ordenados por nombre dentro de cada grupo, de modo que el orden sea
+    determinista entre ejecuciones.
+
+    Args:
+        directory (str): Directorio donde buscar los archivos.
+        target (str): Archivo destino a excluir.
+
+    Returns:
+        List[str]: Rutas de los archivos a procesar.
+    """
+    excluded = {os.path.basename(target), os.path.basename(target) + manifest_suffix}
+    files = []
+    for extension in ("csv", "json", "xml"):
+        for path in sorted(glob.glob(os.path.join(directory, f"*.{extension}"))):
+            if os.path.basename(path) not in excluded:  # Evita procesar el archivo final como entrada
+                files.append(path)
+    return files
+
+
+def extract_file(file_to_process: str) -> pd.DataFrame:
+    """
+    Extrae un archivo con el parser que corresponde a su extensión.
+
+    Args:
+        file_to_process (str): Ruta del archivo CSV, JSON o XML.
+
+    Returns:
+        pd.DataFrame: DataFrame con los datos extraídos.
+
+    Raises:
+        ValueError: Si la extensión no es csv, json ni xml.
+    """
+    extension = os.path.splitext(file_to_process)[1].lower()
+    if extension == ".csv":
+        return extract_from_csv(file_to_process)
+    if extension == ".json":
+        return extract_from_json(file_to_process)
+    if extension == ".xml":
+        return extract_from_xml(file_to_process)
+    raise ValueError(f"Formato no soportado: {file_to_process}")
+
+
+def extract_files(files: List[str], max_workers: Optional[int] = extract_workers,
+                  ordered: bool = True) -> List[pd.DataFrame]:
+    """
+    Extrae una lista de archivos, en paralelo con un pool de procesos.
+
+    Args:
+        files (List[str]): Rutas de los archivos a procesar.
+        max_workers (Optional[int]): Número de procesos. None usa el número de
+            CPUs; 1 procesa los archivos de forma secuencial sin crear el pool.
+        ordered (bool): Si es True, los resultados conservan el orden de
+            `files`; si es False, se devuelven según terminan los procesos.
+
+    Returns:
+        List[pd.DataFrame]: Un DataFrame por archivo.
+    """
+    if max_workers == 1 or len(files) <= 1:
+        return [extract_file(path) for path in files]
+
+    workers = max_workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        if ordered:
+            # Agrupa archivos por tarea para reducir la comunicación entre procesos
+            chunksize = max(1, len(files) // (workers * 4))
+            return list(executor.map(extract_file, files, chunksize=chunksize))
+        futures = [executor.submit(extract_file, path) for path in files]
+        return [future.result() for future in as_completed(futures)]
+
+
+@metrics.instrumentar()
+def extract(directory: str = ".", max_workers: Optional[int] = extract_workers,
+            ordered: bool = True) -> pd.DataFrame:
     """
     Orquesta la fase de extracción combinando datos desde múltiples fuentes:
     CSV, JSON y XML.
 
+    Cada archivo se procesa en un pool de procesos y los resultados se
+    concatenan una única vez al final.
+
+    Args:
+        directory (str): Directorio con los archivos fuente.
+        max_workers (Optional[int]): Número de procesos. None usa el número de
+            CPUs; 1 procesa los archivos de forma secuencial sin crear el pool.
+        ordered (bool): Si es True, las filas conservan el orden de
+            `list_source_files`; si es False, se agregan según terminan los
+            procesos (más rápido con archivos de tamaños muy distintos).
+
     Returns:
         pd.DataFrame: DataFrame consolidado con todos los registros extraídos.
     """
-    extracted_data = pd.DataFrame(columns=['name', 'height', 'weight'])
-
-    # Procesar archivos CSV
-    for csvfile in glob.glob("*.csv"):
-        if csvfile != target_file:  # Evita procesar el archivo final como entrada
-            extracted_data = pd.concat(
-                [extracted_data, extract_from_csv(csvfile)],
-                ignore_index=True
-            )
-
-    # Procesar archivos JSON
-    for jsonfile in glob.glob("*.json"):
-        extracted_data = pd.concat(
-            [extracted_data, extract_from_json(jsonfile)],
-            ignore_index=True
-        )
-
-    # Procesar archivos XML
-    for xmlfile in glob.glob("*.xml"):
-        extracted_data = pd.concat(
-            [extracted_data, extract_from_xml(xmlfile)],
-            ignore_index=True
-        )
-
-    return extracted_data
+    files = list_source_files(directory)
+    if not files:
+        return pd.DataFrame(columns=['name', 'height', 'weight'])
+    return pd.concat(extract_files(files, max_workers, ordered), ignore_index=True)
 
 
 # ---------------------------------------------------------------------------
 # Función de Transformación
 # ---------------------------------------------------------------------------
 
+@metrics.instrumentar()
 def transform(data: pd.DataFrame) -> pd.DataFrame:
     """
     Aplica transformaciones a las columnas de altura y peso:
@@ -148,52 +343,335 @@ def transform(data: pd.DataFrame) -> pd.DataFrame:
 # Función de Carga
 # ---------------------------------------------------------------------------
 
-def load_data(target_file: str, transformed_data: pd.DataFrame) -> None:
+def target_output(target_file: str):
+    """
+    Salida (etl_comun.salidas) que corresponde a la extensión del destino:
+    Parquet o Feather para .parquet/.feather, CSV en cualquier otro caso.
+
+    Args:
+        target_file (str): Nombre del archivo de salida.
+
+    Returns:
+        salidas.Salida: Escritor/lector del formato, con `output_options`.
+    """
+    output_format = salidas.EXTENSIONES.get(Path(target_file).suffix.lower(), "csv")
+    return salidas.crear_salida(output_format, **output_options)
+
+
+@metrics.instrumentar()
+def load_data(target_file: str, transformed_data: pd.DataFrame, append: bool = False) -> None:
     """
-    Carga los datos transformados en un archivo CSV.
+    Carga los datos transformados en el archivo destino (CSV, Parquet o
+    Feather según su extensión).
 
     Args:
         target_file (str): Nombre del archivo de salida.
         transformed_data (pd.DataFrame): DataFrame a guardar.
+        append (bool): Si es True, agrega las filas al final del archivo sin
+            repetir el encabezado. Parquet y Feather no admiten agregar: el
+            archivo se lee y se reescribe completo.
+    """
+    target_output(target_file).escribir(transformed_data, target_file, agregar=append)
+
+
+def iter_file_chunks(file_to_process: str, chunk_size: int = read_chunk_size) -> Iterator[pd.DataFrame]:
+    """
+    Lee un archivo CSV, JSON o XML por bloques con el lector que corresponde
+    a su extensión.
+
+    Args:
+        file_to_process (str): Ruta del archivo a procesar.
+        chunk_size (int): Número máximo de registros por bloque.
+
+    Yields:
+        pd.DataFrame: Bloques con las columnas name, height y weight.
+
+    Raises:
+        ValueError: Si la extensión no es csv, json ni xml.
+    """
+    extension = os.path.splitext(file_to_process)[1].lower()
+    readers = {".csv": iter_csv_chunks, ".json": iter_json_chunks, ".xml": iter_xml_chunks}
+    if extension not in readers:
+        raise ValueError(f"Formato no soportado: {file_to_process}")
+    return readers[extension](file_to_process, chunk_size)
+
+
+@metrics.instrumentar(filas=lambda total, *args: total)
+def etl_streaming(file_to_process: str, target_file: str,
+                  chunk_size: int = read_chunk_size) -> int:
+    """
+    Ejecuta extracción, transformación y carga de un archivo CSV, JSON o XML
+    bloque a bloque, sin cargar el archivo completo en memoria.
+
+    El archivo destino se reemplaza y cada bloque se escribe a continuación
+    del anterior (en Parquet/Feather, como un grupo de filas del archivo).
+    Si el archivo no tiene registros, el destino queda vacío (solo con el
+    encabezado o el esquema), no con el resultado de una ejecución anterior.
+
+    Args:
+        file_to_process (str): Ruta del archivo a procesar.
+        target_file (str): Nombre del archivo de salida.
+        chunk_size (int): Número máximo de registros por bloque.
+
+    Returns:
+        int: Número total de registros procesados.
+    """
+    total = 0
+    with target_output(target_file).escritor(target_file) as write_chunk:
+        for chunk in iter_file_chunks(file_to_process, chunk_size):
+            write_chunk(transform(chunk))
+            total += len(chunk)
+        if total == 0:
+            write_chunk(pd.DataFrame({'name': pd.Series(dtype=object), 'height': pd.Series(dtype=float),
+                                      'weight': pd.Series(dtype=float)}))
+    return total
+
+
+# ---------------------------------------------------------------------------
+# Carga Incremental (manifiesto de archivos procesados)
+# ---------------------------------------------------------------------------
+# El manifiesto se guarda junto al archivo destino y registra, por cada archivo
+# fuente, su tamaño, fecha de modificación, hash SHA-256 y el rango de filas
+# que ocupa en el destino. Con él, cada ejecución procesa solo los archivos
+# nuevos o modificados.
+
+def file_hash(file_to_process: str, block_size: int = 1 << 20) -> str:
+    """
+    Calcula el hash SHA-256 del contenido de un archivo, leyéndolo por bloques.
+
+    Args:
+        file_to_process (str): Ruta del archivo.
+        block_size (int): Tamaño de bloque de lectura en bytes.
+
+    Returns:
+        str: Hash en hexadecimal.
     """
-    transformed_data.to_csv(target_file, index=False)
+    digest = hashlib.sha256()
+    with open(file_to_process, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_manifest(manifest_path: str) -> Optional[Dict[str, dict]]:
+    """
+    Lee el manifiesto de archivos procesados.
+
+    Args:
+        manifest_path (str): Ruta del manifiesto.
+
+    Returns:
+        Optional[Dict[str, dict]]: Entradas por archivo, o None si no existe.
+    """
+    if not os.path.exists(manifest_path):
+        return None
+    with open(manifest_path, encoding="utf-8") as f:
+        return json.load(f)["files"]
+
+
+def save_manifest(manifest_path: str, target: str, entries: Dict[str, dict]) -> None:
+    """
+    Guarda el manifiesto de forma atómica (archivo temporal + reemplazo).
+
+    Args:
+        manifest_path (str): Ruta del manifiesto.
+        target (str): Archivo destino al que corresponde el manifiesto.
+        entries (Dict[str, dict]): Entradas por archivo.
+    """
+    tmp_path = manifest_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"target": target, "files": entries}, f, indent=2)
+    os.replace(tmp_path, manifest_path)
+
+
+def classify_sources(files: List[str], directory: str,
+                     previous: Dict[str, dict]) -> Dict[str, List[str]]:
+    """
+    Compara los archivos fuente actuales contra el manifiesto anterior.
+
+    Si tamaño y fecha de modificación coinciden, el archivo se considera sin
+    cambios sin leerlo; en caso contrario se compara el hash del contenido.
+
+    Args:
+        files (List[str]): Rutas de los archivos fuente actuales.
+        directory (str): Directorio base de las rutas del manifiesto.
+        previous (Dict[str, dict]): Entradas del manifiesto anterior.
+
+    Returns:
+        Dict[str, List[str]]: Claves del manifiesto agrupadas en "new",
+        "modified", "unchanged" y "deleted".
+    """
+    result = {"new": [], "modified": [], "unchanged": [], "deleted": []}
+    current = set()
+    for path in files:
+        key = os.path.relpath(path, directory)
+        current.add(key)
+        entry = previous.get(key)
+        if entry is None:
+            result["new"].append(key)
+            continue
+        stat = os.stat(path)
+        if stat.st_size == entry["size"] and stat.st_mtime_ns == entry["mtime_ns"]:
+            result["unchanged"].append(key)
+        elif file_hash(path) == entry["sha256"]:
+            entry["mtime_ns"] = stat.st_mtime_ns  # Solo cambió la fecha: se actualiza
+            result["unchanged"].append(key)
+        else:
+            result["modified"].append(key)
+    result["deleted"] = [key for key in previous if key not in current]
+    return result
+
+
+@metrics.instrumentar(filas=lambda summary, *args: summary["rows_written"])
+def run_incremental(directory: str = ".", target: str = target_file,
+                    full_rebuild: bool = False,
+                    max_workers: Optional[int] = extract_workers) -> Dict[str, int]:
+    """
+    Ejecuta el ETL procesando únicamente los archivos nuevos o modificados
+    desde la última ejecución.
+
+    - Archivos nuevos: sus filas se agregan al final del destino.
+    - Archivos modificados o eliminados: sus filas anteriores se eliminan del
+      destino (según el rango registrado en el manifiesto) y se agregan las
+      nuevas.
+    - Sin manifiesto, sin destino o con `full_rebuild`: se reconstruye todo.
+
+    Args:
+        directory (str): Directorio con los archivos fuente.
+        target (str): Ruta del archivo destino (.csv, .parquet o .feather).
+        full_rebuild (bool): Ignora el manifiesto y reprocesa todos los archivos.
+        max_workers (Optional[int]): Procesos de extracción (ver `extract_files`).
+
+    Returns:
+        Dict[str, int]: Conteo de archivos nuevos, modificados, sin cambios y
+        eliminados, y filas escritas en esta ejecución.
+    """
+    manifest_path = target + manifest_suffix
+    files = list_source_files(directory, target)
+    paths = {os.path.relpath(path, directory): path for path in files}
+
+    previous = None if full_rebuild or not os.path.exists(target) else load_manifest(manifest_path)
+    if previous is None:
+        changes = {"new": list(paths), "modified": [], "unchanged": [], "deleted": []}
+        previous = {}
+    else:
+        changes = classify_sources(files, directory, previous)
+
+    to_process = changes["new"] + changes["modified"]
+    log_progress(f"Incremental: {len(changes['new'])} nuevos, {len(changes['modified'])} modificados, "
+                 f"{len(changes['unchanged'])} sin cambios, {len(changes['deleted'])} eliminados")
+
+    frames = extract_files([paths[key] for key in to_process], max_workers)
+    frames = [transform(frame) for frame in frames]
+
+    # Entradas que se conservan, en el orden en que aparecen en el destino
+    kept = sorted(changes["unchanged"], key=lambda key: previous[key]["start"])
+    removed = changes["modified"] + changes["deleted"]
+    rows_written = sum(len(frame) for frame in frames)
+
+    if not kept:
+        # Reconstrucción completa del destino
+        data = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=['name', 'height', 'weight'])
+        load_data(target, data)
+    elif removed:
+        # Fusión: se eliminan los rangos de los archivos modificados/eliminados
+        existing = target_output(target).leer(target)
+        keep_rows = np.zeros(len(existing), dtype=bool)
+        for key in kept:
+            keep_rows[previous[key]["start"]:previous[key]["start"] + previous[key]["rows"]] = True
+        load_data(target, pd.concat([existing[keep_rows]] + frames, ignore_index=True))
+    elif frames:
+        # Solo archivos nuevos: se agregan al final sin reescribir el destino
+        load_data(target, pd.concat(frames, ignore_index=True), append=True)
+
+    # Los rangos de filas se recalculan en el orden final del destino
+    entries = {}
+    offset = 0
+    for key in kept:
+        entries[key] = dict(previous[key], start=offset)
+        offset += previous[key]["rows"]
+    for key, frame in zip(to_process, frames):
+        stat = os.stat(paths[key])
+        entries[key] = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": file_hash(paths[key]),
+            "start": offset,
+            "rows": len(frame),
+        }
+        offset += len(frame)
+    save_manifest(manifest_path, target, entries)
+
+    return {
+        "new": len(changes["new"]),
+        "modified": len(changes["modified"]),
+        "unchanged": len(changes["unchanged"]),
+        "deleted": len(changes["deleted"]),
+        "rows_written": rows_written,
+    }
 
 
 # ---------------------------------------------------------------------------
 # Función de Logging
 # ---------------------------------------------------------------------------
 
-def log_progress(message: str) -> None:
+def log_progress(message: str, **fields) -> None:
     """
     Registra un mensaje en el archivo de log con marca de tiempo.
 
+    La escritura la realiza en segundo plano el registro asíncrono de
+    `etl_comun.registro` (en formato jsonl, cada línea incluye además el
+    tiempo transcurrido desde el mensaje anterior).
+
     Args:
         message (str): Mensaje descriptivo del estado del proceso.
+        **fields: Datos adicionales del mensaje (p. ej. filas procesadas).
     """
-    timestamp_format = '%Y-%m-%d-%H:%M:%S'
-    now = datetime.now()
-    timestamp = now.strftime(timestamp_format)
-    with open(log_file, "a") as f:
-        f.write(f"{timestamp},{message}\n")
+    obtener_registro(log_file, formato=log_format, separador=",").log(message, **fields)
 
 
 # ---------------------------------------------------------------------------
 # Ejecución del Pipeline ETL
 # ---------------------------------------------------------------------------
 
-log_progress("Proceso ETL iniciando...")
-
-log_progress("Fase de extracción iniciada")
-extracted_data = extract()
-log_progress("Fase de extracción terminada")
-
-log_progress("Fase de transformación iniciada")
-transformed_data = transform(extracted_data)
-print("Datos transformados:\n", transformed_data)
-log_progress("Fase de transformación terminada")
+def main(argv: Optional[List[str]] = None) -> Dict[str, int]:
+    """
+    Punto de entrada de línea de comandos: ejecuta el ETL incremental.
 
-log_progress("Fase de carga iniciada")
-load_data(target_file, transformed_data)
-log_progress("Fase de carga terminada")
+    Args:
+        argv (Optional[List[str]]): Argumentos (por defecto, los de sys.argv).
 
-log_progress("Proceso ETL finalizado con éxito.")
\ No newline at end of file
+    Returns:
+        Dict[str, int]: Resumen devuelto por `run_incremental`.
+    """
+    global log_file, log_format, output_options
+    parser = argparse.ArgumentParser(description="ETL de archivos CSV, JSON y XML")
+    parser.add_argument("--directory", default=".", help="Directorio con los archivos fuente")
+    parser.add_argument("--target", default=target_file, help="Archivo destino (.csv, .parquet o .feather)")
+    parser.add_argument("--compression", help="Códec de compresión (snappy, zstd, lz4, gzip, ...)")
+    parser.add_argument("--row-group-size", type=int, help="Filas por grupo (Parquet) o lote (Feather)")
+    parser.add_argument("--workers", type=int, default=extract_workers,
+                        help="Procesos de extracción (por defecto, número de CPUs)")
+    parser.add_argument("--full-rebuild", action="store_true",
+                        help="Reprocesa todos los archivos ignorando el manifiesto")
+    parser.add_argument("--log-file", default=log_file, help="Archivo de log")
+    parser.add_argument("--log-format", choices=("texto", "jsonl"), default=log_format)
+    args = parser.parse_args(argv)
+    log_file, log_format = args.log_file, args.log_format
+    output_options = {key: value for key, value in (("compresion", args.compression),
+                                                   ("tamano_grupo_filas", args.row_group_size)) if value is not None}
+
+    log_progress("Proceso ETL iniciando...")
+
+    log_progress("Fase incremental iniciada (extracción, transformación y carga)")
+    summary = run_incremental(args.directory, target=args.target, full_rebuild=args.full_rebuild,
+                              max_workers=args.workers)
+    print("Resumen de la ejecución:", summary)
+    log_progress(f"Fase incremental terminada: {summary['rows_written']} registros escritos")
+
+    log_progress("Proceso ETL finalizado con éxito.")
+    return summary
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark: carga a SQLite con to_sql vs. etl_comun.sqlite_carga
+===============================================================
+
+Compara, sobre una base de datos en disco y tablas de millones de filas con
+la forma de la tabla de bancos (nombre + capitalización en varias divisas):
+
+    - to_sql:        df.to_sql(..., if_exists='replace') (método original).
+    - replace:       cargar_dataframe(modo="replace") (WAL + executemany por lotes).
+    - replace+clave: igual, creando además el índice único de la clave.
+    - upsert:        cargar_dataframe(modo="upsert") sobre la tabla ya cargada
+                     (todas las filas chocan con la clave y se actualizan).
+
+Cada modo se mide sobre una base de datos nueva (upsert parte de la tabla
+ya cargada, sin contar esa carga previa).
+
+Uso:
+    python bench_carga_sqlite.py
+    python bench_carga_sqlite.py --filas 1000000 5000000 --lote 100000
+
+Autor: Fernando Blanco
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from etl_comun.sqlite_carga import TAMANO_LOTE, cargar_dataframe
+
+
+def generar_bancos(n_filas: int, semilla: int = 0) -> pd.DataFrame:
+    """Tabla con clave única 'Bank name' y columnas de capitalización."""
+    rng = np.random.default_rng(semilla)
+    usd = rng.uniform(10, 1500, n_filas).round(2)
+    return pd.DataFrame({
+        "Bank name": [f"Bank {i}" for i in range(n_filas)],
+        "MC_USD_Billion": usd,
+        "MC_GBP_Billion": (usd * 0.8).round(2),
+        "MC_EUR_Billion": (usd * 0.93).round(2),
+        "MC_INR_Billion": (usd * 82.95).round(2),
+    })
+
+
+def medir(funcion):
+    inicio = time.perf_counter()
+    funcion()
+    return time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--filas", type=int, nargs="+", default=[100_000, 1_000_000, 3_000_000])
+    parser.add_argument("--lote", type=int, default=TAMANO_LOTE)
+    args = parser.parse_args()
+
+    casos = {
+        "to_sql": lambda df, conn: df.to_sql("bancos", conn, if_exists="replace", index=False),
+        "replace": lambda df, conn: cargar_dataframe(df, conn, "bancos", tamano_lote=args.lote),
+        "replace+clave": lambda df, conn: cargar_dataframe(df, conn, "bancos", clave="Bank name",
+                                                           tamano_lote=args.lote),
+        "upsert": lambda df, conn: cargar_dataframe(df, conn, "bancos", modo="upsert",
+                                                    clave="Bank name", tamano_lote=args.lote),
+    }
+
+    print(f"{'filas':>10} {'modo':>14} {'segundos':>10} {'filas/s':>12}")
+    for n in args.filas:
+        df = generar_bancos(n)
+        for nombre, funcion in casos.items():
+            with tempfile.TemporaryDirectory() as tmp:
+                conn = sqlite3.connect(os.path.join(tmp, "bench.db"))
+                if nombre == "upsert":
+                    cargar_dataframe(df, conn, "bancos", clave="Bank name")
+                segundos = medir(lambda: funcion(df, conn))
+                total = conn.execute("SELECT COUNT(*) FROM bancos").fetchone()[0]
+                assert total == n, f"{nombre}: {total} filas, se esperaban {n}"
+                conn.close()
+            print(f"{n:>10} {nombre:>14} {segundos:>10.2f} {n / segundos:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Benchmark: conversión de divisas en banks_project.transform
+===========================================================
+
+Compara la conversión original (una lista por comprensión con `np.round`
+por elemento y por divisa) contra la conversión vectorizada de
+`banks_project.transform` (columna USD × vector de tasas en una sola
+operación), con 30+ divisas y tablas de distinto tamaño.
+
+Uso:
+    python bench_conversion_divisas.py
+    python bench_conversion_divisas.py --filas 1000 100000 1000000 --divisas 40
+
+Autor: Fernando Blanco
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "ETL_Proyectos" / "PROYECTO 2"))
+import banks_project
+
+
+# ---------------------------------------------------------------------------
+# Datos sintéticos
+# ---------------------------------------------------------------------------
+
+def generar_tasas(ruta: str, n_divisas: int, semilla: int = 0) -> None:
+    """Escribe un exchange_rate.csv con `n_divisas` divisas ficticias."""
+    rng = np.random.default_rng(semilla)
+    codigos = [f"C{i:02d}" for i in range(n_divisas)]
+    pd.DataFrame({"Currency": codigos, "Rate": rng.uniform(0.1, 150, n_divisas).round(4)}).to_csv(ruta, index=False)
+
+
+def generar_bancos(n_filas: int, semilla: int = 0) -> pd.DataFrame:
+    """DataFrame con la forma de la salida de extract (Bank name, MC_USD_Billion)."""
+    rng = np.random.default_rng(semilla)
+    return pd.DataFrame({
+        "Bank name": [f"Bank {i}" for i in range(n_filas)],
+        "MC_USD_Billion": rng.uniform(10, 1500, n_filas).round(2),
+    })
+
+
+# ---------------------------------------------------------------------------
+# Implementación original (generalizada a todas las divisas del archivo)
+# ---------------------------------------------------------------------------
+
+def transform_original(df: pd.DataFrame, csv_path: str) -> pd.DataFrame:
+    """Una lista por comprensión con np.round por elemento para cada divisa."""
+    dataframe = pd.read_csv(csv_path)
+    dict_rates = dataframe.set_index('Currency').to_dict()['Rate']
+    for currency, rate in dict_rates.items():
+        df[f'MC_{currency}_Billion'] = [np.round(x * rate, 2) for x in df['MC_USD_Billion']]
+    return df
+
+
+# ---------------------------------------------------------------------------
+# Ejecución
+# ---------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--filas", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--divisas", type=int, default=32)
+    parser.add_argument("--max-original", type=int, default=100_000,
+                        help="Tamaño máximo para la implementación original")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta_tasas = os.path.join(tmp, "exchange_rate.csv")
+        generar_tasas(ruta_tasas, args.divisas)
+
+        print(f"{args.divisas} divisas")
+        print(f"{'filas':>10} {'original (s)':>14} {'vectorizado (s)':>16} {'ns/celda':>10} {'aceleración':>12}")
+        for n in args.filas:
+            df = generar_bancos(n)
+            inicio = time.perf_counter()
+            nuevo = banks_project.transform(df.copy(), ruta_tasas)
+            t_nuevo = time.perf_counter() - inicio
+            ns_celda = t_nuevo / (n * args.divisas) * 1e9
+
+            if n <= args.max_original:
+                inicio = time.perf_counter()
+                original = transform_original(df.copy(), ruta_tasas)
+                t_original = time.perf_counter() - inicio
+                pd.testing.assert_frame_equal(nuevo, original)
+                print(f"{n:>10} {t_original:>14.4f} {t_nuevo:>16.4f} {ns_celda:>10.2f} {t_original / t_nuevo:>11.1f}x")
+            else:
+                print(f"{n:>10} {'(omitido)':>14} {t_nuevo:>16.4f} {ns_celda:>10.2f} {'-':>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Benchmark: extracción secuencial vs. pool de procesos
+=====================================================
+
+Genera un directorio sintético con miles de archivos `sourceN.csv`,
+`sourceN.json` y `sourceN.xml` y compara:
+
+    - original:  bucle secuencial con pd.concat después de cada archivo.
+    - secuencial: etl_code.extract(max_workers=1) (una sola concatenación).
+    - paralelo:   etl_code.extract(max_workers=N) con ProcessPoolExecutor.
+
+Uso:
+    python bench_extraccion_paralela.py
+    python bench_extraccion_paralela.py --archivos 6000 --registros 20 --workers 2 4 8
+
+Autor: Fernando Blanco
+"""
+
+import argparse
+import glob
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "ETL_basics" / "XML, JSON - CSV"))
+import etl_code
+
+
+# ---------------------------------------------------------------------------
+# Generación de datos sintéticos
+# ---------------------------------------------------------------------------
+
+def generar_directorio(directorio: str, n_archivos: int, registros: int, semilla: int = 0) -> None:
+    """
+    Crea `n_archivos` archivos repartidos en partes iguales entre CSV, JSON
+    (líneas) y XML, cada uno con `registros` personas.
+
+    Args:
+        directorio (str): Directorio destino.
+        n_archivos (int): Número total de archivos.
+        registros (int): Registros por archivo.
+        semilla (int): Semilla del generador aleatorio.
+    """
+    rng = random.Random(semilla)
+    for i in range(n_archivos):
+        filas = [(f"p{i}_{j}", rng.uniform(60, 76), rng.uniform(100, 160)) for j in range(registros)]
+        formato = ("csv", "json", "xml")[i % 3]
+        ruta = os.path.join(directorio, f"source{i}.{formato}")
+        with open(ruta, "w", encoding="utf-8") as f:
+            if formato == "csv":
+                f.write("name,height,weight\n")
+                f.writelines(f"{n},{h:.2f},{w:.2f}\n" for n, h, w in filas)
+            elif formato == "json":
+                f.writelines(f'{{"name":"{n}","height":{h:.2f},"weight":{w:.2f}}}\n' for n, h, w in filas)
+            else:
+                f.write("<data>\n")
+                f.writelines(
+                    f"<person><name>{n}</name><height>{h:.2f}</height><weight>{w:.2f}</weight></person>\n"
+                    for n, h, w in filas
+                )
+                f.write("</data>\n")
+
+
+# ---------------------------------------------------------------------------
+# Implementación original
+# ---------------------------------------------------------------------------
+
+def extract_original(directorio: str) -> pd.DataFrame:
+    """Bucle original de etl_code.extract: secuencial y con pd.concat por archivo."""
+    extracted_data = pd.DataFrame(columns=['name', 'height', 'weight'])
+    for csvfile in glob.glob(os.path.join(directorio, "*.csv")):
+        extracted_data = pd.concat([extracted_data, etl_code.extract_from_csv(csvfile)], ignore_index=True)
+    for jsonfile in glob.glob(os.path.join(directorio, "*.json")):
+        extracted_data = pd.concat([extracted_data, etl_code.extract_from_json(jsonfile)], ignore_index=True)
+    for xmlfile in glob.glob(os.path.join(directorio, "*.xml")):
+        extracted_data = pd.concat([extracted_data, etl_code.extract_from_xml(xmlfile)], ignore_index=True)
+    return extracted_data
+
+
+# ---------------------------------------------------------------------------
+# Ejecución
+# ---------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--archivos", type=int, default=3_000)
+    parser.add_argument("--registros", type=int, default=20, help="Registros por archivo")
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4, os.cpu_count() or 1])
+    parser.add_argument("--sin-original", action="store_true",
+                        help="Omite la implementación original (cuadrática en el número de archivos)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        generar_directorio(tmp, args.archivos, args.registros)
+        esperado = args.archivos * args.registros
+
+        casos = [] if args.sin_original else [("original", lambda: extract_original(tmp))]
+        casos.append(("secuencial", lambda: etl_code.extract(tmp, max_workers=1)))
+        for w in sorted(set(args.workers)):
+            casos.append((f"paralelo x{w}", lambda w=w: etl_code.extract(tmp, max_workers=w)))
+
+        print(f"{args.archivos} archivos, {esperado} registros")
+        print(f"{'modo':>14} {'segundos':>10} {'archivos/s':>12}")
+        base = None
+        for nombre, funcion in casos:
+            inicio = time.perf_counter()
+            df = funcion()
+            segundos = time.perf_counter() - inicio
+            assert len(df) == esperado, f"{nombre}: {len(df)} registros, se esperaban {esperado}"
+            base = base or segundos
+            print(f"{nombre:>14} {segundos:>10.2f} {args.archivos / segundos:>12.0f}  ({base / segundos:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
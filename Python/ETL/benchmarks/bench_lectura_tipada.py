@@ -0,0 +1,123 @@
+"""
+Benchmark: lectura CSV/JSON con inferencia vs. esquema declarado
+================================================================
+
+Compara, para archivos CSV y JSON (líneas múltiples) generados con la forma
+de `source1.csv` / `source1.json`:
+
+    - original:  pd.read_csv / pd.read_json(lines=True) con inferencia de tipos.
+    - tipado:    etl_code.extract_file (esquema declarado y pyarrow si existe).
+    - streaming: etl_code.etl_streaming (lectura por bloques + transform + carga).
+
+Cada medición corre en un proceso independiente para reportar el pico de
+memoria residente (RSS).
+
+Uso:
+    python bench_lectura_tipada.py
+    python bench_lectura_tipada.py --registros 5000000 --chunk-size 100000
+
+Autor: Fernando Blanco
+"""
+
+import argparse
+import multiprocessing as mp
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "ETL_basics" / "XML, JSON - CSV"))
+import etl_code
+
+
+# ---------------------------------------------------------------------------
+# Generación de datos sintéticos
+# ---------------------------------------------------------------------------
+
+def generar_personas(ruta: str, n_registros: int, formato: str, semilla: int = 0) -> None:
+    """
+    Escribe `n_registros` personas en formato CSV o JSON (líneas múltiples).
+
+    Args:
+        ruta (str): Ruta del archivo a generar.
+        n_registros (int): Número de registros.
+        formato (str): "csv" o "json".
+        semilla (int): Semilla del generador aleatorio.
+    """
+    rng = random.Random(semilla)
+    with open(ruta, "w", encoding="utf-8") as f:
+        if formato == "csv":
+            f.write("name,height,weight\n")
+        for i in range(n_registros):
+            h, w = rng.uniform(60, 76), rng.uniform(100, 160)
+            if formato == "csv":
+                f.write(f"persona{i},{h:.2f},{w:.2f}\n")
+            else:
+                f.write(f'{{"name":"persona{i}","height":{h:.2f},"weight":{w:.2f}}}\n')
+
+
+# ---------------------------------------------------------------------------
+# Modos a comparar
+# ---------------------------------------------------------------------------
+
+def _ejecutar(modo: str, ruta: str, salida: str, chunk_size: int, cola) -> None:
+    """Ejecuta un modo en un proceso hijo y devuelve (segundos, registros, RSS máx. en MB)."""
+    inicio = time.perf_counter()
+    if modo == "original":
+        if ruta.endswith(".csv"):
+            df = pd.read_csv(ruta)
+        else:
+            df = pd.read_json(ruta, lines=True)
+        etl_code.load_data(salida, etl_code.transform(df))
+        registros = len(df)
+    elif modo == "tipado":
+        df = etl_code.extract_file(ruta)
+        etl_code.load_data(salida, etl_code.transform(df))
+        registros = len(df)
+    else:
+        registros = etl_code.etl_streaming(ruta, salida, chunk_size)
+    segundos = time.perf_counter() - inicio
+    rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # Linux: KiB
+    cola.put((segundos, registros, rss_mb))
+
+
+def medir(modo: str, ruta: str, salida: str, chunk_size: int):
+    """Lanza `_ejecutar` en un proceso nuevo y devuelve sus resultados."""
+    cola = mp.Queue()
+    proceso = mp.Process(target=_ejecutar, args=(modo, ruta, salida, chunk_size, cola))
+    proceso.start()
+    resultado = cola.get()
+    proceso.join()
+    return resultado
+
+
+# ---------------------------------------------------------------------------
+# Ejecución
+# ---------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--registros", type=int, default=2_000_000)
+    parser.add_argument("--chunk-size", type=int, default=etl_code.read_chunk_size)
+    args = parser.parse_args()
+
+    print(f"pyarrow disponible: {etl_code.has_pyarrow}")
+    print(f"{'formato':>8} {'modo':>10} {'segundos':>10} {'RSS máx (MB)':>13}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for formato in ("csv", "json"):
+            ruta = os.path.join(tmp, f"personas.{formato}")
+            salida = os.path.join(tmp, "salida.csv")
+            generar_personas(ruta, args.registros, formato)
+            for modo in ("original", "tipado", "streaming"):
+                segundos, registros, rss_mb = medir(modo, ruta, salida, args.chunk_size)
+                assert registros == args.registros, f"{modo}: {registros} registros"
+                print(f"{formato:>8} {modo:>10} {segundos:>10.2f} {rss_mb:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Benchmark: análisis HTML de la tabla de bancos
+==============================================
+
+Compara el método original de `banks_project.extract` (BeautifulSoup con
+html.parser sobre toda la página + `str(table)` + `pd.read_html`) contra
+`etl_comun.tablas_html.extraer_tabla_tras_ancla` con cada analizador
+instalado (selectolax, lxml, html.parser con SoupStrainer).
+
+Por defecto se usa una página sintética con la estructura del artículo
+archivado "List of largest banks" (secciones de relleno, encabezado
+"By market capitalization" y la tabla objetivo). Con --html se puede
+medir sobre una copia real de la página (por ejemplo, desde la caché HTTP).
+
+Uso:
+    python bench_parser_bancos.py
+    python bench_parser_bancos.py --html ruta/a/List_of_largest_banks.html --repeticiones 20
+
+Autor: Fernando Blanco
+"""
+
+import argparse
+import random
+import sys
+import time
+from io import StringIO
+from pathlib import Path
+
+import pandas as pd
+from bs4 import BeautifulSoup
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from etl_comun.tablas_html import backends_disponibles, extraer_tabla_tras_ancla
+
+ANCLA = "By_market_capitalization"
+
+
+# ---------------------------------------------------------------------------
+# Página sintética
+# ---------------------------------------------------------------------------
+
+def generar_pagina_bancos(n_bancos: int = 100, secciones: int = 40, semilla: int = 0) -> str:
+    """
+    Genera una página con la forma del artículo archivado de Wikipedia:
+    secciones de texto y tablas de relleno antes y después de la tabla
+    "By market capitalization" con `n_bancos` filas.
+
+    Args:
+        n_bancos (int): Filas de la tabla objetivo.
+        secciones (int): Secciones de relleno (cada una con texto y una tabla).
+        semilla (int): Semilla del generador aleatorio.
+
+    Returns:
+        str: Documento HTML.
+    """
+    rng = random.Random(semilla)
+
+    def relleno(i):
+        parrafos = "".join(
+            f"<p>Texto de relleno {i}-{j} con <a href='/wiki/X{j}'>enlaces</a>"
+            f"<sup class='reference'><a href='#cite_note-{j}'>[{j}]</a></sup>.</p>"
+            for j in range(10)
+        )
+        filas = "".join(f"<tr><td>{k}</td><td>Dato {k}</td><td>{rng.random():.3f}</td></tr>" for k in range(30))
+        return (f'<h2><span class="mw-headline" id="Seccion_{i}">Sección {i}</span></h2>{parrafos}'
+                f'<table class="wikitable"><tbody><tr><th>A</th><th>B</th><th>C</th></tr>{filas}</tbody></table>')
+
+    filas_bancos = "".join(
+        "<tr>\n<td>{rank}\n</td>\n<td><span class=\"flagicon\"><a href=\"/wiki/P\"><img alt=\"P\" src=\"f.png\"/></a>"
+        "</span>&#160;<a href=\"/wiki/B{rank}\" title=\"Bank {rank}\">Bank {rank}</a>\n</td>\n"
+        "<td>{mc:,.2f}\n</td></tr>\n".format(rank=r, mc=rng.uniform(30, 1500))
+        for r in range(1, n_bancos + 1)
+    )
+    objetivo = (
+        f'<h2><span class="mw-headline" id="{ANCLA}">By market capitalization</span>'
+        '<span class="mw-editsection">[edit]</span></h2><p>Ranking.</p>'
+        '<table class="wikitable sortable mw-collapsible"><tbody><tr>\n'
+        '<th data-sort-type="number">Rank\n</th>\n<th>Bank name\n</th>\n'
+        '<th>Market cap<br />(US$ billion)\n</th></tr>\n' + filas_bancos + '</tbody></table>'
+    )
+    mitad = secciones // 2
+    cuerpo = "".join(relleno(i) for i in range(mitad)) + objetivo + \
+        "".join(relleno(i) for i in range(mitad, secciones))
+    return f"<!DOCTYPE html><html><head><title>List of largest banks</title></head><body>{cuerpo}</body></html>"
+
+
+# ---------------------------------------------------------------------------
+# Implementaciones a comparar
+# ---------------------------------------------------------------------------
+
+def limpiar(df: pd.DataFrame) -> pd.DataFrame:
+    """Limpieza de la columna de capitalización (igual que banks_project)."""
+    col_name = [c for c in df.columns if 'Market cap' in c or 'Market Cap' in c][0]
+    df[col_name] = df[col_name].astype(str).str.replace(',', '').str.strip().astype(float)
+    return df.rename(columns={col_name: 'MC_USD_Billion'})
+
+
+def extraer_original(page: str) -> pd.DataFrame:
+    """Método original: análisis completo + serialización + pd.read_html."""
+    soup = BeautifulSoup(page, 'html.parser')
+    header = soup.find('span', {'id': ANCLA})
+    table = header.find_parent('h2').find_next('table')
+    return limpiar(pd.read_html(StringIO(str(table)))[0])
+
+
+def extraer_nuevo(page: str, backend: str) -> pd.DataFrame:
+    """Localización directa de la tabla con el analizador indicado."""
+    return limpiar(extraer_tabla_tras_ancla(page, ANCLA, backend))
+
+
+# ---------------------------------------------------------------------------
+# Ejecución
+# ---------------------------------------------------------------------------
+
+def medir(funcion, repeticiones: int):
+    """Devuelve (resultado, mejor tiempo en segundos)."""
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return resultado, mejor
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--html", help="Archivo HTML real a analizar (por defecto, página sintética)")
+    parser.add_argument("--repeticiones", type=int, default=10)
+    args = parser.parse_args()
+
+    page = Path(args.html).read_text(encoding="utf-8") if args.html else generar_pagina_bancos()
+    print(f"Página: {len(page) / 1024:.0f} KiB")
+
+    referencia, t_original = medir(lambda: extraer_original(page), args.repeticiones)
+    print(f"{'método':>22} {'ms':>10} {'aceleración':>12}")
+    print(f"{'original':>22} {t_original * 1000:>10.1f} {'1.0x':>12}")
+
+    for backend in backends_disponibles():
+        df, t = medir(lambda: extraer_nuevo(page, backend), args.repeticiones)
+        pd.testing.assert_frame_equal(
+            df[['Bank name', 'MC_USD_Billion']], referencia[['Bank name', 'MC_USD_Billion']],
+            check_dtype=False,
+        )
+        print(f"{backend:>22} {t * 1000:>10.1f} {t_original / t:>11.1f}x")
+
+
+if __name__ == "__main__":
+    main()
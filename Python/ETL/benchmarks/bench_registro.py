@@ -0,0 +1,77 @@
+"""
+Benchmark: log_progress original vs. etl_comun.registro
+=======================================================
+
+Compara el coste de N llamadas de log:
+
+    - original:  abre el archivo, formatea la fecha con strftime y lo cierra
+                 en cada llamada (implementación previa de log_progress).
+    - asíncrono: RegistroAsincrono (encola y escribe por lotes en segundo
+                 plano). Se reporta el tiempo en el hilo que llama y el tiempo
+                 total hasta que todo está escrito en disco (flush).
+
+Uso:
+    python bench_registro.py
+    python bench_registro.py --llamadas 100000 --formato jsonl
+
+Autor: Fernando Blanco
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from etl_comun.registro import FORMATOS, RegistroAsincrono
+
+
+def log_original(ruta: str, message: str) -> None:
+    """Implementación previa de log_progress (una apertura por llamada)."""
+    timestamp_format = '%Y-%m-%d-%H:%M:%S'
+    now = datetime.now()
+    timestamp = now.strftime(timestamp_format)
+    with open(ruta, "a") as f:
+        f.write(f"{timestamp} : {message}\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--llamadas", type=int, default=1_000_000)
+    parser.add_argument("--formato", choices=FORMATOS, default="texto")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta_original = os.path.join(directorio, "original.txt")
+        inicio = time.perf_counter()
+        for i in range(args.llamadas):
+            log_original(ruta_original, f"Registro {i} procesado")
+        t_original = time.perf_counter() - inicio
+
+        ruta_async = os.path.join(directorio, "asincrono.txt")
+        registro = RegistroAsincrono(ruta_async, formato=args.formato)
+        inicio = time.perf_counter()
+        for i in range(args.llamadas):
+            registro.log(f"Registro {i} procesado")
+        t_llamadas = time.perf_counter() - inicio
+        registro.cerrar()
+        t_async = time.perf_counter() - inicio
+
+        with open(ruta_async, encoding="utf-8") as f:
+            lineas = sum(1 for _ in f)
+        assert lineas == args.llamadas, f"Se esperaban {args.llamadas} líneas y se escribieron {lineas}"
+
+    print(f"{args.llamadas:,} llamadas (formato {args.formato})")
+    print(f"{'modo':<22}{'tiempo (s)':>12}{'µs/llamada':>12}")
+    for nombre, t in (("original", t_original),
+                      ("asíncrono (llamadas)", t_llamadas),
+                      ("asíncrono (total)", t_async)):
+        print(f"{nombre:<22}{t:>12.2f}{t / args.llamadas * 1e6:>12.2f}")
+    print(f"Aceleración total: {t_original / t_async:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Benchmark: salidas CSV, Parquet y Feather
+=========================================
+
+Compara los formatos de etl_comun.salidas sobre los dos conjuntos de datos
+transformados del repositorio:
+
+    - personas: salida de etl_code.transform (name, height, weight).
+    - bancos:   salida de banks_project.transform (Bank name, MC_USD_Billion,
+                MC_<divisa>_Billion) con una columna Snapshot, como tras
+                extract_snapshots.
+
+Para cada formato y compresión mide el mejor tiempo de escritura y de
+lectura (y su rendimiento en filas/s) y el tamaño en disco, relativo al CSV
+sin comprimir. En bancos se incluye además Parquet particionado por Snapshot.
+
+Uso:
+    python bench_salidas.py
+    python bench_salidas.py --filas 100000 1000000 --repeticiones 5
+
+Autor: Fernando Blanco
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+RAIZ = Path(__file__).resolve().parents[1]
+sys.path.append(str(RAIZ))
+sys.path.append(str(Path(__file__).resolve().parent))
+sys.path.append(str(RAIZ / "ETL_basics" / "XML, JSON - CSV"))
+sys.path.append(str(RAIZ / "ETL_Proyectos" / "PROYECTO 2"))
+import banks_project
+import etl_code
+import generadores
+from etl_comun import salidas
+
+# (nombre, formato, compresión, columna de partición)
+CONFIGURACIONES = [
+    ("csv", "csv", None, None),
+    ("csv gzip", "csv", "gzip", None),
+    ("parquet snappy", "parquet", None, None),
+    ("parquet zstd", "parquet", "zstd", None),
+    ("feather lz4", "feather", None, None),
+    ("feather zstd", "feather", "zstd", None),
+    ("feather sin comprimir", "feather", "uncompressed", None),
+]
+PARTICIONADAS = [("parquet snappy / Snapshot", "parquet", None, "Snapshot")]
+
+
+# ---------------------------------------------------------------------------
+# Datos transformados
+# ---------------------------------------------------------------------------
+
+def datos_personas(directorio: str, n_filas: int) -> pd.DataFrame:
+    """Personas sintéticas extraídas y transformadas con etl_code."""
+    rutas = generadores.escribir_personas(directorio, n_filas, formatos=("csv",))
+    return etl_code.transform(etl_code.extract_file(rutas["csv"]))
+
+
+def datos_bancos(directorio: str, n_filas: int, n_capturas: int = 12, semilla: int = 0) -> pd.DataFrame:
+    """Bancos sintéticos de `n_capturas` capturas, transformados con banks_project."""
+    rng = np.random.default_rng(semilla)
+    tasas = os.path.join(directorio, "exchange_rate.csv")
+    generadores.escribir_tasas(tasas)
+    capturas = [f"2023-{mes:02d}-01T00:00:00" for mes in range(1, n_capturas + 1)]
+    df = pd.DataFrame({
+        "Bank name": [f"Bank {i % max(1, n_filas // n_capturas)}" for i in range(n_filas)],
+        "MC_USD_Billion": rng.uniform(10, 1500, n_filas).round(2),
+        "Snapshot": np.repeat(capturas, -(-n_filas // n_capturas))[:n_filas],
+    })
+    return banks_project.transform(df, tasas)
+
+
+# ---------------------------------------------------------------------------
+# Medición
+# ---------------------------------------------------------------------------
+
+def tamano(ruta: str) -> int:
+    """Bytes de un archivo o de todos los archivos de un directorio."""
+    if not os.path.isdir(ruta):
+        return os.path.getsize(ruta)
+    return sum(os.path.getsize(os.path.join(raiz, archivo))
+               for raiz, _, archivos in os.walk(ruta) for archivo in archivos)
+
+
+def medir(df: pd.DataFrame, directorio: str, configuracion, repeticiones: int) -> dict:
+    """Mejor tiempo de escritura y lectura y tamaño de una configuración."""
+    nombre, formato, compresion, particion = configuracion
+    salida = salidas.crear_salida(formato, compresion=compresion)
+    ruta = os.path.join(directorio, nombre.replace(" ", "_").replace("/", "") + salidas.FORMATOS[formato])
+    escritura = lectura = float("inf")
+    for _ in range(repeticiones):
+        if os.path.isdir(ruta):
+            shutil.rmtree(ruta)
+        inicio = time.perf_counter()
+        salida.escribir(df, ruta, particion=particion)
+        escritura = min(escritura, time.perf_counter() - inicio)
+
+        inicio = time.perf_counter()
+        leido = salida.leer(ruta)
+        lectura = min(lectura, time.perf_counter() - inicio)
+        assert len(leido) == len(df)
+        del leido
+    return {"nombre": nombre, "escritura_s": escritura, "lectura_s": lectura, "bytes": tamano(ruta)}
+
+
+def imprimir(conjunto: str, n_filas: int, resultados: list) -> None:
+    base = next(r["bytes"] for r in resultados if r["nombre"] == "csv")
+    print(f"\n{conjunto} ({n_filas:,} filas)")
+    print(f"{'formato':<28}{'escritura':>11}{'filas/s':>13}{'lectura':>11}{'filas/s':>13}{'tamaño':>12}{'vs CSV':>8}")
+    for r in resultados:
+        print(f"{r['nombre']:<28}{r['escritura_s']:>10.3f}s{n_filas / r['escritura_s']:>13,.0f}"
+              f"{r['lectura_s']:>10.3f}s{n_filas / r['lectura_s']:>13,.0f}"
+              f"{r['bytes'] / 1e6:>10.2f}MB{r['bytes'] / base:>8.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de las salidas CSV / Parquet / Feather")
+    parser.add_argument("--filas", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--repeticiones", type=int, default=3)
+    args = parser.parse_args()
+
+    for n_filas in args.filas:
+        with tempfile.TemporaryDirectory() as directorio:
+            for conjunto, generar, extra in (("personas", datos_personas, []),
+                                             ("bancos", datos_bancos, PARTICIONADAS)):
+                df = generar(directorio, n_filas)
+                resultados = [medir(df, directorio, c, args.repeticiones) for c in CONFIGURACIONES + extra]
+                imprimir(conjunto, len(df), resultados)
+                del df
+
+
+if __name__ == "__main__":
+    main()
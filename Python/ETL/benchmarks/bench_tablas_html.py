@@ -0,0 +1,131 @@
+"""
+Benchmark: extracción de la tabla del PIB
+=========================================
+
+Compara la implementación original de `etl_project_gdp.extract` (un
+DataFrame por fila + pd.concat) contra el motor columnar de
+`etl_comun.tablas_html` sobre tablas HTML sintéticas de distinto tamaño.
+
+Solo se mide el recorrido de filas: el HTML se analiza una vez con
+BeautifulSoup y ambas implementaciones reciben las mismas filas <tr>.
+
+Uso:
+    python bench_tablas_html.py
+    python bench_tablas_html.py --tamanos 200 2000 20000 200000 --max-original 20000
+
+Autor: Fernando Blanco
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+from bs4 import BeautifulSoup
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from etl_comun.tablas_html import construir_dataframe
+
+COLUMNAS = ["Country", "GDP_USD_millions"]
+
+
+# ---------------------------------------------------------------------------
+# Generación de datos sintéticos
+# ---------------------------------------------------------------------------
+
+def generar_html_pib(n_filas: int, semilla: int = 0) -> str:
+    """
+    Genera una tabla HTML con la misma forma que la tabla del PIB de Wikipedia
+    (país con enlace, región, PIB con separadores de miles). Aproximadamente
+    el 5 % de las filas tienen el PIB como '—'.
+
+    Args:
+        n_filas (int): Número de filas de datos.
+        semilla (int): Semilla del generador aleatorio.
+
+    Returns:
+        str: Documento HTML con un único <tbody>.
+    """
+    rng = random.Random(semilla)
+    partes = ["<table><tbody><tr><th>Country</th><th>Region</th><th>GDP</th></tr>"]
+    for i in range(n_filas):
+        pib = "—" if rng.random() < 0.05 else f"{rng.randint(1_000, 25_000_000):,}"
+        partes.append(
+            f'<tr><td><a href="/wiki/C{i}">Country {i}</a></td>'
+            f"<td>Region</td><td>{pib}</td></tr>"
+        )
+    partes.append("</tbody></table>")
+    return "".join(partes)
+
+
+# ---------------------------------------------------------------------------
+# Implementaciones a comparar
+# ---------------------------------------------------------------------------
+
+def extraer_original(rows, table_attribs):
+    """Bucle original de etl_project_gdp.extract (pd.concat por fila)."""
+    df = pd.DataFrame(columns=table_attribs)
+    for row in rows:
+        col = row.find_all('td')
+        if len(col) != 0:
+            if col[0].find('a') is not None and '—' not in col[2]:
+                data_dict = {
+                    "Country": col[0].a.contents[0],
+                    "GDP_USD_millions": col[2].contents[0]
+                }
+                df1 = pd.DataFrame(data_dict, index=[0])
+                df = pd.concat([df, df1], ignore_index=True)
+    return df
+
+
+def extraer_fila_pib(row):
+    """Misma regla de filtrado que etl_project_gdp.extraer_fila_pib."""
+    col = row.find_all('td')
+    if len(col) != 0:
+        if col[0].find('a') is not None and '—' not in col[2]:
+            return col[0].a.contents[0], col[2].contents[0]
+    return None
+
+
+def extraer_columnar(rows, table_attribs):
+    """Motor columnar de etl_comun.tablas_html."""
+    return construir_dataframe(rows, table_attribs, extraer_fila_pib)
+
+
+# ---------------------------------------------------------------------------
+# Ejecución
+# ---------------------------------------------------------------------------
+
+def medir(funcion, *args):
+    """Devuelve (resultado, segundos) de una llamada."""
+    inicio = time.perf_counter()
+    resultado = funcion(*args)
+    return resultado, time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tamanos", type=int, nargs="+",
+                        default=[200, 2_000, 20_000, 200_000])
+    parser.add_argument("--max-original", type=int, default=20_000,
+                        help="Tamaño máximo para la implementación original (cuadrática)")
+    args = parser.parse_args()
+
+    print(f"{'filas':>10} {'original (s)':>14} {'columnar (s)':>14} {'aceleración':>12}")
+    for n in args.tamanos:
+        rows = BeautifulSoup(generar_html_pib(n), 'html.parser').find('tbody').find_all('tr')
+
+        df_nuevo, t_nuevo = medir(extraer_columnar, rows, COLUMNAS)
+
+        if n <= args.max_original:
+            df_original, t_original = medir(extraer_original, rows, COLUMNAS)
+            assert df_original.astype(str).equals(df_nuevo.astype(str)), "Resultados distintos"
+            print(f"{n:>10} {t_original:>14.4f} {t_nuevo:>14.4f} {t_original / t_nuevo:>11.1f}x")
+        else:
+            print(f"{n:>10} {'(omitido)':>14} {t_nuevo:>14.4f} {'-':>12}")
+
+
+if __name__ == "__main__":
+    main()
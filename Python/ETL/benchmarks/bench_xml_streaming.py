@@ -0,0 +1,136 @@
+"""
+Benchmark: lectura XML completa vs. streaming
+=============================================
+
+Compara el parser original de `etl_code.extract_from_xml` (ET.parse +
+pd.concat por cada <person>) contra la lectura en streaming de
+`etl_code.etl_streaming` (ET.iterparse por bloques), sobre archivos
+generados con la misma forma que `source1.xml`.
+
+Cada medición se ejecuta en un proceso independiente para reportar el pico
+de memoria residente (RSS) de forma aislada.
+
+Uso:
+    python bench_xml_streaming.py
+    python bench_xml_streaming.py --tamanos 10000 1000000 --chunk-size 20000
+
+Autor: Fernando Blanco
+"""
+
+import argparse
+import multiprocessing as mp
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "ETL_basics" / "XML, JSON - CSV"))
+import etl_code
+
+
+# ---------------------------------------------------------------------------
+# Generación de datos sintéticos
+# ---------------------------------------------------------------------------
+
+def generar_xml_personas(ruta: str, n_registros: int, semilla: int = 0) -> None:
+    """
+    Escribe un archivo XML con `n_registros` elementos <person> con la misma
+    estructura que source1.xml (name, height, weight).
+
+    Args:
+        ruta (str): Ruta del archivo a generar.
+        n_registros (int): Número de registros <person>.
+        semilla (int): Semilla del generador aleatorio.
+    """
+    rng = random.Random(semilla)
+    with open(ruta, "w", encoding="utf-8") as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n<data>\n')
+        for i in range(n_registros):
+            f.write(
+                "   <person>\n"
+                f"      <name>persona{i}</name>\n"
+                f"      <height>{rng.uniform(60, 76):.2f}</height>\n"
+                f"      <weight>{rng.uniform(100, 160):.2f}</weight>\n"
+                "   </person>\n"
+            )
+        f.write("</data>\n")
+
+
+# ---------------------------------------------------------------------------
+# Implementaciones a comparar
+# ---------------------------------------------------------------------------
+
+def etl_xml_original(file_to_process: str, target_file: str) -> int:
+    """Parser original (ET.parse + pd.concat por registro) seguido de transform y carga."""
+    dataframe = pd.DataFrame(columns=["name", "height", "weight"])
+    tree = ET.parse(file_to_process)
+    root = tree.getroot()
+    for person in root:
+        name = person.find("name").text
+        height = float(person.find("height").text)
+        weight = float(person.find("weight").text)
+        dataframe = pd.concat(
+            [dataframe, pd.DataFrame([{"name": name, "height": height, "weight": weight}])],
+            ignore_index=True
+        )
+    etl_code.load_data(target_file, etl_code.transform(dataframe))
+    return len(dataframe)
+
+
+def _ejecutar(modo: str, ruta_xml: str, ruta_csv: str, chunk_size: int, cola) -> None:
+    """Ejecuta un modo en un proceso hijo y devuelve (segundos, registros, RSS máx. en MB)."""
+    inicio = time.perf_counter()
+    if modo == "original":
+        registros = etl_xml_original(ruta_xml, ruta_csv)
+    else:
+        registros = etl_code.etl_streaming(ruta_xml, ruta_csv, chunk_size)
+    segundos = time.perf_counter() - inicio
+    rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # Linux: KiB
+    cola.put((segundos, registros, rss_mb))
+
+
+def medir(modo: str, ruta_xml: str, ruta_csv: str, chunk_size: int):
+    """Lanza `_ejecutar` en un proceso nuevo y devuelve sus resultados."""
+    cola = mp.Queue()
+    proceso = mp.Process(target=_ejecutar, args=(modo, ruta_xml, ruta_csv, chunk_size, cola))
+    proceso.start()
+    resultado = cola.get()
+    proceso.join()
+    return resultado
+
+
+# ---------------------------------------------------------------------------
+# Ejecución
+# ---------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tamanos", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--chunk-size", type=int, default=etl_code.read_chunk_size)
+    parser.add_argument("--max-original", type=int, default=10_000,
+                        help="Tamaño máximo para el parser original (cuadrático)")
+    args = parser.parse_args()
+
+    print(f"{'registros':>10} {'MB xml':>8} {'modo':>10} {'segundos':>10} {'RSS máx (MB)':>13}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.tamanos:
+            ruta_xml = os.path.join(tmp, f"personas_{n}.xml")
+            ruta_csv = os.path.join(tmp, f"personas_{n}.csv")
+            generar_xml_personas(ruta_xml, n)
+            mb_xml = os.path.getsize(ruta_xml) / 1_048_576
+
+            modos = ["streaming"] + (["original"] if n <= args.max_original else [])
+            for modo in modos:
+                segundos, registros, rss_mb = medir(modo, ruta_xml, ruta_csv, args.chunk_size)
+                assert registros == n, f"{modo}: {registros} registros, se esperaban {n}"
+                print(f"{n:>10} {mb_xml:>8.1f} {modo:>10} {segundos:>10.3f} {rss_mb:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
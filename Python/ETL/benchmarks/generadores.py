@@ -0,0 +1,195 @@
+"""
+Generadores de datos sintéticos para los benchmarks
+===================================================
+
+Escriben en disco, en streaming (sin construir el contenido completo en
+memoria), entradas con la forma de las de cada proceso ETL y con cualquier
+número de filas:
+
+    - escribir_personas:     archivos CSV / JSON lines / XML de etl_code.py.
+    - escribir_pagina_pib:   página con la tabla del PIB (etl_project_gdp.py).
+    - escribir_pagina_bancos: página con la tabla "By market capitalization"
+                             (banks_project.py).
+    - escribir_tasas:        exchange_rate.csv (banks_project.py).
+    - escribir_instructores: INSTRUCTOR.csv sin encabezado (db_code.py).
+
+Todos son deterministas para una misma semilla.
+
+Autor: Fernando Blanco
+"""
+
+import os
+import random
+from typing import Dict, Iterable, Sequence
+
+BLOQUE = 100_000                        # Líneas generadas por escritura
+TASAS_REALES = {"EUR": 0.93, "GBP": 0.8, "INR": 82.95}
+ANCLA_BANCOS = "By_market_capitalization"
+
+
+def _escribir_lineas(f, lineas: Iterable[str]) -> None:
+    """Escribe las líneas en bloques de BLOQUE para limitar el uso de memoria."""
+    bloque = []
+    for linea in lineas:
+        bloque.append(linea)
+        if len(bloque) >= BLOQUE:
+            f.write("".join(bloque))
+            bloque.clear()
+    f.write("".join(bloque))
+
+
+# ---------------------------------------------------------------------------
+# etl_code.py: personas en CSV, JSON y XML
+# ---------------------------------------------------------------------------
+
+def escribir_personas(directorio: str, n_registros: int,
+                      formatos: Sequence[str] = ("csv", "json", "xml"),
+                      semilla: int = 0) -> Dict[str, str]:
+    """
+    Reparte `n_registros` personas (name, height, weight) entre un archivo
+    por formato, con el mismo formato que los source*.csv/json/xml.
+
+    Args:
+        directorio (str): Directorio destino (se crea si no existe).
+        n_registros (int): Total de registros entre todos los archivos.
+        formatos (Sequence[str]): Formatos a generar ("csv", "json", "xml").
+        semilla (int): Semilla del generador aleatorio.
+
+    Returns:
+        Dict[str, str]: Ruta generada por formato.
+    """
+    os.makedirs(directorio, exist_ok=True)
+    rng = random.Random(semilla)
+    rutas = {}
+    for k, formato in enumerate(formatos):
+        n = n_registros // len(formatos) + (1 if k < n_registros % len(formatos) else 0)
+        ruta = rutas[formato] = os.path.join(directorio, f"personas.{formato}")
+        personas = ((f"persona{i}", rng.uniform(60, 76), rng.uniform(100, 160)) for i in range(n))
+        with open(ruta, "w", encoding="utf-8") as f:
+            if formato == "csv":
+                f.write("name,height,weight\n")
+                _escribir_lineas(f, (f"{p},{h:.2f},{w:.2f}\n" for p, h, w in personas))
+            elif formato == "json":
+                _escribir_lineas(f, (f'{{"name":"{p}","height":{h:.2f},"weight":{w:.2f}}}\n'
+                                     for p, h, w in personas))
+            elif formato == "xml":
+                f.write('<?xml version="1.0" encoding="UTF-8"?>\n<data>\n')
+                _escribir_lineas(f, (f"   <person>\n      <name>{p}</name>\n      <height>{h:.2f}</height>\n"
+                                     f"      <weight>{w:.2f}</weight>\n   </person>\n"
+                                     for p, h, w in personas))
+                f.write("</data>\n")
+            else:
+                raise ValueError(f"Formato no soportado: {formato}")
+    return rutas
+
+
+# ---------------------------------------------------------------------------
+# etl_project_gdp.py: página del PIB
+# ---------------------------------------------------------------------------
+
+def escribir_pagina_pib(ruta: str, n_filas: int, semilla: int = 0) -> None:
+    """
+    Página con la forma del artículo del PIB: dos tablas previas y la tabla
+    de países como tercer <tbody> (país con enlace, región, PIB con
+    separadores de miles; ~5 % de filas con '—').
+
+    Args:
+        ruta (str): Archivo HTML destino.
+        n_filas (int): Filas de la tabla de países.
+        semilla (int): Semilla del generador aleatorio.
+    """
+    rng = random.Random(semilla)
+    previa = "<table><tbody><tr><th>Nota</th></tr><tr><td>Dato</td></tr></tbody></table>"
+
+    def filas():
+        for i in range(n_filas):
+            pib = "—" if rng.random() < 0.05 else f"{rng.randint(1_000, 25_000_000):,}"
+            yield (f'<tr><td><a href="/wiki/C{i}">Country {i}</a></td>'
+                   f"<td>Region</td><td>{pib}</td></tr>\n")
+
+    with open(ruta, "w", encoding="utf-8") as f:
+        f.write("<!DOCTYPE html><html><head><title>List of countries by GDP (nominal)</title></head><body>")
+        f.write(previa * 2)
+        f.write("<table><tbody><tr><th>Country</th><th>Region</th><th>GDP</th></tr>\n")
+        _escribir_lineas(f, filas())
+        f.write("</tbody></table></body></html>")
+
+
+# ---------------------------------------------------------------------------
+# banks_project.py: página de bancos y tasas de cambio
+# ---------------------------------------------------------------------------
+
+def escribir_pagina_bancos(ruta: str, n_filas: int, secciones: int = 10, semilla: int = 0) -> None:
+    """
+    Página con la forma del artículo "List of largest banks": secciones de
+    relleno antes y después del encabezado "By market capitalization" y su
+    tabla de `n_filas` bancos.
+
+    Args:
+        ruta (str): Archivo HTML destino.
+        n_filas (int): Filas de la tabla de bancos.
+        secciones (int): Secciones de relleno.
+        semilla (int): Semilla del generador aleatorio.
+    """
+    rng = random.Random(semilla)
+
+    def relleno(i):
+        filas = "".join(f"<tr><td>{k}</td><td>Dato {k}</td></tr>" for k in range(20))
+        return (f'<h2><span class="mw-headline" id="Seccion_{i}">Sección {i}</span></h2>'
+                f"<p>Texto de relleno {i}.</p>"
+                f'<table class="wikitable"><tbody><tr><th>A</th><th>B</th></tr>{filas}</tbody></table>')
+
+    def filas():
+        for r in range(1, n_filas + 1):
+            yield (f'<tr>\n<td>{r}\n</td>\n<td><a href="/wiki/B{r}" title="Bank {r}">Bank {r}</a>\n</td>\n'
+                   f"<td>{rng.uniform(30, 1500):,.2f}\n</td></tr>\n")
+
+    with open(ruta, "w", encoding="utf-8") as f:
+        f.write("<!DOCTYPE html><html><head><title>List of largest banks</title></head><body>")
+        f.write("".join(relleno(i) for i in range(secciones // 2)))
+        f.write(f'<h2><span class="mw-headline" id="{ANCLA_BANCOS}">By market capitalization</span></h2>'
+                '<table class="wikitable sortable"><tbody><tr>\n<th>Rank\n</th>\n<th>Bank name\n</th>\n'
+                '<th>Market cap<br />(US$ billion)\n</th></tr>\n')
+        _escribir_lineas(f, filas())
+        f.write("</tbody></table>")
+        f.write("".join(relleno(i) for i in range(secciones // 2, secciones)))
+        f.write("</body></html>")
+
+
+def escribir_tasas(ruta: str, n_divisas: int = 3, semilla: int = 0) -> None:
+    """
+    exchange_rate.csv con las divisas reales (EUR, GBP, INR) seguidas de
+    divisas ficticias hasta completar `n_divisas`.
+
+    Args:
+        ruta (str): Archivo CSV destino.
+        n_divisas (int): Número total de divisas.
+        semilla (int): Semilla del generador aleatorio.
+    """
+    rng = random.Random(semilla)
+    tasas = dict(list(TASAS_REALES.items())[:n_divisas])
+    for i in range(len(tasas), n_divisas):
+        tasas[f"C{i:02d}"] = round(rng.uniform(0.1, 150), 4)
+    with open(ruta, "w", encoding="utf-8") as f:
+        f.write("Currency,Rate\n")
+        f.writelines(f"{codigo},{tasa}\n" for codigo, tasa in tasas.items())
+
+
+# ---------------------------------------------------------------------------
+# db_code.py: instructores
+# ---------------------------------------------------------------------------
+
+def escribir_instructores(ruta: str, n_filas: int, semilla: int = 0) -> None:
+    """
+    INSTRUCTOR.csv sin encabezado (ID, FNAME, LNAME, CITY, CCODE).
+
+    Args:
+        ruta (str): Archivo CSV destino.
+        n_filas (int): Número de instructores.
+        semilla (int): Semilla del generador aleatorio.
+    """
+    rng = random.Random(semilla)
+    ciudades = [("TORONTO", "CA"), ("Markham", "CA"), ("Chicago", "US"), ("Paris", "FR"), ("Madrid", "ES")]
+    with open(ruta, "w", encoding="utf-8") as f:
+        _escribir_lineas(f, (f"{i},Nombre{i},Apellido{i},{c},{p}\n"
+                             for i, (c, p) in ((i, rng.choice(ciudades)) for i in range(1, n_filas + 1))))
@@ -0,0 +1,346 @@
+"""
+Suite de benchmarks de los procesos ETL
+=======================================
+
+Mide cada etapa de los cuatro puntos de entrada sobre datos sintéticos
+(ver `generadores.py`) a varias escalas y guarda los resultados para poder
+compararlos entre commits:
+
+    - etl_code: extract, transform, load_data (CSV y Parquet), etl_streaming
+      (XML) y run_incremental (reconstrucción completa).
+    - gdp:      extract_from_html, transform, load_to_csv, load_to_db y run_query.
+    - bancos:   extract_from_html, transform, load_to_csv, load_to_file
+      (Parquet), load_to_db y run_query.
+    - db_code:  extract, load (con clave), run_queries e insert_record (upsert).
+
+Cada combinación (entrada, escala) se ejecuta en un proceso propio, de modo
+que el pico de RSS reportado es el de esa combinación. La suite es
+totalmente offline (ETL_HTTP_OFFLINE=1): las páginas se leen de disco.
+
+Los datos generados se conservan en --datos y se reutilizan entre
+ejecuciones. La escala 10M necesita varios GB de disco y de memoria (las
+etapas que leen una página HTML completa la cargan en memoria).
+
+Los resultados se guardan en resultados/<fecha>_<commit>.json.
+
+Uso:
+    python suite.py                                # todas las entradas y escalas
+    python suite.py --escalas 1k 100k --entradas gdp bancos
+    python suite.py --comparar resultados/A.json   # A contra el resultado más reciente
+    python suite.py --comparar resultados/A.json resultados/B.json
+
+Autor: Fernando Blanco
+"""
+
+import argparse
+import contextlib
+import glob
+import io
+import json
+import multiprocessing
+import os
+import platform
+import queue
+import statistics
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+os.environ["ETL_HTTP_OFFLINE"] = "1"   # Ninguna etapa debe salir a la red
+
+RAIZ = Path(__file__).resolve().parents[1]
+sys.path.append(str(RAIZ))
+sys.path.append(str(Path(__file__).resolve().parent))
+import generadores
+from etl_comun.metricas import Metricas, contar_filas
+
+ESCALAS = {"1k": 1_000, "100k": 100_000, "10M": 10_000_000}
+ENTRADAS = ("etl_code", "gdp", "bancos", "db_code")
+REPETICIONES = 3
+DIRECTORIO_DATOS = Path(__file__).resolve().parent / ".datos"
+DIRECTORIO_RESULTADOS = Path(__file__).resolve().parent / "resultados"
+ESPERA_HIJO_S = 5   # Cada cuánto se comprueba que el proceso hijo siga vivo
+
+
+# ---------------------------------------------------------------------------
+# Datos de entrada
+# ---------------------------------------------------------------------------
+
+def preparar_datos(directorio: Path, entrada: str, n: int) -> Path:
+    """
+    Genera (una sola vez) los datos de una entrada a una escala.
+
+    Returns:
+        Path: Directorio con los datos generados.
+    """
+    destino = directorio / f"{entrada}_{n}"
+    listo = destino / ".listo"
+    if listo.exists():
+        return destino
+    destino.mkdir(parents=True, exist_ok=True)
+    if entrada == "etl_code":
+        generadores.escribir_personas(str(destino / "fuentes"), n)
+    elif entrada == "gdp":
+        generadores.escribir_pagina_pib(str(destino / "pib.html"), n)
+    elif entrada == "bancos":
+        generadores.escribir_pagina_bancos(str(destino / "bancos.html"), n)
+        generadores.escribir_tasas(str(destino / "exchange_rate.csv"))
+    elif entrada == "db_code":
+        generadores.escribir_instructores(str(destino / "INSTRUCTOR.csv"), n)
+    listo.touch()
+    return destino
+
+
+# ---------------------------------------------------------------------------
+# Medición
+# ---------------------------------------------------------------------------
+
+class Medidor:
+    """Ejecuta cada etapa `repeticiones` veces y resume las mediciones."""
+
+    def __init__(self, entrada: str, escala: str, repeticiones: int):
+        self.entrada = entrada
+        self.escala = escala
+        self.repeticiones = repeticiones
+        self.metricas = Metricas(f"bench:{entrada}", archivo=None, archivo_prometheus=None, puerto=None)
+        self.resultados = []
+
+    def __call__(self, etapa: str, funcion, filas=None):
+        """
+        Mide `funcion` como etapa y devuelve el resultado de la última
+        repetición. Las filas se toman de `filas`, del resultado (tabla o
+        número de filas) o quedan sin informar. La salida por consola de la
+        etapa se descarta.
+        """
+        mediciones = []
+        for _ in range(self.repeticiones):
+            with self.metricas.etapa(etapa) as medicion, contextlib.redirect_stdout(io.StringIO()):
+                resultado = funcion()
+                if filas is not None:
+                    medicion["filas"] = filas
+                elif isinstance(resultado, int):   # Etapas que devuelven el número de filas
+                    medicion["filas"] = resultado
+                else:
+                    medicion["filas"] = contar_filas(resultado)
+            mediciones.append(medicion)
+
+        duraciones = [m["duracion_s"] for m in mediciones]
+        mejor = min(mediciones, key=lambda m: m["duracion_s"])
+        self.resultados.append({
+            "entrada": self.entrada,
+            "escala": self.escala,
+            "etapa": etapa,
+            "filas": mejor["filas"],
+            "repeticiones": len(mediciones),
+            "duracion_min_s": mejor["duracion_s"],
+            "duracion_mediana_s": round(statistics.median(duraciones), 6),
+            "cpu_s": mejor["cpu_s"],
+            "filas_por_s": mejor.get("filas_por_s"),
+            "rss_pico_bytes": max((m.get("rss_pico_bytes") or 0) for m in mediciones) or None,
+        })
+        return resultado
+
+
+# ---------------------------------------------------------------------------
+# Etapas por punto de entrada
+# ---------------------------------------------------------------------------
+
+def bench_etl_code(datos: Path, salida: Path, medir: Medidor) -> None:
+    sys.path.append(str(RAIZ / "ETL_basics" / "XML, JSON - CSV"))
+    import etl_code
+
+    etl_code.log_file = str(salida / "log_file.txt")
+    fuentes = str(datos / "fuentes")
+    df = medir("extract", lambda: etl_code.extract(fuentes))
+    df = medir("transform", lambda: etl_code.transform(df.copy()))
+    medir("load_data", lambda: etl_code.load_data(str(salida / "transformed_data.csv"), df), filas=len(df))
+    medir("load_data_parquet", lambda: etl_code.load_data(str(salida / "transformed_data.parquet"), df),
+          filas=len(df))
+    medir("etl_streaming", lambda: etl_code.etl_streaming(str(datos / "fuentes" / "personas.xml"),
+                                                          str(salida / "streaming.csv")))
+    medir("run_incremental", lambda: etl_code.run_incremental(
+        fuentes, target=str(salida / "incremental.csv"), full_rebuild=True)["rows_written"])
+
+
+def bench_gdp(datos: Path, salida: Path, medir: Medidor) -> None:
+    sys.path.append(str(RAIZ / "ETL_Proyectos" / "PROYECTO 1"))
+    import etl_project_gdp as gdp
+
+    page = (datos / "pib.html").read_text(encoding="utf-8")
+    db = str(salida / "World_Economies.db")
+    df = medir("extract_from_html", lambda: gdp.extract_from_html(page, ["Country", "GDP_USD_millions"]))
+    del page
+    df = medir("transform", lambda: gdp.transform(df.copy()))
+    medir("load_to_csv", lambda: gdp.load_to_csv(df, str(salida / "Countries_by_GDP.csv")), filas=len(df))
+    medir("load_to_db", lambda: gdp.load_to_db(df, db, "Countries_by_GDP", key="Country"), filas=len(df))
+    medir("run_query", lambda: gdp.run_query("SELECT * FROM Countries_by_GDP WHERE GDP_USD_billions >= ? "
+                                             "ORDER BY GDP_USD_billions DESC",
+                                             db, params=(100,)))
+
+
+def bench_bancos(datos: Path, salida: Path, medir: Medidor) -> None:
+    sys.path.append(str(RAIZ / "ETL_Proyectos" / "PROYECTO 2"))
+    import banks_project as bancos
+
+    page = (datos / "bancos.html").read_text(encoding="utf-8")
+    db = str(salida / "Banks.db")
+    df = medir("extract_from_html", lambda: bancos.extract_from_html(page, ["Bank name", "MC_USD_Billion"]))
+    del page
+    df = medir("transform", lambda: bancos.transform(df, str(datos / "exchange_rate.csv")))
+    medir("load_to_csv", lambda: bancos.load_to_csv(df, str(salida / "Largest_banks_data.csv")), filas=len(df))
+    medir("load_to_file_parquet", lambda: bancos.load_to_file(df, str(salida / "Largest_banks_data.parquet")),
+          filas=len(df))
+    medir("load_to_db", lambda: bancos.load_to_db(df, db, "Largest_banks", key="Bank name"), filas=len(df))
+    medir("run_query", lambda: bancos.run_query('SELECT * FROM Largest_banks WHERE MC_USD_Billion >= ? '
+                                                'ORDER BY MC_USD_Billion DESC',
+                                                db, params=(100,)))
+
+
+def bench_db_code(datos: Path, salida: Path, medir: Medidor) -> None:
+    sys.path.append(str(RAIZ / "ETL_basics" / "SQLITE - CSV"))
+    import db_code
+    from etl_comun.sqlite_pool import obtener_pool
+
+    pool = obtener_pool(str(salida / "STAFF.db"))
+    df = medir("extract", lambda: db_code.extract(str(datos / "INSTRUCTOR.csv")))
+    medir("load", lambda: db_code.load(df, pool), filas=len(df))
+    medir("run_queries", lambda: db_code.run_queries(pool), filas=len(df))
+    medir("insert_record", lambda: db_code.insert_record(pool), filas=1)
+    pool.cerrar()
+
+
+BENCHMARKS = {"etl_code": bench_etl_code, "gdp": bench_gdp, "bancos": bench_bancos, "db_code": bench_db_code}
+
+
+def _ejecutar(entrada: str, escala: str, datos: str, repeticiones: int, cola) -> None:
+    """Ejecuta una entrada a una escala en un proceso hijo y devuelve sus resultados por la cola."""
+    medir = Medidor(entrada, escala, repeticiones)
+    try:
+        with tempfile.TemporaryDirectory() as salida:
+            BENCHMARKS[entrada](Path(datos), Path(salida), medir)
+        cola.put((medir.resultados, None))
+    except Exception as e:  # Se informa y se continúa con las demás combinaciones
+        cola.put((medir.resultados, f"{type(e).__name__}: {e}"))
+
+
+def _esperar(proceso, cola) -> tuple[list, str | None]:
+    """
+    Espera los resultados de un proceso hijo sin bloquearse si este muere.
+
+    Si el hijo termina sin entregar resultados (OOM, señal, fallo del
+    intérprete) se devuelve un error con su código de salida.
+
+    Returns:
+        tuple: (resultados, error o None).
+    """
+    while True:
+        try:
+            return cola.get(timeout=ESPERA_HIJO_S)
+        except queue.Empty:
+            if proceso.is_alive():
+                continue
+        try:  # El hijo pudo entregar los resultados justo antes de terminar
+            return cola.get(timeout=1)
+        except queue.Empty:
+            return [], f"Proceso hijo terminado sin resultados (exitcode={proceso.exitcode})"
+
+
+# ---------------------------------------------------------------------------
+# Resultados
+# ---------------------------------------------------------------------------
+
+def _git(*args) -> str:
+    try:
+        return subprocess.run(["git", *args], cwd=RAIZ, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def metadatos() -> dict:
+    """Commit, entorno y fecha de la ejecución."""
+    return {
+        "commit": _git("rev-parse", "HEAD") or None,
+        "rama": _git("rev-parse", "--abbrev-ref", "HEAD") or None,
+        "cambios_sin_commit": bool(_git("status", "--porcelain", "--", ".")),
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def comparar(base: str, nuevo: str) -> None:
+    """Imprime la razón de tiempos (nuevo / base) por entrada, escala y etapa."""
+    def cargar(ruta):
+        with open(ruta, encoding="utf-8") as f:
+            datos = json.load(f)
+        return datos["meta"], {(r["entrada"], r["escala"], r["etapa"]): r for r in datos["resultados"]}
+
+    meta_base, res_base = cargar(base)
+    meta_nuevo, res_nuevo = cargar(nuevo)
+    print(f"base:  {(meta_base['commit'] or '?')[:10]} ({meta_base['fecha']})")
+    print(f"nuevo: {(meta_nuevo['commit'] or '?')[:10]} ({meta_nuevo['fecha']})")
+    print(f"{'entrada':<10}{'escala':>7} {'etapa':<20}{'base (s)':>11}{'nuevo (s)':>11}{'razón':>8}")
+    for clave in sorted(res_base.keys() & res_nuevo.keys()):
+        t_base, t_nuevo = res_base[clave]["duracion_min_s"], res_nuevo[clave]["duracion_min_s"]
+        razon = t_nuevo / t_base if t_base else float("nan")
+        marca = "  <-- más lento" if razon > 1.1 else ""
+        print(f"{clave[0]:<10}{clave[1]:>7} {clave[2]:<20}{t_base:>11.4f}{t_nuevo:>11.4f}{razon:>7.2f}x{marca}")
+
+
+# ---------------------------------------------------------------------------
+# Ejecución
+# ---------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--escalas", nargs="+", choices=ESCALAS, default=list(ESCALAS))
+    parser.add_argument("--entradas", nargs="+", choices=ENTRADAS, default=list(ENTRADAS))
+    parser.add_argument("--repeticiones", type=int, default=REPETICIONES,
+                        help="Repeticiones por etapa (1 para escalas de 1M filas o más)")
+    parser.add_argument("--datos", default=str(DIRECTORIO_DATOS), help="Directorio de datos generados")
+    parser.add_argument("--salida", default=str(DIRECTORIO_RESULTADOS), help="Directorio de resultados")
+    parser.add_argument("--comparar", nargs="+", metavar="RESULTADO",
+                        help="Compara dos archivos de resultados (o uno contra el más reciente)")
+    args = parser.parse_args()
+
+    if args.comparar:
+        archivos = list(args.comparar)
+        if len(archivos) == 1:
+            archivos.append(max(glob.glob(os.path.join(args.salida, "*.json")), key=os.path.getmtime))
+        comparar(*archivos[:2])
+        return
+
+    resultados, errores = [], {}
+    for escala in args.escalas:
+        n = ESCALAS[escala]
+        repeticiones = 1 if n >= 1_000_000 else args.repeticiones
+        for entrada in args.entradas:
+            print(f"[{escala}] {entrada}: preparando datos...", flush=True)
+            datos = preparar_datos(Path(args.datos), entrada, n)
+            cola = multiprocessing.Queue()
+            proceso = multiprocessing.Process(target=_ejecutar, args=(entrada, escala, str(datos), repeticiones, cola))
+            proceso.start()
+            parciales, error = _esperar(proceso, cola)
+            proceso.join()
+            resultados += parciales
+            for r in parciales:
+                print(f"[{escala}] {entrada:<9} {r['etapa']:<20} {r['duracion_min_s']:>10.4f} s"
+                      f"  {r['filas_por_s'] or 0:>14,.0f} filas/s")
+            if error:
+                errores[f"{entrada}:{escala}"] = error
+                print(f"[{escala}] {entrada}: ERROR {error}")
+
+    meta = metadatos()
+    os.makedirs(args.salida, exist_ok=True)
+    nombre = f"{datetime.now():%Y%m%d-%H%M%S}_{(meta['commit'] or 'sin-commit')[:10]}.json"
+    ruta = os.path.join(args.salida, nombre)
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump({"meta": meta, "resultados": resultados, "errores": errores}, f, ensure_ascii=False, indent=2)
+    print(f"Resultados guardados en {ruta}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,13 @@
+"""
+Paquete etl_comun
+=================
+
+Utilidades compartidas por los distintos procesos ETL del repositorio
+(ETL_basics y ETL_Proyectos).
+
+Los scripts de cada proyecto viven en carpetas con espacios en el nombre
+(p. ej. "PROYECTO 1"), por lo que no pueden importarse entre sí como
+paquetes; este paquete reúne el código reutilizable en un único lugar.
+
+Autor: Fernando Blanco
+"""
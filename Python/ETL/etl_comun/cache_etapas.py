@@ -0,0 +1,331 @@
+"""
+Caché de resultados intermedios entre etapas
+============================================
+
+Guarda en disco la salida (DataFrame) de una etapa del pipeline, por
+ejemplo extract + transform, para que una ejecución posterior con las mismas
+entradas no la vuelva a calcular: recargar los datos en otra tabla SQLite o
+en otro CSV pasa directamente a la fase de carga.
+
+    - Cada resultado se escribe como archivo Arrow IPC sin comprimir y se
+      vuelve a abrir mapeado en memoria, sin deserializarlo ni copiarlo:
+      pyarrow entrega las columnas numéricas como arreglos de solo lectura
+      sobre el mapeo. Reemplazar columnas o agregar otras funciona igual
+      que con el DataFrame de un fallo, pero escribir valores dentro de una
+      columna (df.loc[i, col] = ...) falla; las etapas cuyo resultado se
+      modifica así se decoran con modificable=True, que copia esas
+      columnas al leerlas.
+    - La clave es un hash de los argumentos de la etapa (contenido de los
+      DataFrame; ruta, tamaño y fecha de modificación de los archivos), del
+      código fuente de la etapa y de sus dependencias y de la configuración
+      indicada (evaluada en cada llamada si es una función). Cambiar
+      cualquiera de ellos produce una entrada nueva.
+    - Las entradas más antiguas que `max_edad` se descartan y, si el tamaño
+      total supera `max_bytes`, se eliminan las usadas hace más tiempo (LRU).
+
+Requiere pyarrow; sin él (o con ETL_CACHE_ETAPAS=0) la etapa se ejecuta
+siempre. El directorio por defecto se configura con ETL_CACHE_ETAPAS_DIR.
+
+El módulo no importa pandas ni pyarrow hasta la primera etapa que cachea,
+de modo que decorar las etapas de un script no encarece su importación.
+
+Autor: Fernando Blanco
+"""
+
+from __future__ import annotations   # Las anotaciones pd.DataFrame no importan pandas
+
+import functools
+import hashlib
+import importlib.util
+import inspect
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from types import ModuleType
+from typing import Callable, Iterable, Optional
+
+# ---------------------------------------------------------------------------
+# Configuración por defecto
+# ---------------------------------------------------------------------------
+
+DIRECTORIO_CACHE = os.environ.get(
+    "ETL_CACHE_ETAPAS_DIR", str(Path(__file__).resolve().parents[1] / ".cache_etapas")
+)
+MAX_EDAD_SEGUNDOS = 24 * 60 * 60       # Igual que la vigencia de la caché HTTP
+MAX_BYTES = 1024 * 1024 * 1024         # Tamaño máximo de la caché en disco
+ACTIVA = os.environ.get("ETL_CACHE_ETAPAS", "1") not in ("", "0")
+VERSION_FORMATO = 1                    # Cambiarla invalida todas las entradas
+
+# pyarrow es opcional: sin él la caché queda desactivada
+has_pyarrow = importlib.util.find_spec("pyarrow") is not None
+
+
+# ---------------------------------------------------------------------------
+# Huellas de entradas y de código
+# ---------------------------------------------------------------------------
+
+def _es_tabla(valor, tipos=("DataFrame", "Series")) -> bool:
+    """Indica si `valor` es un DataFrame (o Series) de pandas, sin importar pandas."""
+    pd = sys.modules.get("pandas")
+    return pd is not None and isinstance(valor, tuple(getattr(pd, tipo) for tipo in tipos))
+
+
+def _actualizar_huella(h, valor) -> None:
+    """Agrega `valor` al hash `h` según su tipo."""
+    if _es_tabla(valor):
+        import pandas as pd
+        h.update(b"df")
+        h.update(repr(getattr(valor, "dtypes", valor.dtype)).encode("utf-8"))
+        h.update(repr(list(getattr(valor, "columns", [valor.name]))).encode("utf-8"))
+        h.update(pd.util.hash_pandas_object(valor, index=True).to_numpy().tobytes())
+    elif isinstance(valor, (str, Path)) and os.path.isfile(valor):
+        stat = os.stat(valor)
+        h.update(f"archivo:{os.path.abspath(valor)}:{stat.st_size}:{stat.st_mtime_ns}".encode("utf-8"))
+    elif isinstance(valor, (list, tuple)):
+        h.update(f"{type(valor).__name__}:{len(valor)}".encode("utf-8"))
+        for elemento in valor:
+            _actualizar_huella(h, elemento)
+    elif isinstance(valor, dict):
+        h.update(f"dict:{len(valor)}".encode("utf-8"))
+        for clave in sorted(valor, key=repr):
+            _actualizar_huella(h, clave)
+            _actualizar_huella(h, valor[clave])
+    else:
+        h.update(f"{type(valor).__name__}:{valor!r}".encode("utf-8"))
+
+
+@functools.lru_cache(maxsize=None)
+def huella_codigo(objeto) -> str:
+    """
+    Hash del código de una función (su código fuente) o de un módulo (el
+    contenido de su archivo).
+
+    Args:
+        objeto (Callable | ModuleType): Función o módulo.
+
+    Returns:
+        str: Hash SHA-256 en hexadecimal.
+    """
+    objeto = inspect.unwrap(objeto) if callable(objeto) else objeto
+    if isinstance(objeto, ModuleType):
+        with open(objeto.__file__, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    try:
+        fuente = inspect.getsource(objeto).encode("utf-8")
+    except (OSError, TypeError):  # Sin código fuente disponible
+        fuente = objeto.__code__.co_code
+    return hashlib.sha256(fuente).hexdigest()
+
+
+# ---------------------------------------------------------------------------
+# Clase: CacheEtapas
+# ---------------------------------------------------------------------------
+
+class CacheEtapas:
+    """
+    Caché en disco de los DataFrame producidos por las etapas de un pipeline.
+
+    Cada entrada se guarda como `<clave>.arrow` (Arrow IPC sin comprimir) y
+    `<clave>.json` (etapa, fecha de creación, filas y columnas). La fecha de
+    modificación de `.arrow` marca el último acceso y se usa para la
+    expulsión LRU.
+
+    Args:
+        directorio (str): Carpeta donde se guardan las entradas.
+        max_edad (float): Segundos tras los que una entrada deja de usarse.
+        max_bytes (int): Tamaño máximo de los archivos almacenados.
+        activa (bool): Si es False, las etapas se ejecutan siempre.
+    """
+
+    def __init__(self, directorio: str = DIRECTORIO_CACHE, max_edad: float = MAX_EDAD_SEGUNDOS,
+                 max_bytes: int = MAX_BYTES, activa: bool = ACTIVA):
+        self.directorio = Path(directorio)
+        self.max_edad = max_edad
+        self.max_bytes = max_bytes
+        self.activa = activa and has_pyarrow
+        self.aciertos = 0
+        self.fallos = 0
+        self._lock = threading.Lock()
+
+    # -----------------------------------------------------------------------
+    # Claves y rutas
+    # -----------------------------------------------------------------------
+
+    def clave(self, etapa: str, funcion: Callable, args: tuple = (), kwargs: Optional[dict] = None,
+              dependencias: Iterable = (), configuracion=None) -> str:
+        """
+        Clave de una ejecución de la etapa.
+
+        Args:
+            etapa (str): Nombre de la etapa.
+            funcion (Callable): Función de la etapa.
+            args (tuple): Argumentos posicionales de la llamada.
+            kwargs (dict | None): Argumentos por nombre de la llamada.
+            dependencias (Iterable): Funciones o módulos cuyo código también
+                determina el resultado.
+            configuracion: Valores adicionales que determinan el resultado.
+
+        Returns:
+            str: Hash SHA-256 en hexadecimal.
+        """
+        h = hashlib.sha256(f"v{VERSION_FORMATO}:{etapa}".encode("utf-8"))
+        for objeto in (funcion, *dependencias):
+            h.update(huella_codigo(objeto).encode("ascii"))
+        for valor in (args, kwargs or {}, configuracion):
+            _actualizar_huella(h, valor)
+        return h.hexdigest()
+
+    def _rutas(self, clave: str):
+        return self.directorio / f"{clave}.arrow", self.directorio / f"{clave}.json"
+
+    # -----------------------------------------------------------------------
+    # Lectura, escritura y expulsión
+    # -----------------------------------------------------------------------
+
+    def obtener(self, clave: str, modificable: bool = False) -> Optional[pd.DataFrame]:
+        """
+        Devuelve el DataFrame de la entrada (leído del archivo mapeado en
+        memoria) o None si no existe o ha vencido.
+
+        Args:
+            clave (str): Clave de la entrada (ver `clave`).
+            modificable (bool): Copiar las columnas de solo lectura (las
+                numéricas, que apuntan al mapeo) para poder escribir en
+                ellas. Por defecto no se copian.
+
+        Returns:
+            pd.DataFrame | None: Resultado almacenado.
+        """
+        import pyarrow as pa
+
+        ruta_arrow, ruta_meta = self._rutas(clave)
+        try:
+            with open(ruta_meta, encoding="utf-8") as f:
+                meta = json.load(f)
+            if time.time() - meta["creado"] > self.max_edad:
+                return None
+            tabla = pa.ipc.open_file(pa.memory_map(str(ruta_arrow), "r")).read_all()
+            os.utime(ruta_arrow)
+        except (FileNotFoundError, json.JSONDecodeError, KeyError, pa.ArrowInvalid):
+            return None
+        # split_blocks evita consolidar las columnas (y con ello una segunda copia)
+        df = tabla.to_pandas(split_blocks=True)
+        if not modificable:
+            return df
+        for i in range(df.shape[1]):
+            valores = df.iloc[:, i].values
+            if getattr(valores, "flags", None) is not None and not valores.flags.writeable:
+                df.isetitem(i, df.iloc[:, i].copy())
+        return df
+
+    def guardar(self, clave: str, df: pd.DataFrame, etapa: str = "") -> None:
+        """
+        Guarda un DataFrame de forma atómica y aplica la expulsión.
+
+        Args:
+            clave (str): Clave de la entrada.
+            df (pd.DataFrame): Resultado de la etapa.
+            etapa (str): Nombre de la etapa (solo informativo).
+        """
+        import pyarrow as pa
+
+        ruta_arrow, ruta_meta = self._rutas(clave)
+        meta = {"etapa": etapa, "creado": time.time(), "filas": len(df), "columnas": [str(c) for c in df.columns]}
+        tabla = pa.Table.from_pandas(df)
+        with self._lock:
+            self.directorio.mkdir(parents=True, exist_ok=True)
+            sufijo = f".{os.getpid()}.{threading.get_ident()}.tmp"
+            tmp = ruta_arrow.with_suffix(ruta_arrow.suffix + sufijo)
+            with pa.OSFile(str(tmp), "wb") as destino, pa.ipc.new_file(destino, tabla.schema) as escritor:
+                escritor.write_table(tabla)
+            os.replace(tmp, ruta_arrow)
+            tmp = ruta_meta.with_suffix(ruta_meta.suffix + sufijo)
+            tmp.write_text(json.dumps(meta), encoding="utf-8")
+            os.replace(tmp, ruta_meta)
+            self._expulsar()
+
+    def _expulsar(self) -> None:
+        """Elimina las entradas vencidas y las menos usadas hasta respetar `max_bytes`."""
+        ahora = time.time()
+        entradas = []
+        for ruta_arrow in self.directorio.glob("*.arrow"):
+            ruta_meta = ruta_arrow.with_suffix(".json")
+            try:
+                stat = ruta_arrow.stat()
+                with open(ruta_meta, encoding="utf-8") as f:
+                    creado = json.load(f)["creado"]
+            except FileNotFoundError:
+                continue
+            except (json.JSONDecodeError, KeyError):
+                creado = 0   # Metadatos dañados: la entrada se considera vencida
+            if ahora - creado > self.max_edad:
+                ruta_arrow.unlink(missing_ok=True)
+                ruta_meta.unlink(missing_ok=True)
+                continue
+            entradas.append((stat.st_mtime, stat.st_size, ruta_arrow))
+
+        total = sum(size for _, size, _ in entradas)
+        for _, size, ruta_arrow in sorted(entradas):
+            if total <= self.max_bytes:
+                break
+            ruta_arrow.unlink(missing_ok=True)
+            ruta_arrow.with_suffix(".json").unlink(missing_ok=True)
+            total -= size
+
+    def limpiar(self) -> None:
+        """Elimina todas las entradas de la caché."""
+        with self._lock:
+            for patron in ("*.arrow", "*.json"):
+                for ruta in self.directorio.glob(patron):
+                    ruta.unlink(missing_ok=True)
+
+    # -----------------------------------------------------------------------
+    # Decorador
+    # -----------------------------------------------------------------------
+
+    def cachear(self, nombre: Optional[str] = None, dependencias: Iterable = (),
+                configuracion=None, modificable: bool = False) -> Callable:
+        """
+        Decorador que reutiliza el DataFrame devuelto por la función cuando
+        se vuelve a llamar con las mismas entradas y el mismo código.
+
+        Los resultados que no son DataFrame se devuelven sin almacenarse.
+
+        Args:
+            nombre (str | None): Nombre de la etapa (por defecto, el de la función).
+            dependencias (Iterable): Funciones o módulos que usa la etapa; un
+                cambio en su código invalida las entradas.
+            configuracion: Valores adicionales que forman parte de la clave,
+                o una función sin argumentos que los devuelve (se evalúa en
+                cada llamada, p. ej. para leer variables globales de
+                configuración del script).
+            modificable (bool): Ver `obtener`.
+
+        Returns:
+            Callable: Decorador.
+        """
+        dependencias = tuple(dependencias)
+
+        def decorador(funcion):
+            etapa = nombre or funcion.__name__
+
+            @functools.wraps(funcion)
+            def envoltura(*args, **kwargs):
+                if not self.activa:
+                    return funcion(*args, **kwargs)
+                valores = configuracion() if callable(configuracion) else configuracion
+                clave = self.clave(etapa, funcion, args, kwargs, dependencias, valores)
+                df = self.obtener(clave, modificable)
+                if df is not None:
+                    self.aciertos += 1
+                    return df
+                self.fallos += 1
+                resultado = funcion(*args, **kwargs)
+                if _es_tabla(resultado, ("DataFrame",)):
+                    self.guardar(clave, resultado, etapa)
+                return resultado
+            return envoltura
+        return decorador
@@ -0,0 +1,235 @@
+"""
+Caché HTTP en disco para los extractores web
+============================================
+
+Capa de descarga compartida por los scrapers de los proyectos ETL. Guarda el
+contenido de cada URL en disco y, en ejecuciones posteriores:
+
+    - Si la copia tiene menos de `ttl` segundos, la devuelve sin usar la red.
+    - Si está vencida, revalida con ETag / Last-Modified (petición condicional);
+      una respuesta 304 reutiliza la copia local.
+    - Si el tamaño total supera `max_bytes`, elimina las entradas usadas hace
+      más tiempo (LRU). Una respuesta mayor que `max_bytes` no se guarda.
+    - En modo offline sirve exclusivamente desde la caché.
+
+El modo offline y el directorio de la caché por defecto pueden configurarse
+con las variables de entorno ETL_HTTP_OFFLINE=1 y ETL_HTTP_CACHE.
+
+Autor: Fernando Blanco
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+import requests
+
+# ---------------------------------------------------------------------------
+# Configuración por defecto
+# ---------------------------------------------------------------------------
+
+DIRECTORIO_CACHE = os.environ.get(
+    "ETL_HTTP_CACHE", str(Path(__file__).resolve().parents[1] / ".cache_http")
+)
+TTL_SEGUNDOS = 24 * 60 * 60            # Vigencia de una copia antes de revalidar
+MAX_BYTES = 200 * 1024 * 1024          # Tamaño máximo de la caché en disco
+OFFLINE = os.environ.get("ETL_HTTP_OFFLINE", "") not in ("", "0")
+
+
+class ErrorCacheOffline(LookupError):
+    """La URL no está en caché y el modo offline impide descargarla."""
+
+
+# ---------------------------------------------------------------------------
+# Clase: CacheHTTP
+# ---------------------------------------------------------------------------
+
+class CacheHTTP:
+    """
+    Caché de respuestas HTTP en disco, indexada por URL.
+
+    Cada entrada se guarda como dos archivos: `<hash>.body` con el contenido
+    y `<hash>.json` con los metadatos (URL, ETag, Last-Modified y fecha de
+    descarga). La fecha de modificación de `.body` marca el último acceso y
+    se usa para la expulsión LRU.
+
+    Args:
+        directorio (str): Carpeta donde se guardan las entradas.
+        ttl (float): Segundos de vigencia de una copia antes de revalidarla.
+        max_bytes (int): Tamaño máximo del contenido almacenado.
+        offline (bool): Si es True, nunca accede a la red.
+        session (requests.Session | None): Sesión HTTP a reutilizar.
+    """
+
+    def __init__(self, directorio: str = DIRECTORIO_CACHE, ttl: float = TTL_SEGUNDOS,
+                 max_bytes: int = MAX_BYTES, offline: bool = OFFLINE,
+                 session: Optional[requests.Session] = None):
+        self.directorio = Path(directorio)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self.session = session or requests.Session()
+        self._lock = threading.Lock()
+        self.directorio.mkdir(parents=True, exist_ok=True)
+
+    # -----------------------------------------------------------------------
+    # Rutas y lectura/escritura de entradas
+    # -----------------------------------------------------------------------
+
+    def _rutas(self, url: str):
+        clave = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.directorio / f"{clave}.body", self.directorio / f"{clave}.json"
+
+    def _leer(self, url: str):
+        """Devuelve (contenido, metadatos) de la URL, o (None, None) si no existe."""
+        ruta_body, ruta_meta = self._rutas(url)
+        try:
+            with open(ruta_meta, encoding="utf-8") as f:
+                meta = json.load(f)
+            contenido = ruta_body.read_text(encoding="utf-8")
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None, None
+        return contenido, meta
+
+    def _escribir(self, url: str, contenido: str, meta: dict) -> None:
+        """Guarda una entrada de forma atómica y aplica la expulsión LRU."""
+        ruta_body, ruta_meta = self._rutas(url)
+        with self._lock:
+            if len(contenido.encode("utf-8")) > self.max_bytes:
+                # No cabe en la caché: guardarlo solo expulsaría al resto de entradas
+                # (y a sí mismo); se descarta también la copia anterior, ya obsoleta
+                ruta_body.unlink(missing_ok=True)
+                ruta_meta.unlink(missing_ok=True)
+                return
+            for ruta, datos in ((ruta_body, contenido), (ruta_meta, json.dumps(meta))):
+                tmp = ruta.with_suffix(ruta.suffix + f".{os.getpid()}.{threading.get_ident()}.tmp")
+                tmp.write_text(datos, encoding="utf-8")
+                os.replace(tmp, ruta)
+            self._expulsar()
+
+    def _guardar_meta(self, url: str, meta: dict) -> None:
+        _, ruta_meta = self._rutas(url)
+        with self._lock:
+            ruta_meta.write_text(json.dumps(meta), encoding="utf-8")
+
+    def _marcar_acceso(self, url: str) -> None:
+        ruta_body, _ = self._rutas(url)
+        try:
+            os.utime(ruta_body)
+        except FileNotFoundError:
+            pass
+
+    def _expulsar(self) -> None:
+        """Elimina las entradas menos usadas hasta respetar `max_bytes`."""
+        entradas = []
+        for ruta_body in self.directorio.glob("*.body"):
+            try:
+                stat = ruta_body.stat()
+            except FileNotFoundError:
+                continue
+            entradas.append((stat.st_mtime, stat.st_size, ruta_body))
+
+        total = sum(size for _, size, _ in entradas)
+        for _, size, ruta_body in sorted(entradas):
+            if total <= self.max_bytes:
+                break
+            ruta_body.unlink(missing_ok=True)
+            ruta_body.with_suffix(".json").unlink(missing_ok=True)
+            total -= size
+
+    # -----------------------------------------------------------------------
+    # API pública
+    # -----------------------------------------------------------------------
+
+    def obtener(self, url: str, timeout: float = 30) -> str:
+        """
+        Devuelve el contenido (texto) de la URL usando la caché.
+
+        Args:
+            url (str): URL a descargar.
+            timeout (float): Tiempo máximo de espera de la petición en segundos.
+
+        Returns:
+            str: Contenido de la página.
+
+        Raises:
+            ErrorCacheOffline: Si está en modo offline y la URL no está en caché.
+            requests.HTTPError: Si el servidor responde con un error.
+        """
+        contenido, meta = self._leer(url)
+
+        if self.offline:
+            if contenido is None:
+                raise ErrorCacheOffline(f"La URL no está en caché (modo offline): {url}")
+            self._marcar_acceso(url)
+            return contenido
+
+        if contenido is not None and time.time() - meta["descargado"] < self.ttl:
+            self._marcar_acceso(url)
+            return contenido
+
+        # Petición condicional si existe una copia vencida
+        headers = {}
+        if meta is not None:
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+
+        respuesta = self.session.get(url, headers=headers, timeout=timeout)
+        if respuesta.status_code == 304 and contenido is not None:
+            meta["descargado"] = time.time()
+            self._guardar_meta(url, meta)
+            self._marcar_acceso(url)
+            return contenido
+
+        respuesta.raise_for_status()
+        contenido = respuesta.text
+        self._escribir(url, contenido, {
+            "url": url,
+            "etag": respuesta.headers.get("ETag"),
+            "last_modified": respuesta.headers.get("Last-Modified"),
+            "descargado": time.time(),
+        })
+        return contenido
+
+    def limpiar(self) -> None:
+        """Elimina todas las entradas de la caché."""
+        with self._lock:
+            for ruta in self.directorio.glob("*.body"):
+                ruta.unlink(missing_ok=True)
+            for ruta in self.directorio.glob("*.json"):
+                ruta.unlink(missing_ok=True)
+
+
+# ---------------------------------------------------------------------------
+# Función: obtener_pagina
+# ---------------------------------------------------------------------------
+
+_cache_por_defecto = None
+
+
+def obtener_pagina(url: str, cache: Optional[CacheHTTP] = None) -> str:
+    """
+    Descarga una página usando la caché HTTP (por defecto, una instancia
+    compartida configurada con las constantes de este módulo).
+
+    Reemplaza a `requests.get(url).text` en los extractores.
+
+    Args:
+        url (str): URL a descargar.
+        cache (CacheHTTP | None): Caché a utilizar.
+
+    Returns:
+        str: Contenido de la página.
+    """
+    global _cache_por_defecto
+    if cache is None:
+        if _cache_por_defecto is None:
+            _cache_por_defecto = CacheHTTP()
+        cache = _cache_por_defecto
+    return cache.obtener(url)
@@ -0,0 +1,48 @@
+"""
+Importación diferida de dependencias pesadas
+============================================
+
+Los scripts ETL importan pandas, numpy, bs4 o requests aunque solo se use
+una de sus etapas (o ninguna, p. ej. con --help). `importar_diferido`
+registra el módulo sin ejecutarlo: la importación real ocurre la primera vez
+que se accede a uno de sus atributos (`importlib.util.LazyLoader`), de modo
+que el coste de arranque se paga solo en las etapas que lo necesitan.
+
+    pd = importar_diferido("pandas")      # no importa pandas todavía
+    ...
+    pd.DataFrame(...)                     # aquí se importa
+
+Autor: Fernando Blanco
+"""
+
+import importlib.util
+import sys
+from types import ModuleType
+
+
+def importar_diferido(nombre: str) -> ModuleType:
+    """
+    Devuelve el módulo `nombre` sin ejecutarlo hasta el primer acceso a uno
+    de sus atributos. Si ya estaba importado, se devuelve tal cual.
+
+    Args:
+        nombre (str): Nombre completo del módulo (p. ej. "pandas" o
+            "etl_comun.tablas_html").
+
+    Returns:
+        ModuleType: Módulo (diferido o ya cargado).
+
+    Raises:
+        ModuleNotFoundError: Si el módulo no está instalado.
+    """
+    if nombre in sys.modules:
+        return sys.modules[nombre]
+    spec = importlib.util.find_spec(nombre)
+    if spec is None:
+        raise ModuleNotFoundError(f"No se encontró el módulo {nombre}", name=nombre)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    modulo = importlib.util.module_from_spec(spec)
+    sys.modules[nombre] = modulo
+    loader.exec_module(modulo)
+    return modulo
@@ -0,0 +1,357 @@
+"""
+Métricas por etapa de los procesos ETL
+======================================
+
+Instrumenta las etapas de los pipelines (extract, transform, load_to_csv,
+load_to_db, run_query, ...) y registra por cada ejecución:
+
+    - Tiempo real (wall) y tiempo de CPU del proceso.
+    - Pico de RSS del proceso al terminar la etapa y cuánto lo elevó la etapa.
+    - Pico de memoria de Python según tracemalloc (opcional: tracemalloc
+      ralentiza la ejecución, se activa con ETL_METRICAS_TRACEMALLOC=1).
+    - Filas procesadas y rendimiento (filas/s).
+
+Las mediciones se exportan como JSON lines (una línea por etapa, añadida al
+terminarla) y/o en formato de texto de Prometheus, ya sea a un archivo
+(compatible con el "textfile collector" de node_exporter) o servido por HTTP
+en /metrics. El servidor HTTP es uno por proceso y puerto: se inicia con la
+primera medición (no al importar los scripts) y expone las métricas de todos
+los colectores creados en el proceso, de modo que varios pipelines pueden
+ejecutarse uno tras otro en el mismo intérprete.
+
+Configuración por variables de entorno:
+    ETL_METRICAS_ARCHIVO      Archivo JSON lines de mediciones.
+    ETL_METRICAS_PROMETHEUS   Archivo de texto Prometheus, escrito al terminar.
+    ETL_METRICAS_PUERTO       Puerto en el que servir /metrics.
+    ETL_METRICAS_TRACEMALLOC  "1" para medir el pico de tracemalloc.
+
+Autor: Fernando Blanco
+"""
+
+import atexit
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import warnings
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional
+
+try:
+    import resource
+    has_resource = True
+except ImportError:  # Windows
+    has_resource = False
+
+# ---------------------------------------------------------------------------
+# Configuración por defecto
+# ---------------------------------------------------------------------------
+
+ARCHIVO = os.environ.get("ETL_METRICAS_ARCHIVO")
+ARCHIVO_PROMETHEUS = os.environ.get("ETL_METRICAS_PROMETHEUS")
+PUERTO = os.environ.get("ETL_METRICAS_PUERTO")
+TRACEMALLOC = os.environ.get("ETL_METRICAS_TRACEMALLOC", "") not in ("", "0")
+
+# Métricas Prometheus: nombre -> (campo de la medición, tipo, descripción)
+METRICAS_PROMETHEUS = {
+    "etl_etapa_duracion_segundos": ("duracion_s", "gauge", "Tiempo real de la última ejecución de la etapa"),
+    "etl_etapa_cpu_segundos": ("cpu_s", "gauge", "Tiempo de CPU de la última ejecución de la etapa"),
+    "etl_etapa_filas": ("filas", "gauge", "Filas procesadas en la última ejecución de la etapa"),
+    "etl_etapa_filas_por_segundo": ("filas_por_s", "gauge", "Rendimiento de la última ejecución de la etapa"),
+    "etl_etapa_rss_pico_bytes": ("rss_pico_bytes", "gauge", "Pico de RSS del proceso al terminar la etapa"),
+    "etl_etapa_rss_incremento_bytes": ("rss_incremento_bytes", "gauge", "Aumento del pico de RSS durante la etapa"),
+    "etl_etapa_tracemalloc_pico_bytes": ("tracemalloc_pico_bytes", "gauge", "Pico de memoria de Python durante la etapa"),
+}
+CONTADORES_PROMETHEUS = {
+    "etl_etapa_ejecuciones_total": ("ejecuciones", "counter", "Ejecuciones de la etapa"),
+    "etl_etapa_duracion_segundos_total": ("total", "counter", "Tiempo real acumulado de la etapa"),
+}
+
+
+def rss_pico() -> Optional[int]:
+    """Pico de memoria residente (RSS) del proceso en bytes, o None si no está disponible."""
+    if not has_resource:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico if sys.platform == "darwin" else pico * 1024   # Linux informa KiB
+
+
+def contar_filas(resultado, *args) -> Optional[int]:
+    """
+    Filas procesadas por una etapa: las del resultado si es una tabla (o un
+    resumen con la clave "filas"), o si no las del primer argumento tabular
+    (p. ej. el DataFrame de load_to_csv / load_to_db).
+    """
+    if isinstance(resultado, dict) and "filas" in resultado:
+        return resultado["filas"]
+    for objeto in (resultado, *args):
+        forma = getattr(objeto, "shape", None)
+        if forma:
+            return int(forma[0])
+    return None
+
+
+def _valor_prometheus(valor) -> str:
+    return repr(float(valor))
+
+
+def _etiqueta_prometheus(valor: str) -> str:
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# Colectores creados en el proceso y servidores /metrics en ejecución (uno por host y puerto)
+_COLECTORES: List["Metricas"] = []
+_SERVIDORES: Dict[tuple, object] = {}
+_REGISTRO = threading.Lock()
+
+
+def texto_prometheus(colectores: Optional[List["Metricas"]] = None) -> str:
+    """
+    Mediciones de varios colectores en formato de texto de Prometheus, con
+    cada familia de métricas (HELP / TYPE) una sola vez.
+
+    Args:
+        colectores (List[Metricas] | None): Colectores a exponer (por
+            defecto, todos los creados en el proceso).
+
+    Returns:
+        str: Exposición de métricas.
+    """
+    if colectores is None:
+        with _REGISTRO:
+            colectores = list(_COLECTORES)
+    familias: Dict[str, List[str]] = {}
+    for colector in colectores:
+        for metrica, muestras in colector._muestras_prometheus().items():
+            familias.setdefault(metrica, []).extend(muestras)
+
+    lineas = []
+    for metrica, (_, tipo, descripcion) in {**METRICAS_PROMETHEUS, **CONTADORES_PROMETHEUS}.items():
+        if familias.get(metrica):
+            lineas += [f"# HELP {metrica} {descripcion}", f"# TYPE {metrica} {tipo}"] + familias[metrica]
+    return "\n".join(lineas) + "\n"
+
+
+def servir_prometheus(puerto: int, host: str = ""):
+    """
+    Sirve en http://<host>:<puerto>/metrics las métricas de todos los
+    colectores del proceso, desde un hilo en segundo plano. Si ya hay un
+    servidor en ese host y puerto, lo reutiliza.
+
+    Args:
+        puerto (int): Puerto TCP.
+        host (str): Interfaz de escucha (por defecto, todas).
+
+    Returns:
+        http.server.ThreadingHTTPServer: Servidor en ejecución.
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer   # Solo si se sirve /metrics
+
+    with _REGISTRO:
+        servidor = _SERVIDORES.get((host, puerto))
+        if servidor is not None:
+            return servidor
+
+        class Manejador(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                cuerpo = texto_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(cuerpo)))
+                self.end_headers()
+                self.wfile.write(cuerpo)
+
+            def log_message(self, *args):
+                pass
+
+        servidor = _SERVIDORES[(host, puerto)] = ThreadingHTTPServer((host, puerto), Manejador)
+        threading.Thread(target=servidor.serve_forever, name="metricas", daemon=True).start()
+        return servidor
+
+
+# ---------------------------------------------------------------------------
+# Clase: Metricas
+# ---------------------------------------------------------------------------
+
+class Metricas:
+    """
+    Colector de mediciones por etapa de un pipeline.
+
+    Args:
+        pipeline (str): Nombre del pipeline (etiqueta de cada medición).
+        archivo (str | None): Archivo JSON lines al que se añade cada medición.
+        archivo_prometheus (str | None): Archivo Prometheus escrito al terminar
+            el proceso.
+        puerto (int | None): Si se indica, sirve /metrics en ese puerto a
+            partir de la primera medición (ver servir_prometheus). Si el
+            puerto está ocupado se emite un aviso y se sigue midiendo sin
+            servidor.
+        usar_tracemalloc (bool): Mide el pico de tracemalloc de cada etapa.
+    """
+
+    def __init__(self, pipeline: str, archivo: Optional[str] = ARCHIVO,
+                 archivo_prometheus: Optional[str] = ARCHIVO_PROMETHEUS,
+                 puerto: Optional[int] = PUERTO, usar_tracemalloc: bool = TRACEMALLOC):
+        self.pipeline = pipeline
+        self.archivo = archivo
+        self.archivo_prometheus = archivo_prometheus
+        self.usar_tracemalloc = usar_tracemalloc
+        self.mediciones: List[dict] = []
+        self.puerto = int(puerto) if puerto else None
+        self._lock = threading.Lock()
+        if usar_tracemalloc and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        with _REGISTRO:
+            _COLECTORES.append(self)
+        if archivo_prometheus:
+            atexit.register(self.exportar_prometheus, archivo_prometheus)
+
+    # -----------------------------------------------------------------------
+    # Medición
+    # -----------------------------------------------------------------------
+
+    @contextmanager
+    def etapa(self, nombre: str, filas: Optional[int] = None) -> Iterator[dict]:
+        """
+        Mide el bloque `with` como una etapa.
+
+        La medición (dict) se entrega al bloque para que pueda completar
+        `medicion["filas"]` si no se conoce de antemano. Las etapas anidadas
+        reinician el pico de tracemalloc de la etapa que las contiene.
+
+        Args:
+            nombre (str): Nombre de la etapa.
+            filas (int | None): Filas procesadas, si ya se conocen.
+
+        Yields:
+            dict: Medición en curso.
+        """
+        medicion = {"pipeline": self.pipeline, "etapa": nombre, "filas": filas, "ok": True}
+        rss_inicial = rss_pico()
+        if self.usar_tracemalloc:
+            tracemalloc.reset_peak()
+        cpu_inicio = time.process_time()
+        inicio = time.perf_counter()
+        try:
+            yield medicion
+        except BaseException:
+            medicion["ok"] = False
+            raise
+        finally:
+            duracion = time.perf_counter() - inicio
+            medicion["timestamp"] = datetime.now().isoformat(timespec="seconds")
+            medicion["duracion_s"] = round(duracion, 6)
+            medicion["cpu_s"] = round(time.process_time() - cpu_inicio, 6)
+            if medicion["filas"] is not None and duracion > 0:
+                medicion["filas_por_s"] = round(medicion["filas"] / duracion, 1)
+            if rss_inicial is not None:
+                medicion["rss_pico_bytes"] = rss_pico()
+                medicion["rss_incremento_bytes"] = medicion["rss_pico_bytes"] - rss_inicial
+            if self.usar_tracemalloc:
+                medicion["tracemalloc_pico_bytes"] = tracemalloc.get_traced_memory()[1]
+            self.registrar(medicion)
+
+    def instrumentar(self, nombre: Optional[str] = None,
+                     filas: Callable = contar_filas) -> Callable:
+        """
+        Decorador que mide cada llamada a la función como una etapa.
+
+        Args:
+            nombre (str | None): Nombre de la etapa (por defecto, el de la función).
+            filas (Callable): Recibe (resultado, *args) y devuelve las filas
+                procesadas (por defecto, `contar_filas`).
+
+        Returns:
+            Callable: Decorador.
+        """
+        def decorador(funcion):
+            etapa = nombre or funcion.__name__
+
+            @functools.wraps(funcion)
+            def envoltura(*args, **kwargs):
+                with self.etapa(etapa) as medicion:
+                    resultado = funcion(*args, **kwargs)
+                    medicion["filas"] = filas(resultado, *args)
+                return resultado
+            return envoltura
+        return decorador
+
+    def registrar(self, medicion: dict) -> None:
+        """Guarda una medición y, si hay archivo configurado, la añade como JSON line."""
+        if self.puerto:
+            try:
+                servir_prometheus(self.puerto)   # No hace nada si el servidor ya está en marcha
+            except OSError as e:   # Puerto ocupado (p. ej. por otro proceso programado): se sigue midiendo
+                warnings.warn(f"No se pudo servir /metrics en el puerto {self.puerto}: {e}", RuntimeWarning)
+                self.puerto = None
+        with self._lock:
+            self.mediciones.append(medicion)
+            if self.archivo:
+                with open(self.archivo, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(medicion, ensure_ascii=False) + "\n")
+
+    # -----------------------------------------------------------------------
+    # Exportación
+    # -----------------------------------------------------------------------
+
+    def _muestras_prometheus(self) -> Dict[str, List[str]]:
+        """Líneas de muestra de este colector por familia de métricas (sin HELP / TYPE)."""
+        with self._lock:
+            ultimas: Dict[str, dict] = {}
+            resumen = {"ejecuciones": {}, "total": {}}
+            for m in self.mediciones:
+                ultimas[m["etapa"]] = m
+                resumen["ejecuciones"][m["etapa"]] = resumen["ejecuciones"].get(m["etapa"], 0) + 1
+                resumen["total"][m["etapa"]] = resumen["total"].get(m["etapa"], 0.0) + m["duracion_s"]
+
+        def etiquetas(etapa):
+            return f'pipeline="{_etiqueta_prometheus(self.pipeline)}",etapa="{_etiqueta_prometheus(etapa)}"'
+
+        muestras = {}
+        for metrica, (campo, _, _) in METRICAS_PROMETHEUS.items():
+            muestras[metrica] = [f"{metrica}{{{etiquetas(e)}}} {_valor_prometheus(m[campo])}"
+                                 for e, m in ultimas.items() if m.get(campo) is not None]
+        for metrica, (campo, _, _) in CONTADORES_PROMETHEUS.items():
+            muestras[metrica] = [f"{metrica}{{{etiquetas(e)}}} {_valor_prometheus(v)}"
+                                 for e, v in resumen[campo].items()]
+        return muestras
+
+    def texto_prometheus(self) -> str:
+        """
+        Mediciones de este colector en formato de texto de Prometheus: el
+        valor de la última ejecución de cada etapa y contadores de
+        ejecuciones y tiempo total.
+
+        Returns:
+            str: Exposición de métricas.
+        """
+        return texto_prometheus([self])
+
+    def exportar_prometheus(self, ruta: str) -> None:
+        """
+        Escribe las métricas en formato Prometheus de forma atómica.
+
+        Args:
+            ruta (str): Archivo destino (p. ej. <dir>/etl.prom).
+        """
+        temporal = f"{ruta}.tmp"
+        with open(temporal, "w", encoding="utf-8") as f:
+            f.write(self.texto_prometheus())
+        os.replace(temporal, ruta)
+
+    def servir_prometheus(self, puerto: int, host: str = ""):
+        """
+        Sirve /metrics en ese puerto (ver la función servir_prometheus: el
+        servidor es compartido por todos los colectores del proceso).
+
+        Returns:
+            http.server.ThreadingHTTPServer: Servidor en ejecución.
+        """
+        return servir_prometheus(puerto, host)
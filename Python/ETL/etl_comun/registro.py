@@ -0,0 +1,243 @@
+"""
+Registro (log) asíncrono por lotes
+==================================
+
+Sustituye la implementación de `log_progress` de los scripts ETL, que abría
+el archivo, formateaba la fecha con `strftime` y lo cerraba en cada llamada.
+
+    - `log()` solo encola el mensaje (sin E/S ni formateo en el hilo que llama).
+    - Un hilo en segundo plano vacía la cola por lotes sobre el archivo, que
+      permanece abierto, y hace flush después de cada lote.
+    - En JSON lines, cada registro incluye el tiempo transcurrido desde el
+      mensaje anterior y desde el inicio, de modo que la duración de cada
+      fase queda anotada sin cambiar las llamadas existentes; `fase()`
+      registra además inicio, fin y duración de un bloque.
+    - El formato de texto escribe las mismas líneas que los log_progress
+      originales ("<fecha><separador><mensaje>"), más los campos que se
+      pasen explícitamente como clave=valor.
+    - Los mensajes pendientes se escriben al terminar el proceso (atexit) o
+      con `flush()`.
+    - El archivo se abre al crear el registro, así que una ruta inválida
+      falla en el hilo que llama (como el log_progress original); un error
+      posterior del hilo de escritura (p. ej. disco lleno) se lanza en el
+      siguiente `log()` o `flush()`.
+
+Autor: Fernando Blanco
+"""
+
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterator, Optional
+
+# ---------------------------------------------------------------------------
+# Configuración por defecto
+# ---------------------------------------------------------------------------
+
+FORMATO_FECHA = '%Y-%m-%d-%H:%M:%S'   # Mismo formato que los log_progress originales
+SEPARADOR = " : "
+TAMANO_LOTE = 10_000                  # Mensajes máximos escritos por lote
+FORMATOS = ("texto", "jsonl")
+
+_CERRAR = object()
+
+
+# ---------------------------------------------------------------------------
+# Clase: RegistroAsincrono
+# ---------------------------------------------------------------------------
+
+class RegistroAsincrono:
+    """
+    Registro de mensajes en archivo, escrito por un hilo en segundo plano.
+
+    Args:
+        ruta (str): Archivo de log (se abre en modo "append").
+        formato (str): "texto" -> "<fecha><separador><mensaje>" (más los
+            campos como clave=valor); "jsonl" -> un objeto JSON por línea con
+            todos los campos y los tiempos transcurridos.
+        separador (str): Separador entre fecha y mensaje en formato texto.
+        formato_fecha (str): Formato `strftime` de la fecha.
+        tamano_lote (int): Mensajes máximos escritos antes de hacer flush.
+    """
+
+    def __init__(self, ruta: str, formato: str = "texto", separador: str = SEPARADOR,
+                 formato_fecha: str = FORMATO_FECHA, tamano_lote: int = TAMANO_LOTE):
+        if formato not in FORMATOS:
+            raise ValueError(f"Formato de log no válido: {formato} (opciones: {FORMATOS})")
+        self.ruta = ruta
+        self.formato = formato
+        self.separador = separador
+        self.formato_fecha = formato_fecha
+        self.tamano_lote = tamano_lote
+        self._cola = queue.SimpleQueue()
+        self._inicio = time.perf_counter()
+        self._anterior = self._inicio
+        self._cache_fecha = (None, "")   # (segundo, texto): strftime una vez por segundo
+        self._error: Optional[BaseException] = None
+        self._archivo = open(ruta, "a", encoding="utf-8")
+        self._hilo = threading.Thread(target=self._trabajar, name=f"registro:{ruta}", daemon=True)
+        self._hilo.start()
+
+    # -----------------------------------------------------------------------
+    # API pública
+    # -----------------------------------------------------------------------
+
+    def log(self, mensaje: str, **campos) -> None:
+        """
+        Encola un mensaje. Los `campos` adicionales se escriben como
+        clave=valor (texto) o como propiedades del objeto (jsonl).
+
+        Args:
+            mensaje (str): Mensaje descriptivo del progreso o estado del proceso.
+            **campos: Datos estructurados asociados al mensaje.
+
+        Raises:
+            OSError: Si falló la escritura de un lote anterior.
+        """
+        self._verificar()
+        self._cola.put((time.time(), time.perf_counter(), mensaje, campos))
+
+    @contextmanager
+    def fase(self, nombre: str, **campos) -> Iterator[None]:
+        """
+        Registra el inicio y el fin de un bloque con su duración.
+
+        Args:
+            nombre (str): Nombre de la fase (p. ej. "Extracción").
+            **campos: Datos estructurados asociados a la fase.
+        """
+        inicio = time.perf_counter()
+        self.log(f"{nombre} iniciada", fase=nombre, evento="inicio", **campos)
+        try:
+            yield
+        finally:
+            duracion = round(time.perf_counter() - inicio, 6)
+            self.log(f"{nombre} terminada", fase=nombre, evento="fin", duracion_s=duracion, **campos)
+
+    def flush(self, timeout: Optional[float] = None) -> None:
+        """
+        Espera a que todos los mensajes encolados hasta ahora estén escritos.
+
+        Args:
+            timeout (float | None): Espera máxima en segundos.
+
+        Raises:
+            OSError: Si falló la escritura de algún lote.
+        """
+        if self._hilo.is_alive():
+            listo = threading.Event()
+            self._cola.put(listo)
+            listo.wait(timeout)
+        self._verificar()
+
+    def cerrar(self) -> None:
+        """Escribe los mensajes pendientes y detiene el hilo de escritura."""
+        if self._hilo.is_alive():
+            self._cola.put(_CERRAR)
+            self._hilo.join()
+
+    # -----------------------------------------------------------------------
+    # Hilo de escritura
+    # -----------------------------------------------------------------------
+
+    def _verificar(self) -> None:
+        """Lanza en el hilo que llama el error con el que terminó el hilo de escritura."""
+        if self._error is not None:
+            raise self._error
+
+    def _fecha(self, t: float) -> str:
+        segundo = int(t)
+        if self._cache_fecha[0] != segundo:
+            self._cache_fecha = (segundo, datetime.fromtimestamp(segundo).strftime(self.formato_fecha))
+        return self._cache_fecha[1]
+
+    def _formatear(self, t: float, t_perf: float, mensaje: str, campos: dict) -> str:
+        desde_anterior = t_perf - self._anterior
+        self._anterior = t_perf
+        if self.formato == "jsonl":
+            registro = {
+                "timestamp": datetime.fromtimestamp(t).isoformat(timespec="milliseconds"),
+                "mensaje": mensaje,
+                "transcurrido_s": round(t_perf - self._inicio, 6),
+                "desde_anterior_s": round(desde_anterior, 6),
+            }
+            registro.update(campos)
+            return json.dumps(registro, ensure_ascii=False, default=str) + "\n"
+        extra = "".join(f" {clave}={valor}" for clave, valor in campos.items())
+        return f"{self._fecha(t)}{self.separador}{mensaje}{extra}\n"
+
+    def _trabajar(self) -> None:
+        avisos = []
+        try:
+            while True:
+                lote = [self._cola.get()]
+                try:
+                    while len(lote) < self.tamano_lote:
+                        lote.append(self._cola.get_nowait())
+                except queue.Empty:
+                    pass
+
+                lineas, avisos, cerrar = [], [], False
+                for item in lote:
+                    if item is _CERRAR:
+                        cerrar = True
+                    elif isinstance(item, threading.Event):
+                        avisos.append(item)
+                    else:
+                        lineas.append(self._formatear(*item))
+
+                if lineas:
+                    self._archivo.writelines(lineas)
+                    self._archivo.flush()
+                for aviso in avisos:
+                    aviso.set()
+                if cerrar:
+                    return
+        except Exception as e:   # Se lanza en el siguiente log() o flush()
+            self._error = e
+            for aviso in avisos:
+                aviso.set()
+        finally:
+            self._archivo.close()
+
+
+# ---------------------------------------------------------------------------
+# Registro compartido por archivo
+# ---------------------------------------------------------------------------
+
+_registros: Dict[str, RegistroAsincrono] = {}
+_registros_lock = threading.Lock()
+
+
+def obtener_registro(ruta: str, **opciones) -> RegistroAsincrono:
+    """
+    Devuelve el registro asíncrono de un archivo de log, creándolo la primera
+    vez (las `opciones` solo se usan en ese momento).
+
+    Args:
+        ruta (str): Archivo de log.
+        **opciones: Argumentos de `RegistroAsincrono` (formato, separador, ...).
+
+    Returns:
+        RegistroAsincrono: Registro asociado a la ruta absoluta del archivo.
+    """
+    clave = os.path.abspath(ruta)
+    with _registros_lock:
+        registro = _registros.get(clave)
+        if registro is None:
+            registro = _registros[clave] = RegistroAsincrono(clave, **opciones)
+        return registro
+
+
+@atexit.register
+def cerrar_registros() -> None:
+    """Escribe los mensajes pendientes de todos los registros al terminar."""
+    with _registros_lock:
+        for registro in _registros.values():
+            registro.cerrar()
+        _registros.clear()
@@ -0,0 +1,348 @@
+"""
+Salidas tabulares: CSV, Parquet y Feather
+=========================================
+
+Abstracción de los archivos destino de los procesos ETL. Además de CSV, los
+datos transformados pueden escribirse en formatos columnares, más rápidos de
+escribir y de volver a leer y más compactos en disco:
+
+    - "csv":     pandas.to_csv (compresión opcional: gzip, bz2, zstd, ...).
+    - "parquet": pyarrow.parquet (compresión snappy por defecto, zstd, gzip,
+                 ...; tamaño de grupo de filas configurable).
+    - "feather": Arrow IPC / Feather v2 (compresión lz4 por defecto o zstd;
+                 tamaño de lote configurable).
+
+Cada salida puede particionarse por una columna (p. ej. la fecha de la
+captura, "Snapshot"): la ruta pasa a ser un directorio con un subdirectorio
+`<columna>=<valor>` por valor, al estilo Hive, que `leer` vuelve a combinar.
+Los valores nulos van a `<columna>=__HIVE_DEFAULT_PARTITION__` y se leen de
+nuevo como nulos.
+Para escribir por bloques sin mantener todo en memoria se usa `escritor`.
+
+Parquet y Feather requieren pyarrow.
+
+Autor: Fernando Blanco
+"""
+
+import importlib.util
+from abc import ABC, abstractmethod
+import os
+import shutil
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional
+from urllib.parse import quote, unquote
+
+import pandas as pd
+
+# ---------------------------------------------------------------------------
+# Configuración por defecto
+# ---------------------------------------------------------------------------
+
+FORMATOS = {"csv": ".csv", "parquet": ".parquet", "feather": ".feather"}
+EXTENSIONES = {".csv": "csv", ".parquet": "parquet", ".pq": "parquet",
+               ".feather": "feather", ".arrow": "feather", ".ipc": "feather"}
+
+# Directorio de las filas con la columna de partición nula (convención de Hive)
+PARTICION_NULA = "__HIVE_DEFAULT_PARTITION__"
+
+# pyarrow es opcional: solo lo necesitan las salidas columnares
+has_pyarrow = importlib.util.find_spec("pyarrow") is not None
+
+
+def formato_de_ruta(ruta: str) -> str:
+    """
+    Formato de salida según la extensión de la ruta (ignorando la de
+    compresión de CSV, p. ej. "datos.csv.gz").
+
+    Raises:
+        ValueError: Si la extensión no corresponde a ningún formato.
+    """
+    raiz, extension = os.path.splitext(ruta)
+    if extension.lower() in (".gz", ".bz2", ".zst", ".xz", ".zip"):
+        extension = os.path.splitext(raiz)[1]
+    try:
+        return EXTENSIONES[extension.lower()]
+    except KeyError:
+        raise ValueError(f"No se reconoce el formato de salida de {ruta} "
+                         f"(extensiones: {', '.join(EXTENSIONES)})") from None
+
+
+# ---------------------------------------------------------------------------
+# Clase base: Salida
+# ---------------------------------------------------------------------------
+
+class Salida(ABC):
+    """
+    Escritor/lector de tablas en un formato concreto.
+
+    Args:
+        compresion (str | None): Códec de compresión (por defecto, el del formato).
+        tamano_grupo_filas (int | None): Filas por grupo (Parquet) o por lote
+            (Feather); en CSV, filas por escritura.
+    """
+
+    formato = ""
+    extension = ""
+
+    def __init__(self, compresion: Optional[str] = None, tamano_grupo_filas: Optional[int] = None):
+        self.compresion = compresion
+        self.tamano_grupo_filas = tamano_grupo_filas
+
+    # Operaciones sobre un único archivo (las implementa cada formato)
+    @abstractmethod
+    def _escribir_archivo(self, df: pd.DataFrame, ruta: str) -> None:
+        ...
+
+    @abstractmethod
+    def _leer_archivo(self, ruta: str) -> pd.DataFrame:
+        ...
+
+    @abstractmethod
+    def _abrir(self, ruta: str):
+        """Devuelve (escribir_bloque, cerrar) para escribir por bloques."""
+
+    # -----------------------------------------------------------------------
+    # API pública
+    # -----------------------------------------------------------------------
+
+    def escribir(self, df: pd.DataFrame, ruta: str, particion: Optional[str] = None,
+                 agregar: bool = False) -> List[str]:
+        """
+        Escribe la tabla completa.
+
+        Args:
+            df (pd.DataFrame): Datos a escribir.
+            ruta (str): Archivo destino, o directorio si hay partición.
+            particion (str | None): Columna por la que particionar.
+            agregar (bool): Agrega las filas a las existentes. En CSV se
+                escriben al final; en los formatos columnares, que no admiten
+                agregar, el archivo se lee y se reescribe completo.
+
+        Returns:
+            List[str]: Archivos escritos.
+        """
+        if particion is None:
+            if agregar and os.path.exists(ruta):
+                df = pd.concat([self._leer_archivo(ruta), df], ignore_index=True)
+            self._escribir_archivo(df, ruta)
+            return [ruta]
+
+        if not agregar and os.path.isdir(ruta):
+            prefijo = f"{particion}="
+            for nombre in os.listdir(ruta):
+                if nombre.startswith(prefijo):
+                    shutil.rmtree(os.path.join(ruta, nombre))
+        escritos = []
+        for valor, grupo in df.groupby(particion, sort=False, dropna=False):
+            nombre = PARTICION_NULA if pd.isna(valor) else quote(str(valor), safe='')
+            directorio = os.path.join(ruta, f"{particion}={nombre}")
+            os.makedirs(directorio, exist_ok=True)
+            escritos += self.escribir(grupo.drop(columns=particion),
+                                      os.path.join(directorio, f"part-0{self.extension}"), agregar=agregar)
+        return escritos
+
+    def leer(self, ruta: str) -> pd.DataFrame:
+        """
+        Lee un archivo o un directorio particionado (la columna de partición
+        se restaura como texto, y como nulo en `PARTICION_NULA`).
+
+        Args:
+            ruta (str): Archivo o directorio escrito por `escribir`.
+
+        Returns:
+            pd.DataFrame: Tabla leída.
+        """
+        if not os.path.isdir(ruta):
+            return self._leer_archivo(ruta)
+        partes = []
+        for nombre in sorted(os.listdir(ruta)):
+            columna, separador, valor = nombre.partition("=")
+            directorio = os.path.join(ruta, nombre)
+            if not separador or not os.path.isdir(directorio):
+                continue
+            for archivo in sorted(os.listdir(directorio)):
+                if archivo.endswith(self.extension):
+                    parte = self.leer(os.path.join(directorio, archivo))
+                    parte[columna] = pd.NA if valor == PARTICION_NULA else unquote(valor)
+                    partes.append(parte)
+        return pd.concat(partes, ignore_index=True) if partes else pd.DataFrame()
+
+    @contextmanager
+    def escritor(self, ruta: str) -> Iterator[Callable[[pd.DataFrame], None]]:
+        """
+        Escribe un archivo bloque a bloque (un grupo de filas / lote por
+        bloque en los formatos columnares). El archivo se reemplaza.
+
+        Args:
+            ruta (str): Archivo destino.
+
+        Yields:
+            Callable[[pd.DataFrame], None]: Función que escribe un bloque.
+        """
+        escribir_bloque, cerrar = self._abrir(ruta)
+        try:
+            yield escribir_bloque
+        finally:
+            cerrar()
+
+
+# ---------------------------------------------------------------------------
+# Formatos
+# ---------------------------------------------------------------------------
+
+class SalidaCSV(Salida):
+    """CSV sin índice (mismo resultado que el to_csv original)."""
+
+    formato = "csv"
+    extension = ".csv"
+
+    def _escribir_archivo(self, df, ruta, modo="w", encabezado=True):
+        df.to_csv(ruta, index=False, mode=modo, header=encabezado,
+                  compression=self.compresion or "infer", chunksize=self.tamano_grupo_filas)
+
+    def escribir(self, df, ruta, particion=None, agregar=False):
+        if particion is None and agregar and os.path.exists(ruta):
+            self._escribir_archivo(df, ruta, modo="a", encabezado=False)   # Sin reescribir el archivo
+            return [ruta]
+        return super().escribir(df, ruta, particion, agregar)
+
+    def _leer_archivo(self, ruta):
+        return pd.read_csv(ruta, compression=self.compresion or "infer")
+
+    def _abrir(self, ruta):
+        escritos = [0]
+
+        def escribir_bloque(df):
+            self._escribir_archivo(df, ruta, modo="a" if escritos[0] else "w", encabezado=not escritos[0])
+            escritos[0] += 1
+        return escribir_bloque, lambda: None
+
+
+class _SalidaArrow(Salida):
+    """Base de los formatos columnares: convierte los bloques a tablas Arrow."""
+
+    def __init__(self, compresion=None, tamano_grupo_filas=None):
+        if not has_pyarrow:
+            raise ImportError(f"La salida {self.formato} requiere pyarrow (pip install pyarrow)")
+        super().__init__(compresion, tamano_grupo_filas)
+
+    @staticmethod
+    def _tabla(df, schema=None):
+        import pyarrow as pa
+        return pa.Table.from_pandas(df, schema=schema, preserve_index=False)
+
+    def _abrir(self, ruta):
+        estado = {"escritor": None, "schema": None}
+
+        def escribir_bloque(df):
+            tabla = self._tabla(df, estado["schema"])
+            if estado["escritor"] is None:
+                estado["schema"] = tabla.schema
+                estado["escritor"] = self._nuevo_escritor(ruta, tabla.schema)
+            self._escribir_bloque(estado["escritor"], tabla)
+
+        def cerrar():
+            if estado["escritor"] is not None:
+                estado["escritor"].close()
+        return escribir_bloque, cerrar
+
+
+class SalidaParquet(_SalidaArrow):
+    """Parquet (pyarrow); compresión snappy por defecto."""
+
+    formato = "parquet"
+    extension = ".parquet"
+
+    def _escribir_archivo(self, df, ruta):
+        import pyarrow.parquet as pq
+        pq.write_table(self._tabla(df), ruta, compression=self.compresion or "snappy",
+                       row_group_size=self.tamano_grupo_filas)
+
+    def _leer_archivo(self, ruta):
+        import pyarrow.parquet as pq
+        return pq.read_table(ruta).to_pandas()
+
+    def _nuevo_escritor(self, ruta, schema):
+        import pyarrow.parquet as pq
+        return pq.ParquetWriter(ruta, schema, compression=self.compresion or "snappy")
+
+    def _escribir_bloque(self, escritor, tabla):
+        escritor.write_table(tabla, row_group_size=self.tamano_grupo_filas)
+
+
+class SalidaFeather(_SalidaArrow):
+    """Feather v2 / Arrow IPC (pyarrow); compresión lz4 por defecto."""
+
+    formato = "feather"
+    extension = ".feather"
+
+    def _escribir_archivo(self, df, ruta):
+        import pyarrow.feather as feather
+        feather.write_feather(self._tabla(df), ruta, compression=self.compresion or "lz4",
+                              chunksize=self.tamano_grupo_filas)
+
+    def _leer_archivo(self, ruta):
+        import pyarrow.feather as feather
+        return feather.read_table(ruta, memory_map=True).to_pandas()
+
+    def _nuevo_escritor(self, ruta, schema):
+        import pyarrow as pa
+        compresion = None if self.compresion == "uncompressed" else (self.compresion or "lz4")
+        return pa.ipc.new_file(ruta, schema, options=pa.ipc.IpcWriteOptions(compression=compresion))
+
+    def _escribir_bloque(self, escritor, tabla):
+        escritor.write_table(tabla, max_chunksize=self.tamano_grupo_filas)
+
+
+SALIDAS: Dict[str, type] = {"csv": SalidaCSV, "parquet": SalidaParquet, "feather": SalidaFeather}
+
+
+# ---------------------------------------------------------------------------
+# Funciones de conveniencia
+# ---------------------------------------------------------------------------
+
+def crear_salida(formato: str, **opciones) -> Salida:
+    """
+    Crea la salida de un formato.
+
+    Args:
+        formato (str): "csv", "parquet" o "feather".
+        **opciones: compresion, tamano_grupo_filas.
+
+    Returns:
+        Salida: Instancia del formato.
+
+    Raises:
+        ValueError: Si el formato no existe.
+        ImportError: Si el formato requiere pyarrow y no está instalado.
+    """
+    if formato not in SALIDAS:
+        raise ValueError(f"Formato de salida no válido: {formato} (opciones: {', '.join(SALIDAS)})")
+    return SALIDAS[formato](**opciones)
+
+
+def escribir_tabla(df: pd.DataFrame, ruta: str, formato: Optional[str] = None,
+                   particion: Optional[str] = None, agregar: bool = False, **opciones) -> List[str]:
+    """
+    Escribe un DataFrame en el formato indicado o, si no se indica, en el que
+    corresponde a la extensión de `ruta` (ver `Salida.escribir`).
+
+    Returns:
+        List[str]: Archivos escritos.
+    """
+    formato = formato or formato_de_ruta(ruta)
+    return crear_salida(formato, **opciones).escribir(df, ruta, particion=particion, agregar=agregar)
+
+
+def leer_tabla(ruta: str, formato: Optional[str] = None) -> pd.DataFrame:
+    """
+    Lee un archivo o directorio particionado escrito con `escribir_tabla`.
+    Si no se indica el formato, se deduce de la extensión (en directorios
+    particionados, de la de sus archivos).
+    """
+    if formato is None:
+        muestra = ruta
+        if os.path.isdir(ruta):
+            muestra = next((os.path.join(raiz, archivos[0]) for raiz, _, archivos in os.walk(ruta) if archivos), ruta)
+        formato = formato_de_ruta(muestra)
+    return crear_salida(formato).leer(ruta)
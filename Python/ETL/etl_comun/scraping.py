@@ -0,0 +1,137 @@
+"""
+Descarga y análisis concurrente de varias páginas
+=================================================
+
+Permite extraer en un solo proceso varias capturas (snapshots) de una misma
+página, por ejemplo distintas fechas del archivo de Wikipedia en
+web.archive.org:
+
+    - Una única sesión HTTP con pool de conexiones reutilizables.
+    - Reintentos con espera exponencial ante errores de conexión y
+      respuestas 429/5xx.
+    - Un pool de hilos con concurrencia acotada que descarga y analiza cada
+      página, y un único DataFrame final etiquetado por snapshot.
+
+Las descargas pasan por la caché HTTP de `etl_comun.http_cache`.
+
+Autor: Fernando Blanco
+"""
+
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from etl_comun.http_cache import CacheHTTP
+
+# ---------------------------------------------------------------------------
+# Configuración por defecto
+# ---------------------------------------------------------------------------
+
+MAX_WORKERS = 8                 # Descargas simultáneas
+REINTENTOS = 3                  # Reintentos por petición
+BACKOFF = 0.5                   # Factor de espera exponencial entre reintentos (segundos)
+COLUMNA_SNAPSHOT = "Snapshot"   # Columna que identifica la captura de origen
+
+_patron_archivo = re.compile(r"/web/(\d{14})")
+
+
+# ---------------------------------------------------------------------------
+# Función: crear_sesion
+# ---------------------------------------------------------------------------
+
+def crear_sesion(pool_size: int = MAX_WORKERS, reintentos: int = REINTENTOS,
+                 backoff: float = BACKOFF) -> requests.Session:
+    """
+    Crea una sesión HTTP con pool de conexiones y reintentos automáticos.
+
+    Args:
+        pool_size (int): Conexiones máximas por host que se mantienen abiertas.
+        reintentos (int): Número de reintentos por petición.
+        backoff (float): Factor de espera exponencial entre reintentos.
+
+    Returns:
+        requests.Session: Sesión configurada.
+    """
+    retry = Retry(
+        total=reintentos,
+        backoff_factor=backoff,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=("GET", "HEAD"),
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+# ---------------------------------------------------------------------------
+# Función: etiqueta_snapshot
+# ---------------------------------------------------------------------------
+
+def etiqueta_snapshot(url: str) -> str:
+    """
+    Obtiene la etiqueta de la captura a partir de la URL.
+
+    Para URLs de web.archive.org devuelve la fecha de la captura en formato
+    ISO (p. ej. "2023-09-02T18:53:26"); para cualquier otra URL, la propia URL.
+
+    Args:
+        url (str): URL de la captura.
+
+    Returns:
+        str: Etiqueta de la captura.
+    """
+    coincidencia = _patron_archivo.search(url)
+    if not coincidencia:
+        return url
+    t = coincidencia.group(1)
+    return f"{t[0:4]}-{t[4:6]}-{t[6:8]}T{t[8:10]}:{t[10:12]}:{t[12:14]}"
+
+
+# ---------------------------------------------------------------------------
+# Función: extraer_snapshots
+# ---------------------------------------------------------------------------
+
+def extraer_snapshots(urls: List[str], parse: Callable[[str], pd.DataFrame],
+                      max_workers: int = MAX_WORKERS, cache: Optional[CacheHTTP] = None,
+                      reintentos: int = REINTENTOS, backoff: float = BACKOFF) -> pd.DataFrame:
+    """
+    Descarga y analiza varias páginas de forma concurrente y combina los
+    resultados en un único DataFrame.
+
+    Cada página se convierte en DataFrame con `parse` y se le agrega la
+    columna `COLUMNA_SNAPSHOT` (ver `etiqueta_snapshot`). El orden de las
+    filas sigue el orden de `urls`.
+
+    Args:
+        urls (List[str]): URLs de las capturas a extraer.
+        parse (Callable[[str], pd.DataFrame]): Convierte el HTML en DataFrame.
+        max_workers (int): Descargas simultáneas.
+        cache (CacheHTTP | None): Caché a utilizar. Si es None se crea una con
+            la configuración por defecto y una sesión con pool y reintentos.
+        reintentos (int): Reintentos por petición (solo si se crea la sesión).
+        backoff (float): Factor de espera exponencial (solo si se crea la sesión).
+
+    Returns:
+        pd.DataFrame: Filas de todas las capturas, etiquetadas por snapshot.
+    """
+    if cache is None:
+        cache = CacheHTTP(session=crear_sesion(max_workers, reintentos, backoff))
+
+    def procesar(url):
+        df = parse(cache.obtener(url))
+        df[COLUMNA_SNAPSHOT] = etiqueta_snapshot(url)
+        return df
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        frames = list(executor.map(procesar, urls))
+
+    if not frames:
+        return pd.DataFrame(columns=[COLUMNA_SNAPSHOT])
+    return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,258 @@
+"""
+Carga masiva a SQLite
+=====================
+
+Motor de carga para las tablas SQLite de los procesos ETL, pensado para
+reemplazar `df.to_sql(..., if_exists='replace')`:
+
+    - Ajusta la conexión para la carga (WAL, synchronous=OFF, caché y
+      tablas temporales en memoria) y restaura los ajustes al terminar.
+    - Inserta con `executemany` en lotes configurables dentro de una única
+      transacción.
+    - Soporta tres modos: "replace" (recrea la tabla), "append" y "upsert"
+      (INSERT ... ON CONFLICT DO UPDATE sobre una clave natural, p. ej.
+      `Country`, `Bank name` o `ID`). En modo "upsert", con
+      `eliminar_faltantes=True`, la tabla queda igual a la fuente: se
+      borran las filas cuya clave ya no viene en los datos.
+    - Si la tabla ya existe ("append" / "upsert"), agrega con ALTER TABLE
+      las columnas nuevas del DataFrame (p. ej. una divisa adicional o
+      `Snapshot`).
+    - Crea los índices secundarios después de la inserción masiva.
+
+Autor: Fernando Blanco
+"""
+
+import sqlite3
+from itertools import islice
+from typing import Iterable, List, Optional, Sequence, Union
+
+import pandas as pd
+
+# ---------------------------------------------------------------------------
+# Configuración por defecto
+# ---------------------------------------------------------------------------
+
+TAMANO_LOTE = 50_000
+
+# journal_mode=WAL es persistente en el archivo; el resto se restaura tras la carga.
+# synchronous=OFF es aceptable porque una carga interrumpida se repite desde la fuente.
+PRAGMAS_CARGA = {
+    "journal_mode": "WAL",
+    "synchronous": "OFF",
+    "temp_store": "MEMORY",
+    "cache_size": -64_000,   # Negativo: tamaño en KiB (≈ 64 MB)
+}
+
+MODOS = ("replace", "append", "upsert")
+
+
+# ---------------------------------------------------------------------------
+# Utilidades SQL
+# ---------------------------------------------------------------------------
+
+def identificador(nombre: str) -> str:
+    """Escribe un nombre de tabla o columna entre comillas dobles para SQLite."""
+    return '"' + str(nombre).replace('"', '""') + '"'
+
+
+def tipo_sqlite(serie: pd.Series) -> str:
+    """Tipo de columna SQLite equivalente al dtype de pandas."""
+    if pd.api.types.is_bool_dtype(serie) or pd.api.types.is_integer_dtype(serie):
+        return "INTEGER"
+    if pd.api.types.is_float_dtype(serie):
+        return "REAL"
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return "TIMESTAMP"
+    return "TEXT"
+
+
+def aplicar_pragmas(conn: sqlite3.Connection, pragmas: Optional[dict] = None) -> dict:
+    """
+    Aplica los PRAGMA de carga a la conexión.
+
+    Args:
+        conn (sqlite3.Connection): Conexión a la base de datos.
+        pragmas (dict | None): PRAGMA a aplicar (por defecto, PRAGMAS_CARGA).
+
+    Returns:
+        dict: Valores anteriores de los PRAGMA modificados (excepto
+        journal_mode), para restaurarlos con `aplicar_pragmas`.
+    """
+    anteriores = {}
+    for nombre, valor in (pragmas or PRAGMAS_CARGA).items():
+        if nombre != "journal_mode":
+            anteriores[nombre] = conn.execute(f"PRAGMA {nombre}").fetchone()[0]
+        conn.execute(f"PRAGMA {nombre}={valor}")
+    return anteriores
+
+
+def _columnas_python(df: pd.DataFrame) -> List[list]:
+    """
+    Convierte cada columna a una lista de valores nativos de Python que
+    sqlite3 puede enlazar (NaN/NA -> None, fechas -> texto ISO).
+    """
+    columnas = []
+    for nombre in df.columns:
+        serie = df[nombre]
+        if pd.api.types.is_datetime64_any_dtype(serie):
+            serie = serie.dt.strftime("%Y-%m-%d %H:%M:%S")
+        if serie.hasnans:
+            columnas.append(serie.astype(object).where(serie.notna(), None).tolist())
+        else:
+            columnas.append(serie.tolist())
+    return columnas
+
+
+def _lotes(filas: Iterable[tuple], tamano: int):
+    iterador = iter(filas)
+    while True:
+        lote = list(islice(iterador, tamano))
+        if not lote:
+            return
+        yield lote
+
+
+def agregar_columnas(conn: sqlite3.Connection, tabla: str, df: pd.DataFrame) -> List[str]:
+    """
+    Agrega a una tabla existente las columnas del DataFrame que le faltan
+    (ALTER TABLE ... ADD COLUMN; las filas existentes quedan con NULL).
+
+    Args:
+        conn (sqlite3.Connection): Conexión a la base de datos.
+        tabla (str): Nombre de la tabla.
+        df (pd.DataFrame): Datos a cargar.
+
+    Returns:
+        List[str]: Columnas agregadas.
+    """
+    existentes = {fila[1] for fila in conn.execute(f"PRAGMA table_info({identificador(tabla)})")}
+    nuevas = [c for c in df.columns if str(c) not in existentes]
+    for c in nuevas:
+        conn.execute(f"ALTER TABLE {identificador(tabla)} ADD COLUMN {identificador(c)} {tipo_sqlite(df[c])}")
+    return nuevas
+
+
+def _eliminar_faltantes(conn: sqlite3.Connection, tabla: str, df: pd.DataFrame,
+                        claves: List[str], tamano_lote: int) -> int:
+    """Borra de la tabla las filas cuya clave no está en el DataFrame; devuelve cuántas."""
+    temporal = identificador(f"_claves_{tabla}")
+    columnas = ", ".join(identificador(c) for c in claves)
+    conn.execute(f"DROP TABLE IF EXISTS temp.{temporal}")
+    conn.execute(f"CREATE TEMP TABLE {temporal} ({columnas})")
+    conn.execute(f"CREATE INDEX temp.{identificador(f'ix_claves_{tabla}')} ON {temporal} ({columnas})")
+    sql = f"INSERT INTO {temporal} VALUES ({', '.join('?' * len(claves))})"
+    for lote in _lotes(zip(*_columnas_python(df[claves])), tamano_lote):
+        conn.executemany(sql, lote)
+    coincide = " AND ".join(f"c.{identificador(k)} IS t.{identificador(k)}" for k in claves)
+    borradas = conn.execute(f"DELETE FROM {identificador(tabla)} AS t "
+                            f"WHERE NOT EXISTS (SELECT 1 FROM {temporal} AS c WHERE {coincide})").rowcount
+    conn.execute(f"DROP TABLE temp.{temporal}")
+    return borradas
+
+
+def _nombre_indice(tabla: str, columnas: Sequence[str], unico: bool = False) -> str:
+    prefijo = "ux" if unico else "ix"
+    return identificador(f"{prefijo}_{tabla}_" + "_".join(str(c) for c in columnas).replace(" ", "_"))
+
+
+# ---------------------------------------------------------------------------
+# Función: cargar_dataframe
+# ---------------------------------------------------------------------------
+
+def cargar_dataframe(df: pd.DataFrame, conn: sqlite3.Connection, tabla: str,
+                     modo: str = "replace", clave: Union[str, Sequence[str], None] = None,
+                     tamano_lote: int = TAMANO_LOTE,
+                     indices: Optional[Sequence[Union[str, Sequence[str]]]] = None,
+                     pragmas: Optional[dict] = None, eliminar_faltantes: bool = False) -> int:
+    """
+    Carga un DataFrame en una tabla SQLite en una sola transacción.
+
+    Args:
+        df (pd.DataFrame): Datos a cargar.
+        conn (sqlite3.Connection): Conexión a la base de datos.
+        tabla (str): Nombre de la tabla destino.
+        modo (str): "replace" (recrea la tabla), "append" (agrega filas) o
+            "upsert" (inserta o actualiza según `clave`).
+        clave (str | Sequence[str] | None): Columna(s) de la clave natural.
+            Obligatoria en modo "upsert" (el índice único se crea antes de
+            insertar); en los demás modos, si se indica, el índice único se
+            crea después de la inserción masiva.
+        tamano_lote (int): Filas por llamada a `executemany`.
+        indices (Sequence | None): Índices secundarios a crear después de la
+            carga (nombre de columna o tupla de columnas).
+        pragmas (dict | None): PRAGMA a aplicar (por defecto, PRAGMAS_CARGA).
+        eliminar_faltantes (bool): Solo en modo "upsert": borra las filas
+            cuya clave no está en `df` (recarga completa sin recrear la tabla).
+
+    Returns:
+        int: Número de filas enviadas a la base de datos.
+
+    Raises:
+        ValueError: Si el modo no es válido, falta la clave en modo "upsert"
+            o se pide `eliminar_faltantes` en otro modo.
+    """
+    if modo not in MODOS:
+        raise ValueError(f"Modo de carga no válido: {modo} (opciones: {MODOS})")
+    if modo == "upsert" and clave is None:
+        raise ValueError("El modo 'upsert' requiere una clave")
+    if eliminar_faltantes and modo != "upsert":
+        raise ValueError("eliminar_faltantes solo se admite en modo 'upsert'")
+    claves = [clave] if isinstance(clave, str) else list(clave or [])
+
+    en_transaccion = conn.in_transaction
+    anteriores = {}
+    if not en_transaccion:
+        anteriores = aplicar_pragmas(conn, pragmas)  # journal_mode no puede cambiarse dentro de una transacción
+    nombre_tabla = identificador(tabla)
+    columnas = [identificador(c) for c in df.columns]
+    definicion = ", ".join(f"{col} {tipo_sqlite(df[c])}" for col, c in zip(columnas, df.columns))
+
+    sql = f"INSERT INTO {nombre_tabla} ({', '.join(columnas)}) VALUES ({', '.join('?' * len(columnas))})"
+    if modo == "upsert":
+        actualizables = [col for col, c in zip(columnas, df.columns) if c not in claves]
+        conflicto = ", ".join(identificador(c) for c in claves)
+        if actualizables:
+            asignaciones = ", ".join(f"{col}=excluded.{col}" for col in actualizables)
+            sql += f" ON CONFLICT({conflicto}) DO UPDATE SET {asignaciones}"
+        else:
+            sql += f" ON CONFLICT({conflicto}) DO NOTHING"
+
+    filas = zip(*_columnas_python(df))
+    total = 0
+    try:
+        if not en_transaccion:
+            conn.execute("BEGIN")
+        if modo == "replace":
+            conn.execute(f"DROP TABLE IF EXISTS {nombre_tabla}")
+        conn.execute(f"CREATE TABLE IF NOT EXISTS {nombre_tabla} ({definicion})")
+        if modo != "replace":
+            agregar_columnas(conn, tabla, df)
+        indice_clave = None
+        if claves:
+            columnas_clave = ", ".join(identificador(c) for c in claves)
+            indice_clave = (f"CREATE UNIQUE INDEX IF NOT EXISTS {_nombre_indice(tabla, claves, True)} "
+                            f"ON {nombre_tabla} ({columnas_clave})")
+        if modo == "upsert":
+            # ON CONFLICT necesita el índice único sobre la clave antes de insertar
+            conn.execute(indice_clave)
+        for lote in _lotes(filas, tamano_lote):
+            conn.executemany(sql, lote)
+            total += len(lote)
+        if eliminar_faltantes:
+            _eliminar_faltantes(conn, tabla, df, claves, tamano_lote)
+        if indice_clave and modo != "upsert":
+            conn.execute(indice_clave)
+        for indice in indices or []:
+            cols = [indice] if isinstance(indice, str) else list(indice)
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {_nombre_indice(tabla, cols)} "
+                         f"ON {nombre_tabla} ({', '.join(identificador(c) for c in cols)})")
+        if not en_transaccion:
+            conn.execute("COMMIT")
+    except Exception:
+        if not en_transaccion:
+            conn.execute("ROLLBACK")
+        raise
+    finally:
+        if anteriores:
+            aplicar_pragmas(conn, anteriores)
+    return total
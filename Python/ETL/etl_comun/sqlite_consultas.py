@@ -0,0 +1,159 @@
+"""
+Consultas SQLite en streaming
+=============================
+
+Alternativa a `pd.read_sql` para las consultas de validación de los
+procesos ETL. Los resultados se leen del cursor por bloques (`fetchmany`),
+por lo que la memoria no depende del tamaño de la tabla:
+
+    - `iterar_consulta`: bloques de DataFrame de tamaño fijo.
+    - `resumir_consulta`: recorre el resultado una vez y devuelve un resumen
+      (filas, vista previa y estadísticas por columna numérica).
+    - `mostrar_consulta`: imprime la vista previa y el resumen en consola.
+
+Todas aceptan parámetros (`?` o `:nombre`) y un límite opcional de filas.
+
+Autor: Fernando Blanco
+"""
+
+import math
+import sqlite3
+from typing import Iterator, Optional, Sequence, Union
+
+import pandas as pd
+
+# ---------------------------------------------------------------------------
+# Configuración por defecto
+# ---------------------------------------------------------------------------
+
+TAMANO_BLOQUE = 10_000
+FILAS_VISTA_PREVIA = 60     # Igual que display.max_rows de pandas
+
+Parametros = Union[Sequence, dict, None]
+
+
+# ---------------------------------------------------------------------------
+# Función: iterar_consulta
+# ---------------------------------------------------------------------------
+
+def iterar_consulta(conn: sqlite3.Connection, sql: str, params: Parametros = None,
+                    tamano_bloque: int = TAMANO_BLOQUE,
+                    limite: Optional[int] = None) -> Iterator[pd.DataFrame]:
+    """
+    Ejecuta una consulta y entrega el resultado en bloques de DataFrame.
+
+    Args:
+        conn (sqlite3.Connection): Conexión a la base de datos.
+        sql (str): Sentencia SQL.
+        params (Sequence | dict | None): Parámetros de la consulta.
+        tamano_bloque (int): Filas por bloque.
+        limite (int | None): Número máximo de filas a leer.
+
+    Yields:
+        pd.DataFrame: Bloques del resultado con los nombres de columna del
+        cursor. Si la consulta no devuelve filas, se entrega un único bloque
+        vacío con las columnas.
+    """
+    cursor = conn.execute(sql, params or ())
+    try:
+        columnas = [d[0] for d in cursor.description or ()]
+        restantes = limite
+        vacio = True
+        while restantes is None or restantes > 0:
+            tamano = tamano_bloque if restantes is None else min(tamano_bloque, restantes)
+            filas = cursor.fetchmany(tamano)
+            if not filas:
+                break
+            if restantes is not None:
+                restantes -= len(filas)
+            vacio = False
+            yield pd.DataFrame.from_records(filas, columns=columnas)
+        if vacio:
+            yield pd.DataFrame(columns=columnas)
+    finally:
+        cursor.close()
+
+
+# ---------------------------------------------------------------------------
+# Función: resumir_consulta
+# ---------------------------------------------------------------------------
+
+def resumir_consulta(conn: sqlite3.Connection, sql: str, params: Parametros = None,
+                     tamano_bloque: int = TAMANO_BLOQUE, limite: Optional[int] = None,
+                     vista_previa: int = FILAS_VISTA_PREVIA) -> dict:
+    """
+    Recorre el resultado de una consulta en streaming y lo resume.
+
+    Args:
+        conn (sqlite3.Connection): Conexión a la base de datos.
+        sql (str): Sentencia SQL.
+        params (Sequence | dict | None): Parámetros de la consulta.
+        tamano_bloque (int): Filas por bloque.
+        limite (int | None): Número máximo de filas a leer.
+        vista_previa (int): Filas iniciales que se conservan.
+
+    Returns:
+        dict: Con las claves "filas" (total leído), "columnas",
+        "vista_previa" (DataFrame con las primeras filas) y "estadisticas"
+        (por columna numérica: count, sum, min, max y mean).
+    """
+    total = 0
+    columnas = None
+    inicio = []
+    estadisticas = {}
+
+    for bloque in iterar_consulta(conn, sql, params, tamano_bloque, limite):
+        if columnas is None:
+            columnas = list(bloque.columns)
+        if total < vista_previa:
+            inicio.append(bloque.head(vista_previa - total))
+        total += len(bloque)
+
+        for columna in bloque.select_dtypes("number").columns:
+            serie = bloque[columna]
+            e = estadisticas.setdefault(columna, {"count": 0, "sum": 0.0, "min": math.inf, "max": -math.inf})
+            if serie.count():
+                e["count"] += int(serie.count())
+                e["sum"] += float(serie.sum())
+                e["min"] = min(e["min"], float(serie.min()))
+                e["max"] = max(e["max"], float(serie.max()))
+
+    for e in estadisticas.values():
+        e["mean"] = e["sum"] / e["count"] if e["count"] else None
+        if not e["count"]:
+            e["min"] = e["max"] = None
+
+    return {
+        "filas": total,
+        "columnas": columnas or [],
+        "vista_previa": pd.concat(inicio, ignore_index=True) if inicio else pd.DataFrame(columns=columnas),
+        "estadisticas": estadisticas,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Función: mostrar_consulta
+# ---------------------------------------------------------------------------
+
+def mostrar_consulta(conn: sqlite3.Connection, sql: str, params: Parametros = None,
+                     limite: Optional[int] = None,
+                     vista_previa: int = FILAS_VISTA_PREVIA) -> dict:
+    """
+    Imprime la vista previa de una consulta y, si el resultado tiene más
+    filas que la vista previa, el total de filas leídas.
+
+    Args:
+        conn (sqlite3.Connection): Conexión a la base de datos.
+        sql (str): Sentencia SQL.
+        params (Sequence | dict | None): Parámetros de la consulta.
+        limite (int | None): Número máximo de filas a leer.
+        vista_previa (int): Filas que se imprimen.
+
+    Returns:
+        dict: Resumen devuelto por `resumir_consulta`.
+    """
+    resumen = resumir_consulta(conn, sql, params, limite=limite, vista_previa=vista_previa)
+    print(resumen["vista_previa"])
+    if resumen["filas"] > len(resumen["vista_previa"]):
+        print(f"... {resumen['filas']} filas en total")
+    return resumen
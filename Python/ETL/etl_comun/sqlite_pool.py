@@ -0,0 +1,217 @@
+"""
+Pool de conexiones SQLite
+=========================
+
+Reutiliza las conexiones SQLite entre etapas (carga, consultas) y entre
+ejecuciones de los pipelines dentro de un mismo proceso, en lugar de abrir y
+cerrar `sqlite3.connect(db_name)` en cada script.
+
+    - Un pool por archivo de base de datos (`obtener_pool`), seguro entre hilos.
+    - Cada conexión se presta a un solo hilo a la vez, por lo que se crea con
+      `check_same_thread=False` sin riesgo de uso concurrente.
+    - Las sentencias preparadas quedan en la caché de cada conexión
+      (`cached_statements`), que sobrevive mientras la conexión siga en el pool.
+    - Context managers `conexion` (préstamo con commit/rollback automático) y
+      `usar_conexion` (acepta una conexión abierta o la ruta de la base).
+
+Los pools se cierran automáticamente al terminar el proceso.
+
+Autor: Fernando Blanco
+"""
+
+import atexit
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Dict, Iterator, Union
+
+# ---------------------------------------------------------------------------
+# Configuración por defecto
+# ---------------------------------------------------------------------------
+
+TAMANO_POOL = 4
+SENTENCIAS_EN_CACHE = 256     # Sentencias preparadas por conexión (sqlite3 usa 128)
+TIMEOUT = 30.0                # Espera máxima por una conexión o por un bloqueo (segundos)
+
+
+# ---------------------------------------------------------------------------
+# Clase: PoolSQLite
+# ---------------------------------------------------------------------------
+
+class PoolSQLite:
+    """
+    Pool de conexiones a un archivo SQLite.
+
+    Las conexiones se crean bajo demanda hasta `tamano`; si todas están
+    prestadas, `adquirir` espera hasta `timeout` segundos.
+
+    Args:
+        ruta (str): Ruta del archivo de base de datos.
+        tamano (int): Número máximo de conexiones abiertas.
+        sentencias_en_cache (int): Tamaño de la caché de sentencias preparadas.
+        timeout (float): Espera máxima por una conexión libre y por bloqueos.
+    """
+
+    def __init__(self, ruta: str, tamano: int = TAMANO_POOL,
+                 sentencias_en_cache: int = SENTENCIAS_EN_CACHE, timeout: float = TIMEOUT):
+        self.ruta = ruta
+        self.tamano = tamano
+        self.sentencias_en_cache = sentencias_en_cache
+        self.timeout = timeout
+        self._libres = queue.LifoQueue()   # LIFO: reutiliza la conexión con la caché más reciente
+        self._creadas = 0
+        self._lock = threading.Lock()
+        self._cerrado = False
+
+    def _crear(self) -> sqlite3.Connection:
+        return sqlite3.connect(
+            self.ruta,
+            timeout=self.timeout,
+            check_same_thread=False,
+            cached_statements=self.sentencias_en_cache,
+        )
+
+    def adquirir(self) -> sqlite3.Connection:
+        """
+        Toma una conexión del pool (creándola si hace falta).
+
+        Returns:
+            sqlite3.Connection: Conexión de uso exclusivo hasta `liberar`.
+
+        Raises:
+            RuntimeError: Si el pool está cerrado.
+            TimeoutError: Si no hay conexiones libres en `timeout` segundos.
+        """
+        if self._cerrado:
+            raise RuntimeError(f"El pool de {self.ruta} está cerrado")
+        try:
+            return self._libres.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._creadas < self.tamano:
+                self._creadas += 1
+                try:
+                    return self._crear()
+                except Exception:
+                    self._creadas -= 1   # Una conexión fallida no ocupa plaza en el pool
+                    raise
+        try:
+            return self._libres.get(timeout=self.timeout)
+        except queue.Empty:
+            raise TimeoutError(f"No hay conexiones libres para {self.ruta}") from None
+
+    def liberar(self, conn: sqlite3.Connection) -> None:
+        """
+        Devuelve una conexión al pool. Una transacción abierta se revierte.
+
+        Args:
+            conn (sqlite3.Connection): Conexión obtenida con `adquirir`.
+        """
+        if conn.in_transaction:
+            conn.rollback()
+        if self._cerrado:
+            conn.close()
+        else:
+            self._libres.put(conn)
+
+    @contextmanager
+    def conexion(self) -> Iterator[sqlite3.Connection]:
+        """
+        Presta una conexión durante el bloque `with`. Al salir, confirma la
+        transacción pendiente (o la revierte si hubo una excepción) y
+        devuelve la conexión al pool.
+
+        Yields:
+            sqlite3.Connection: Conexión prestada.
+        """
+        conn = self.adquirir()
+        try:
+            yield conn
+            if conn.in_transaction:
+                conn.commit()
+        finally:
+            self.liberar(conn)
+
+    def cerrar(self) -> None:
+        """
+        Cierra todas las conexiones libres. Las prestadas se cierran al
+        liberarse (no se cierran aquí porque otro hilo podría estar usándolas).
+        """
+        self._cerrado = True
+        while True:
+            try:
+                self._libres.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+# ---------------------------------------------------------------------------
+# Registro de pools por archivo de base de datos
+# ---------------------------------------------------------------------------
+
+_pools: Dict[str, PoolSQLite] = {}
+_pools_lock = threading.Lock()
+
+
+def obtener_pool(ruta: Union[str, Path], **opciones) -> PoolSQLite:
+    """
+    Devuelve el pool compartido de un archivo de base de datos, creándolo la
+    primera vez (las `opciones` solo se usan en ese momento).
+
+    Args:
+        ruta (str | Path): Ruta del archivo de base de datos.
+        **opciones: Argumentos de `PoolSQLite` (tamano, sentencias_en_cache, timeout).
+
+    Returns:
+        PoolSQLite: Pool asociado a la ruta absoluta del archivo.
+    """
+    clave = os.path.abspath(ruta)
+    with _pools_lock:
+        pool = _pools.get(clave)
+        if pool is None or pool._cerrado:
+            pool = _pools[clave] = PoolSQLite(clave, **opciones)
+        return pool
+
+
+@contextmanager
+def conexion(ruta: Union[str, Path]) -> Iterator[sqlite3.Connection]:
+    """
+    Presta una conexión del pool compartido de `ruta` (ver `PoolSQLite.conexion`).
+
+    Args:
+        ruta (str | Path): Ruta del archivo de base de datos.
+
+    Yields:
+        sqlite3.Connection: Conexión prestada.
+    """
+    with obtener_pool(ruta).conexion() as conn:
+        yield conn
+
+
+def usar_conexion(conn_o_ruta: Union[sqlite3.Connection, str, Path]):
+    """
+    Context manager que acepta una conexión abierta (se usa tal cual) o la
+    ruta de la base de datos (se presta una conexión del pool).
+
+    Args:
+        conn_o_ruta (sqlite3.Connection | str | Path): Conexión o ruta.
+
+    Returns:
+        ContextManager[sqlite3.Connection]: Context manager con la conexión.
+    """
+    if isinstance(conn_o_ruta, sqlite3.Connection):
+        return nullcontext(conn_o_ruta)
+    return conexion(conn_o_ruta)
+
+
+@atexit.register
+def cerrar_pools() -> None:
+    """Cierra todos los pools registrados."""
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.cerrar()
+        _pools.clear()
@@ -0,0 +1,263 @@
+"""
+Motor de extracción de tablas HTML
+==================================
+
+Construye un DataFrame a partir de las filas (<tr>) de una tabla HTML en una
+sola pasada: los valores se acumulan en listas por columna y el DataFrame se
+materializa una única vez al final.
+
+Esto reemplaza el patrón "un DataFrame de una fila + pd.concat por cada <tr>",
+cuyo costo crece de forma cuadrática con el número de filas.
+
+También permite localizar una tabla a partir de un ancla (elemento con `id`)
+y convertirla directamente en DataFrame, sin serializarla con `str(table)` ni
+volver a analizarla con `pd.read_html`. El analizador HTML es intercambiable:
+selectolax o lxml cuando están instalados, y html.parser (BeautifulSoup con
+análisis parcial mediante SoupStrainer) como alternativa.
+
+Autor: Fernando Blanco
+"""
+
+import importlib.util
+from typing import Callable, Iterable, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+# Analizadores soportados, en orden de preferencia
+BACKENDS = ("selectolax", "lxml", "html.parser")
+
+
+# ---------------------------------------------------------------------------
+# Construcción del DataFrame
+# ---------------------------------------------------------------------------
+
+def construir_dataframe(filas: Iterable, columnas: Sequence[str],
+                        extraer_fila: Callable[[object], Optional[Sequence]]) -> pd.DataFrame:
+    """
+    Recorre las filas una sola vez y construye un DataFrame columnar.
+
+    La función `extraer_fila` recibe cada fila y devuelve una secuencia con
+    un valor por columna (en el mismo orden que `columnas`), o None si la
+    fila debe descartarse (encabezados, filas sin datos, valores '—', etc.).
+
+    Args:
+        filas (Iterable): Filas a procesar (normalmente etiquetas <tr>).
+        columnas (Sequence[str]): Nombres de las columnas del DataFrame.
+        extraer_fila (Callable): Función que convierte una fila en sus valores.
+
+    Returns:
+        pd.DataFrame: DataFrame con una fila por cada fila aceptada.
+
+    Raises:
+        ValueError: Si una fila no tiene exactamente un valor por columna.
+    """
+    datos = {columna: [] for columna in columnas}
+    listas = [datos[columna] for columna in columnas]
+
+    for fila in filas:
+        valores = extraer_fila(fila)
+        if valores is None:
+            continue
+        for lista, valor in zip(listas, valores, strict=True):
+            lista.append(valor)
+
+    return pd.DataFrame(datos, columns=list(columnas))
+
+
+def extraer_tabla(tbody, columnas: Sequence[str],
+                  extraer_fila: Callable[[object], Optional[Sequence]]) -> pd.DataFrame:
+    """
+    Extrae las filas <tr> de un cuerpo de tabla (BeautifulSoup) y las
+    convierte en un DataFrame mediante `construir_dataframe`.
+
+    Args:
+        tbody (bs4.element.Tag): Etiqueta <tbody> (o <table>) a procesar.
+        columnas (Sequence[str]): Nombres de las columnas del DataFrame.
+        extraer_fila (Callable): Función que convierte una fila en sus valores.
+
+    Returns:
+        pd.DataFrame: DataFrame con la información extraída.
+    """
+    return construir_dataframe(tbody.find_all('tr'), columnas, extraer_fila)
+
+
+# ---------------------------------------------------------------------------
+# Selección del analizador HTML
+# ---------------------------------------------------------------------------
+
+def backends_disponibles() -> List[str]:
+    """
+    Devuelve los analizadores HTML instalados, en orden de preferencia.
+
+    Returns:
+        List[str]: Subconjunto de BACKENDS ("html.parser" siempre está disponible).
+    """
+    return [b for b in BACKENDS if b == "html.parser" or importlib.util.find_spec(b) is not None]
+
+
+def elegir_backend(preferido: Optional[str] = None) -> str:
+    """
+    Elige el analizador HTML a utilizar.
+
+    Args:
+        preferido (str | None): Analizador solicitado. Si es None se usa el
+            más rápido disponible.
+
+    Returns:
+        str: Nombre del analizador.
+
+    Raises:
+        ValueError: Si el analizador solicitado no existe o no está instalado.
+    """
+    disponibles = backends_disponibles()
+    if preferido is None:
+        return disponibles[0]
+    if preferido not in disponibles:
+        raise ValueError(f"Analizador HTML no disponible: {preferido} (disponibles: {disponibles})")
+    return preferido
+
+
+# ---------------------------------------------------------------------------
+# Localización de la tabla posterior a un ancla
+# ---------------------------------------------------------------------------
+
+def _texto(texto: str) -> str:
+    """Normaliza espacios (incluidos saltos de línea y &nbsp;) de una celda."""
+    return " ".join(texto.split())
+
+
+def _filas_lxml(page: str, id_ancla: str):
+    import lxml.html
+
+    doc = lxml.html.fromstring(page)
+    anclas = doc.xpath("//*[@id=$id]", id=id_ancla)
+    if not anclas:
+        return None
+    tablas = anclas[0].xpath("following::table[1]")
+    if not tablas:
+        return None
+    return [
+        [(celda.tag, _texto(" ".join(celda.itertext()))) for celda in fila.xpath("./th|./td")]
+        for fila in tablas[0].iter("tr")
+    ]
+
+
+def _siguiente_tabla_selectolax(nodo):
+    """Primera <table> posterior a `nodo` en el orden del documento."""
+    while nodo is not None:
+        hermano = nodo.next
+        while hermano is not None:
+            if hermano.tag == "table":
+                return hermano
+            if hermano.tag != "-text":
+                interna = hermano.css_first("table")
+                if interna is not None:
+                    return interna
+            hermano = hermano.next
+        nodo = nodo.parent
+    return None
+
+
+def _filas_selectolax(page: str, id_ancla: str):
+    from selectolax.lexbor import LexborHTMLParser
+
+    ancla = LexborHTMLParser(page).css_first(f'[id="{id_ancla}"]')
+    if ancla is None:
+        return None
+    tabla = _siguiente_tabla_selectolax(ancla)
+    if tabla is None:
+        return None
+    return [
+        [(celda.tag, _texto(celda.text(separator=" "))) for celda in fila.iter() if celda.tag in ("th", "td")]
+        for fila in tabla.css("tr")
+    ]
+
+
+def _filas_html_parser(page: str, id_ancla: str):
+    from bs4 import BeautifulSoup, SoupStrainer
+
+    # Análisis parcial: solo encabezados y tablas (con todo su contenido)
+    solo = SoupStrainer(["h1", "h2", "h3", "h4", "h5", "h6", "table"])
+    soup = BeautifulSoup(page, "html.parser", parse_only=solo)
+    ancla = soup.find(id=id_ancla)
+    if ancla is None:
+        return None
+    tabla = ancla.find_next("table")
+    if tabla is None:
+        return None
+    return [
+        [(celda.name, _texto(celda.get_text(" "))) for celda in fila.find_all(["th", "td"], recursive=False)]
+        for fila in tabla.find_all("tr")
+    ]
+
+
+_LECTORES = {
+    "selectolax": _filas_selectolax,
+    "lxml": _filas_lxml,
+    "html.parser": _filas_html_parser,
+}
+
+
+def filas_tabla_tras_ancla(page: str, id_ancla: str,
+                           backend: Optional[str] = None) -> Tuple[List[str], List[List[str]]]:
+    """
+    Localiza la primera tabla que aparece después del elemento con
+    `id=id_ancla` y devuelve su encabezado y sus filas como texto.
+
+    El encabezado es la primera fila formada solo por celdas <th>; el resto
+    de filas con celdas se devuelven como datos.
+
+    Args:
+        page (str): Contenido HTML de la página.
+        id_ancla (str): Atributo id del elemento de referencia.
+        backend (str | None): Analizador HTML (ver `elegir_backend`).
+
+    Returns:
+        Tuple[List[str], List[List[str]]]: (encabezados, filas).
+
+    Raises:
+        ValueError: Si no se encuentra el ancla o la tabla posterior.
+    """
+    filas = _LECTORES[elegir_backend(backend)](page, id_ancla)
+    if filas is None:
+        raise ValueError(f"No se encontró la tabla posterior al elemento con id '{id_ancla}'")
+
+    encabezados, datos = None, []
+    for fila in filas:
+        if not fila:
+            continue
+        if encabezados is None and all(tag == "th" for tag, _ in fila):
+            encabezados = [texto for _, texto in fila]
+        else:
+            datos.append([texto for _, texto in fila])
+    if encabezados is None:
+        encabezados = [str(i) for i in range(max((len(f) for f in datos), default=0))]
+    return encabezados, datos
+
+
+def extraer_tabla_tras_ancla(page: str, id_ancla: str,
+                             backend: Optional[str] = None) -> pd.DataFrame:
+    """
+    Convierte en DataFrame la primera tabla posterior al elemento con
+    `id=id_ancla`, sin pasar por `pd.read_html`.
+
+    Igual que `pd.read_html`, las columnas cuyo contenido es completamente
+    numérico se convierten a número; el resto queda como texto.
+
+    Args:
+        page (str): Contenido HTML de la página.
+        id_ancla (str): Atributo id del elemento de referencia.
+        backend (str | None): Analizador HTML (ver `elegir_backend`).
+
+    Returns:
+        pd.DataFrame: Tabla con una columna por encabezado.
+    """
+    encabezados, filas = filas_tabla_tras_ancla(page, id_ancla, backend)
+    n = len(encabezados)
+    df = construir_dataframe(filas, encabezados, lambda fila: (fila + [None] * n)[:n])
+    for columna in df.columns:
+        try:
+            df[columna] = pd.to_numeric(df[columna])
+        except (ValueError, TypeError):
+            pass
+    return df
@@ -0,0 +1,69 @@
+"""
+Paquete pipelines
+=================
+
+Acceso importable a los procesos ETL del repositorio. Los scripts viven en
+carpetas con espacios en el nombre (p. ej. "PROYECTO 1"), junto a sus
+archivos de datos, por lo que no forman un paquete; aquí se registran por
+nombre y se cargan solo cuando se usan:
+
+    import pipelines
+    df = pipelines.bancos.extract_from_html(html, ["Bank name", "MC_USD_Billion"])
+
+    python -m pipelines gdp --db /tmp/World_Economies.db
+    python -m pipelines personas --directory datos/ --full-rebuild
+
+Importar el paquete o uno de los scripts no ejecuta ningún ETL ni importa
+pandas/requests: cada script expone sus etapas, `run_pipeline`/`main` y
+difiere las dependencias pesadas hasta la primera etapa que las usa.
+
+Autor: Fernando Blanco
+"""
+
+import importlib
+import sys
+from pathlib import Path
+from types import ModuleType
+
+RAIZ = Path(__file__).resolve().parents[1]
+
+# nombre -> (carpeta del script relativa a Python/ETL, módulo)
+PIPELINES = {
+    "personas": ("ETL_basics/XML, JSON - CSV", "etl_code"),
+    "staff": ("ETL_basics/SQLITE - CSV", "db_code"),
+    "gdp": ("ETL_Proyectos/PROYECTO 1", "etl_project_gdp"),
+    "tabla_bancos": ("ETL_Proyectos/PROYECTO 1", "blblb"),
+    "bancos": ("ETL_Proyectos/PROYECTO 2", "banks_project"),
+}
+
+
+def cargar(nombre: str) -> ModuleType:
+    """
+    Importa el script de un pipeline por su nombre.
+
+    La carpeta del script se agrega a sys.path, de modo que el módulo queda
+    registrado con su propio nombre (p. ej. "banks_project") y los procesos
+    hijos (ProcessPoolExecutor) pueden volver a importarlo.
+
+    Args:
+        nombre (str): Nombre del pipeline (ver PIPELINES).
+
+    Returns:
+        ModuleType: Módulo del script.
+
+    Raises:
+        KeyError: Si el pipeline no existe.
+    """
+    if nombre not in PIPELINES:
+        raise KeyError(f"Pipeline desconocido: {nombre} (opciones: {', '.join(PIPELINES)})")
+    carpeta, modulo = PIPELINES[nombre]
+    ruta = str(RAIZ / carpeta)
+    if ruta not in sys.path:
+        sys.path.append(ruta)
+    return importlib.import_module(modulo)
+
+
+def __getattr__(nombre: str) -> ModuleType:
+    if nombre in PIPELINES:
+        return cargar(nombre)
+    raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
@@ -0,0 +1,27 @@
+"""
+Línea de comandos: python -m pipelines <pipeline> [argumentos del pipeline]
+
+Ejemplos:
+    python -m pipelines --help
+    python -m pipelines bancos --db Banks.db --log-format jsonl
+    python -m pipelines gdp --help
+"""
+
+import argparse
+import sys
+
+from pipelines import PIPELINES, cargar
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m pipelines",
+                                     description="Ejecuta uno de los procesos ETL del repositorio")
+    parser.add_argument("pipeline", choices=PIPELINES, help="Pipeline a ejecutar")
+    parser.add_argument("argumentos", nargs=argparse.REMAINDER,
+                        help="Argumentos del pipeline (python -m pipelines <pipeline> --help)")
+    args = parser.parse_args(argv)
+    cargar(args.pipeline).main(args.argumentos)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
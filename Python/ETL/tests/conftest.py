@@ -0,0 +1,118 @@
+"""
+Fixtures compartidas por las pruebas de etl_comun
+=================================================
+
+Levanta un servidor HTTP local (http.server) que publica los HTML de
+`tests/datos`, para probar la descarga, los reintentos y la caché sin
+acceder a Internet.
+
+Autor: Fernando Blanco
+"""
+
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+# Permite importar el paquete compartido etl_comun (ubicado en la carpeta padre)
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+DATOS = Path(__file__).resolve().parent / "datos"
+
+
+# ---------------------------------------------------------------------------
+# Servidor de pruebas
+# ---------------------------------------------------------------------------
+
+class ServidorPruebas:
+    """
+    Estado del servidor local: páginas publicadas, fallos programados y
+    registro de las peticiones recibidas.
+
+    Args:
+        url_base (str): URL del servidor (p. ej. "http://127.0.0.1:8000").
+    """
+
+    def __init__(self, url_base: str = ""):
+        self.url_base = url_base
+        self.paginas = {}
+        self.fallos = {}
+        self.peticiones = []
+        self._lock = threading.Lock()
+
+    def publicar(self, ruta: str, contenido: str, etag: str = None, last_modified: str = None) -> str:
+        """Publica `contenido` en `ruta` y devuelve su URL completa."""
+        self.paginas[ruta] = (contenido.encode("utf-8"), etag, last_modified)
+        return self.url_base + ruta
+
+    def publicar_archivo(self, ruta: str, nombre: str, **cabeceras) -> str:
+        """Publica en `ruta` un HTML de `tests/datos`."""
+        return self.publicar(ruta, (DATOS / nombre).read_text(encoding="utf-8"), **cabeceras)
+
+    def fallar(self, ruta: str, veces: int, estado: int = 503) -> None:
+        """Las próximas `veces` peticiones a `ruta` responden con `estado`."""
+        self.fallos[ruta] = (veces, estado)
+
+    def cabeceras_recibidas(self, ruta: str):
+        """Cabeceras de las peticiones recibidas en `ruta`, en orden de llegada."""
+        return [cabeceras for r, cabeceras in self.peticiones if r == ruta]
+
+    def _atender(self, ruta: str, cabeceras: dict):
+        """Devuelve (estado, cabeceras, cuerpo) de una petición GET."""
+        with self._lock:
+            self.peticiones.append((ruta, cabeceras))
+            veces, estado = self.fallos.get(ruta, (0, None))
+            if veces:
+                self.fallos[ruta] = (veces - 1, estado)
+                return estado, {}, b""
+
+        if ruta not in self.paginas:
+            return 404, {}, b""
+        cuerpo, etag, last_modified = self.paginas[ruta]
+        if etag and cabeceras.get("If-None-Match") == etag:
+            return 304, {"ETag": etag}, b""
+        if last_modified and cabeceras.get("If-Modified-Since") == last_modified:
+            return 304, {"Last-Modified": last_modified}, b""
+
+        salida = {"Content-Type": "text/html; charset=utf-8"}
+        if etag:
+            salida["ETag"] = etag
+        if last_modified:
+            salida["Last-Modified"] = last_modified
+        return 200, salida, cuerpo
+
+
+def _manejador(servidor: ServidorPruebas):
+    class Manejador(BaseHTTPRequestHandler):
+        def do_GET(self):
+            estado, cabeceras, cuerpo = servidor._atender(self.path, dict(self.headers))
+            self.send_response(estado)
+            for nombre, valor in cabeceras.items():
+                self.send_header(nombre, valor)
+            if estado != 304:
+                self.send_header("Content-Length", str(len(cuerpo)))
+            self.end_headers()
+            self.wfile.write(cuerpo)
+
+        def log_message(self, *args):
+            pass
+
+    return Manejador
+
+
+@pytest.fixture
+def servidor():
+    """Servidor HTTP local en un puerto libre, detenido al terminar la prueba."""
+    estado = ServidorPruebas()
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _manejador(estado))
+    estado.url_base = f"http://127.0.0.1:{httpd.server_address[1]}"
+    hilo = threading.Thread(target=httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    hilo.start()
+    try:
+        yield estado
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+        hilo.join()
@@ -0,0 +1,58 @@
+"""
+Pruebas de etl_comun.cache_etapas.
+
+Autor: Fernando Blanco
+"""
+
+import pandas as pd
+import pytest
+
+from etl_comun.cache_etapas import CacheEtapas, has_pyarrow
+
+pytestmark = pytest.mark.skipif(not has_pyarrow, reason="La caché de etapas requiere pyarrow")
+
+
+def datos():
+    return pd.DataFrame({"Bank name": ["JPMorgan Chase", "Bank of America"], "MC_USD_Billion": [432.92, 231.52]})
+
+
+def test_acierto_abierto_del_mapeo_sin_copiar(tmp_path):
+    cache = CacheEtapas(directorio=str(tmp_path), activa=True)
+    etapa = cache.cachear()(datos)
+
+    etapa()
+    df = etapa()
+
+    assert cache.aciertos == 1
+    assert not df["MC_USD_Billion"].to_numpy().flags.writeable
+    with pytest.raises(ValueError):
+        df.loc[0, "MC_USD_Billion"] = 0.0
+    df["MC_GBP_Billion"] = df["MC_USD_Billion"] * 0.8   # Agregar columnas sí funciona
+    pd.testing.assert_frame_equal(df.drop(columns="MC_GBP_Billion"), datos())
+
+
+def test_modificable_copia_las_columnas(tmp_path):
+    cache = CacheEtapas(directorio=str(tmp_path), activa=True)
+    etapa = cache.cachear(modificable=True)(datos)
+
+    etapa()
+    df = etapa()
+
+    assert cache.aciertos == 1
+    df.loc[0, "MC_USD_Billion"] = 0.0
+    assert df["MC_USD_Billion"].tolist() == [0.0, 231.52]
+
+
+def test_configuracion_evaluada_en_cada_llamada(tmp_path):
+    cache = CacheEtapas(directorio=str(tmp_path), activa=True)
+    orden = ["GBP", "EUR"]
+
+    @cache.cachear(configuracion=lambda: {"orden": orden})
+    def etapa():
+        return pd.DataFrame({f"MC_{divisa}": [1.0] for divisa in orden})
+
+    assert etapa().columns.tolist() == ["MC_GBP", "MC_EUR"]
+    orden = ["EUR", "GBP"]
+    assert etapa().columns.tolist() == ["MC_EUR", "MC_GBP"]
+    assert etapa().columns.tolist() == ["MC_EUR", "MC_GBP"]
+    assert (cache.fallos, cache.aciertos) == (2, 1)
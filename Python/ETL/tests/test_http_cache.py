@@ -0,0 +1,199 @@
+"""
+Pruebas de etl_comun.http_cache contra el servidor local de conftest.py.
+
+Autor: Fernando Blanco
+"""
+
+import importlib
+import time
+
+import pytest
+
+from etl_comun import http_cache
+from etl_comun.http_cache import CacheHTTP, ErrorCacheOffline
+
+ETAG = '"v1"'
+LAST_MODIFIED = "Sat, 02 Sep 2023 18:53:26 GMT"
+
+
+def nueva_cache(directorio, **opciones):
+    opciones.setdefault("offline", False)
+    return CacheHTTP(directorio=str(directorio), **opciones)
+
+
+def entradas(directorio):
+    return sorted(ruta.name for ruta in directorio.glob("*.body"))
+
+
+# ---------------------------------------------------------------------------
+# Vigencia (TTL) y revalidación condicional
+# ---------------------------------------------------------------------------
+
+def test_copia_vigente_no_usa_la_red(servidor, tmp_path):
+    url = servidor.publicar_archivo("/bancos.html", "bancos_2023.html")
+    cache = nueva_cache(tmp_path, ttl=60)
+
+    primera = cache.obtener(url)
+    servidor.publicar("/bancos.html", "<p>cambiado</p>")
+
+    assert cache.obtener(url) == primera
+    assert len(servidor.cabeceras_recibidas("/bancos.html")) == 1
+
+
+def test_copia_vencida_se_vuelve_a_descargar(servidor, tmp_path):
+    url = servidor.publicar("/pagina.html", "<p>v1</p>")
+    cache = nueva_cache(tmp_path, ttl=0.2)
+
+    assert cache.obtener(url) == "<p>v1</p>"
+    servidor.publicar("/pagina.html", "<p>v2</p>")
+    assert cache.obtener(url) == "<p>v1</p>"
+    time.sleep(0.25)
+
+    assert cache.obtener(url) == "<p>v2</p>"
+    assert len(servidor.cabeceras_recibidas("/pagina.html")) == 2
+
+
+def test_revalida_con_etag(servidor, tmp_path):
+    url = servidor.publicar_archivo("/bancos.html", "bancos_2023.html", etag=ETAG)
+    cache = nueva_cache(tmp_path, ttl=0)
+
+    primera = cache.obtener(url)
+    segunda = cache.obtener(url)
+
+    condicional = servidor.cabeceras_recibidas("/bancos.html")[1]
+    assert condicional.get("If-None-Match") == ETAG
+    assert "If-Modified-Since" not in condicional
+    assert segunda == primera
+
+
+def test_revalida_con_last_modified(servidor, tmp_path):
+    url = servidor.publicar_archivo("/bancos.html", "bancos_2023.html", last_modified=LAST_MODIFIED)
+    cache = nueva_cache(tmp_path, ttl=0)
+
+    primera = cache.obtener(url)
+    segunda = cache.obtener(url)
+
+    condicional = servidor.cabeceras_recibidas("/bancos.html")[1]
+    assert condicional.get("If-Modified-Since") == LAST_MODIFIED
+    assert "If-None-Match" not in condicional
+    assert segunda == primera
+
+
+def test_304_renueva_la_vigencia(servidor, tmp_path):
+    url = servidor.publicar_archivo("/bancos.html", "bancos_2023.html", etag=ETAG)
+    cache = nueva_cache(tmp_path, ttl=0.2)
+
+    cache.obtener(url)
+    time.sleep(0.25)
+    cache.obtener(url)   # 304: la copia vuelve a estar vigente
+    cache.obtener(url)
+
+    assert len(servidor.cabeceras_recibidas("/bancos.html")) == 2
+
+
+def test_etag_distinto_descarga_la_nueva_version(servidor, tmp_path):
+    url = servidor.publicar("/pagina.html", "<p>v1</p>", etag=ETAG)
+    cache = nueva_cache(tmp_path, ttl=0)
+
+    cache.obtener(url)
+    servidor.publicar("/pagina.html", "<p>v2</p>", etag='"v2"')
+
+    assert cache.obtener(url) == "<p>v2</p>"
+    assert servidor.cabeceras_recibidas("/pagina.html")[1].get("If-None-Match") == ETAG
+
+
+# ---------------------------------------------------------------------------
+# Expulsión LRU y tamaño máximo
+# ---------------------------------------------------------------------------
+
+def test_expulsa_la_entrada_usada_hace_mas_tiempo(servidor, tmp_path):
+    urls = {nombre: servidor.publicar(f"/{nombre}", nombre * 100) for nombre in "abc"}
+    cache = nueva_cache(tmp_path, ttl=60, max_bytes=250)
+
+    cache.obtener(urls["a"])
+    time.sleep(0.02)
+    cache.obtener(urls["b"])
+    time.sleep(0.02)
+    cache.obtener(urls["a"])   # "a" pasa a ser la más reciente
+    time.sleep(0.02)
+    cache.obtener(urls["c"])   # no caben tres: se expulsa "b"
+
+    rutas = {nombre: cache._rutas(url)[0].name for nombre, url in urls.items()}
+    assert entradas(tmp_path) == sorted([rutas["a"], rutas["c"]])
+    assert not cache._rutas(urls["b"])[1].exists()
+
+    cache.obtener(urls["b"])
+    assert len(servidor.cabeceras_recibidas("/b")) == 2
+
+
+def test_respuesta_mayor_que_max_bytes_no_se_guarda(servidor, tmp_path):
+    pequena = servidor.publicar("/pequena", "x" * 50)
+    grande = servidor.publicar("/grande", "y" * 500)
+    cache = nueva_cache(tmp_path, ttl=60, max_bytes=100)
+
+    cache.obtener(pequena)
+    assert cache.obtener(grande) == "y" * 500
+
+    # La entrada que ya estaba no se expulsa y la grande se descarga cada vez
+    assert entradas(tmp_path) == [cache._rutas(pequena)[0].name]
+    cache.obtener(grande)
+    assert len(servidor.cabeceras_recibidas("/grande")) == 2
+
+
+def test_nueva_version_demasiado_grande_descarta_la_copia(servidor, tmp_path):
+    url = servidor.publicar("/pagina", "v1")
+    cache = nueva_cache(tmp_path, ttl=0, max_bytes=100)
+
+    cache.obtener(url)
+    servidor.publicar("/pagina", "v2" * 100)
+
+    assert cache.obtener(url) == "v2" * 100
+    assert entradas(tmp_path) == []
+    assert list(tmp_path.glob("*.json")) == []
+
+
+# ---------------------------------------------------------------------------
+# Modo offline (ETL_HTTP_OFFLINE)
+# ---------------------------------------------------------------------------
+
+@pytest.fixture
+def modulo_offline(monkeypatch):
+    """Recarga http_cache con ETL_HTTP_OFFLINE=1 y lo restaura al terminar."""
+    monkeypatch.setenv("ETL_HTTP_OFFLINE", "1")
+    yield importlib.reload(http_cache)
+    monkeypatch.undo()
+    importlib.reload(http_cache)
+
+
+def test_offline_sirve_desde_la_cache_sin_revalidar(servidor, tmp_path, modulo_offline):
+    url = servidor.publicar_archivo("/bancos.html", "bancos_2023.html", etag=ETAG)
+    contenido = nueva_cache(tmp_path, ttl=0).obtener(url)
+
+    cache = modulo_offline.CacheHTTP(directorio=str(tmp_path), ttl=0)
+
+    assert modulo_offline.OFFLINE and cache.offline
+    assert cache.obtener(url) == contenido
+    assert len(servidor.cabeceras_recibidas("/bancos.html")) == 1
+
+
+def test_offline_sin_copia_no_usa_la_red(servidor, tmp_path, modulo_offline):
+    url = servidor.publicar_archivo("/bancos.html", "bancos_2023.html")
+    cache = modulo_offline.CacheHTTP(directorio=str(tmp_path))
+
+    with pytest.raises(modulo_offline.ErrorCacheOffline):
+        cache.obtener(url)
+    assert servidor.peticiones == []
+
+
+@pytest.mark.parametrize("valor", ["", "0"])
+def test_etl_http_offline_desactivado(monkeypatch, valor):
+    monkeypatch.setenv("ETL_HTTP_OFFLINE", valor)
+    try:
+        assert importlib.reload(http_cache).OFFLINE is False
+    finally:
+        monkeypatch.undo()
+        importlib.reload(http_cache)
+
+
+def test_error_offline_es_lookup_error():
+    assert issubclass(ErrorCacheOffline, LookupError)
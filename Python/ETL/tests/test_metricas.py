@@ -0,0 +1,28 @@
+"""
+Pruebas de etl_comun.metricas.
+
+Autor: Fernando Blanco
+"""
+
+import socket
+
+import pytest
+
+from etl_comun.metricas import Metricas
+
+
+def test_puerto_ocupado_no_interrumpe_las_etapas():
+    with socket.socket() as ocupado:
+        ocupado.bind(("", 0))
+        ocupado.listen()
+        puerto = ocupado.getsockname()[1]
+        metricas = Metricas("prueba", archivo=None, archivo_prometheus=None, puerto=puerto)
+
+        with pytest.warns(RuntimeWarning, match=str(puerto)):
+            with metricas.etapa("extract", filas=10):
+                pass
+        with metricas.etapa("transform", filas=10):
+            pass
+
+    assert [m["etapa"] for m in metricas.mediciones] == ["extract", "transform"]
+    assert metricas.puerto is None
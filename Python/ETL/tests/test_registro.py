@@ -0,0 +1,53 @@
+"""
+Pruebas de etl_comun.registro.
+
+Autor: Fernando Blanco
+"""
+
+import errno
+
+import pytest
+
+from etl_comun.registro import RegistroAsincrono
+
+
+class ArchivoLleno:
+    """Archivo cuya escritura falla como en un disco lleno."""
+
+    def writelines(self, lineas):
+        raise OSError(errno.ENOSPC, "No space left on device")
+
+    def close(self):
+        pass
+
+
+def test_ruta_invalida_falla_al_crear_el_registro(tmp_path):
+    with pytest.raises(OSError):
+        RegistroAsincrono(str(tmp_path / "no_existe" / "etl.log"))
+
+
+def test_error_del_hilo_se_lanza_en_el_siguiente_flush_y_log(tmp_path):
+    registro = RegistroAsincrono(str(tmp_path / "etl.log"))
+    registro._archivo.close()
+    registro._archivo = ArchivoLleno()
+
+    registro.log("Extracción de datos completada.")
+    with pytest.raises(OSError, match="No space left"):
+        registro.flush(timeout=5)
+    with pytest.raises(OSError, match="No space left"):
+        registro.log("Transformación de datos completada.")
+
+
+def test_fase_registra_inicio_fin_y_duracion(tmp_path):
+    ruta = tmp_path / "etl.log"
+    registro = RegistroAsincrono(str(ruta))
+
+    registro.log("Configuración inicial completada.")
+    with registro.fase("Carga a base de datos"):
+        pass
+    registro.cerrar()
+
+    lineas = ruta.read_text(encoding="utf-8").splitlines()
+    assert lineas[0].endswith(" : Configuración inicial completada.")
+    assert " : Carga a base de datos iniciada fase=Carga a base de datos evento=inicio" in lineas[1]
+    assert " : Carga a base de datos terminada fase=Carga a base de datos evento=fin duracion_s=" in lineas[2]
@@ -0,0 +1,30 @@
+"""
+Pruebas de etl_comun.salidas.
+
+Autor: Fernando Blanco
+"""
+
+import os
+
+import pandas as pd
+import pytest
+
+from etl_comun.salidas import PARTICION_NULA, Salida, SalidaCSV
+
+
+def test_salida_es_abstracta():
+    with pytest.raises(TypeError):
+        Salida()
+
+
+def test_particion_nula_se_lee_como_nulo(tmp_path):
+    df = pd.DataFrame({"Country": ["United States", "China", "Japan"],
+                       "Snapshot": ["2024-01-01", None, "2024-01-01"]})
+    salida = SalidaCSV()
+
+    salida.escribir(df, str(tmp_path / "gdp"), particion="Snapshot")
+    leido = salida.leer(str(tmp_path / "gdp"))
+
+    assert sorted(os.listdir(tmp_path / "gdp")) == ["Snapshot=2024-01-01", f"Snapshot={PARTICION_NULA}"]
+    assert leido.loc[leido["Country"] == "China", "Snapshot"].isna().all()
+    assert leido.loc[leido["Country"] != "China", "Snapshot"].tolist() == ["2024-01-01", "2024-01-01"]
@@ -0,0 +1,112 @@
+"""
+Pruebas de etl_comun.scraping contra el servidor local de conftest.py.
+
+Autor: Fernando Blanco
+"""
+
+import time
+
+import pytest
+import requests
+
+from etl_comun import tablas_html
+from etl_comun.http_cache import CacheHTTP
+from etl_comun.scraping import COLUMNA_SNAPSHOT, crear_sesion, extraer_snapshots
+
+RUTA_2023 = "/web/20230902185326/https://en.wikipedia.org/wiki/List_of_largest_banks"
+RUTA_2024 = "/web/20240115093000/https://en.wikipedia.org/wiki/List_of_largest_banks"
+
+
+def parse(page):
+    return tablas_html.extraer_tabla_tras_ancla(page, "By_market_capitalization")
+
+
+def nueva_cache(directorio, reintentos=3, backoff=0.0):
+    return CacheHTTP(directorio=str(directorio), offline=False,
+                     session=crear_sesion(pool_size=4, reintentos=reintentos, backoff=backoff))
+
+
+# ---------------------------------------------------------------------------
+# crear_sesion: reintentos y espera exponencial
+# ---------------------------------------------------------------------------
+
+def test_reintenta_respuestas_5xx_con_espera(servidor):
+    url = servidor.publicar_archivo(RUTA_2023, "bancos_2023.html")
+    servidor.fallar(RUTA_2023, veces=2)
+    backoff = 0.05
+
+    inicio = time.perf_counter()
+    respuesta = crear_sesion(reintentos=3, backoff=backoff).get(url, timeout=5)
+    duracion = time.perf_counter() - inicio
+
+    assert respuesta.status_code == 200
+    assert len(servidor.cabeceras_recibidas(RUTA_2023)) == 3
+    # urllib3 no espera antes del primer reintento y espera backoff * 2 antes del segundo
+    assert duracion >= backoff * 2
+
+
+def test_reintenta_429(servidor):
+    url = servidor.publicar_archivo(RUTA_2023, "bancos_2023.html")
+    servidor.fallar(RUTA_2023, veces=1, estado=429)
+
+    assert crear_sesion(backoff=0).get(url, timeout=5).status_code == 200
+    assert len(servidor.cabeceras_recibidas(RUTA_2023)) == 2
+
+
+def test_agota_los_reintentos(servidor):
+    url = servidor.publicar_archivo(RUTA_2023, "bancos_2023.html")
+    servidor.fallar(RUTA_2023, veces=10)
+
+    with pytest.raises(requests.exceptions.RetryError):
+        crear_sesion(reintentos=2, backoff=0).get(url, timeout=5)
+    assert len(servidor.cabeceras_recibidas(RUTA_2023)) == 3
+
+
+def test_no_reintenta_404(servidor):
+    respuesta = crear_sesion(backoff=0).get(servidor.url_base + "/no-existe", timeout=5)
+
+    assert respuesta.status_code == 404
+    assert len(servidor.cabeceras_recibidas("/no-existe")) == 1
+
+
+# ---------------------------------------------------------------------------
+# extraer_snapshots
+# ---------------------------------------------------------------------------
+
+def test_etiqueta_cada_snapshot_en_el_orden_de_las_urls(servidor, tmp_path):
+    urls = [servidor.publicar_archivo(RUTA_2024, "bancos_2024.html"),
+            servidor.publicar_archivo(RUTA_2023, "bancos_2023.html")]
+
+    df = extraer_snapshots(urls, parse, max_workers=2, cache=nueva_cache(tmp_path))
+
+    assert df[COLUMNA_SNAPSHOT].tolist() == ["2024-01-15T09:30:00"] * 2 + ["2023-09-02T18:53:26"] * 3
+    assert df["Bank name"].tolist() == ["JPMorgan Chase", "Bank of America", "JPMorgan Chase",
+                                        "Bank of America", "Industrial and Commercial Bank of China"]
+    assert df["Market cap (US$ billion)"].iloc[0] == pytest.approx(497.67)
+    assert df.index.tolist() == list(range(5))
+
+
+def test_url_fuera_del_archivo_se_etiqueta_con_la_url(servidor, tmp_path):
+    url = servidor.publicar_archivo("/bancos.html", "bancos_2023.html")
+
+    df = extraer_snapshots([url], parse, cache=nueva_cache(tmp_path))
+
+    assert set(df[COLUMNA_SNAPSHOT]) == {url}
+
+
+def test_reintenta_dentro_de_extraer_snapshots(servidor, tmp_path):
+    url = servidor.publicar_archivo(RUTA_2023, "bancos_2023.html")
+    servidor.fallar(RUTA_2023, veces=2, estado=502)
+
+    df = extraer_snapshots([url], parse, cache=nueva_cache(tmp_path))
+
+    assert len(df) == 3
+    assert len(servidor.cabeceras_recibidas(RUTA_2023)) == 3
+
+
+def test_lista_de_urls_vacia(servidor, tmp_path):
+    df = extraer_snapshots([], parse, cache=nueva_cache(tmp_path))
+
+    assert df.empty
+    assert df.columns.tolist() == [COLUMNA_SNAPSHOT]
+    assert servidor.peticiones == []
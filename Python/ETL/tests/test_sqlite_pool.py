@@ -0,0 +1,26 @@
+"""
+Pruebas de etl_comun.sqlite_pool.
+
+Autor: Fernando Blanco
+"""
+
+import sqlite3
+
+import pytest
+
+from etl_comun.sqlite_pool import PoolSQLite
+
+
+def test_conexion_fallida_no_consume_plaza(tmp_path):
+    pool = PoolSQLite(str(tmp_path / "no_existe" / "Banks.db"), tamano=1, timeout=0.1)
+
+    for _ in range(2):
+        with pytest.raises(sqlite3.OperationalError):
+            pool.adquirir()
+    assert pool._creadas == 0
+
+    (tmp_path / "no_existe").mkdir()
+    conn = pool.adquirir()
+    assert conn.execute("SELECT 1").fetchone() == (1,)
+    pool.liberar(conn)
+    pool.cerrar()
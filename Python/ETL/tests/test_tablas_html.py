@@ -0,0 +1,23 @@
+"""
+Pruebas de etl_comun.tablas_html.
+
+Autor: Fernando Blanco
+"""
+
+import pytest
+
+from etl_comun.tablas_html import construir_dataframe
+
+
+def test_descarta_filas_none():
+    filas = [("United States", "26854.6"), None, ("China", "19373.6")]
+    df = construir_dataframe(filas, ["Country", "GDP_USD_millions"], lambda fila: fila)
+
+    assert df.to_dict("list") == {"Country": ["United States", "China"],
+                                  "GDP_USD_millions": ["26854.6", "19373.6"]}
+
+
+def test_fila_con_valores_de_mas_falla():
+    filas = [("United States", "26854.6", "sobra")]
+    with pytest.raises(ValueError):
+        construir_dataframe(filas, ["Country", "GDP_USD_millions"], lambda fila: fila)
@@ -1,69 +1,64 @@
 # Script: Analisis de la coleccion 'usuarios' y almacenamiento de resultados en 'analisis_usuarios'
+# El reporte se calcula recorriendo la colección una sola vez ($group + $facet, o un único
+# find() agregado en Python si el servidor no soporta $facet; ver mongo_comun.analisis).
+# En modo "incremental" solo se agregan los documentos nuevos desde la ejecución anterior
+# y se suman a un resumen materializado (ver mongo_comun.incremental). La marca de agua es el
+# número de carga (contador del servidor, uno por lote) que csv_a_nosql.py fija en cada
+# documento insertado o actualizado; si una carga modificó documentos ya resumidos, o si el
+# número de documentos no cuadra con el resumen (borrados, colección recargada), el resumen
+# se reconstruye.
 
-from pymongo import MongoClient
-import json
+import sys
+from pathlib import Path
 from datetime import datetime
 
+from pymongo import MongoClient
+
+# Permite importar el paquete compartido mongo_comun (ubicado junto a este script)
+sys.path.append(str(Path(__file__).resolve().parent))
+from mongo_comun.analisis import calcular_analisis
+from mongo_comun import incremental, indices
+
+# --- Configuración del análisis ---
+modo = "completo"           # "completo" (recorre toda la colección) o "incremental" (resumen materializado)
+motor = "auto"              # Modo completo: "auto" ($facet y, si no está disponible, agregación en el cliente), "facet" o "cliente"
+verificar = False           # Modo incremental: comparar el resumen con un recálculo completo y reconstruirlo si difiere
+
 # --- Conectar a MongoDB ---
 client = MongoClient(GetVar('client'))
 db = client[GetVar('db')]
-usuarios_col = db["usuarios"]         
-analisis_col = db["analisis_usuarios"] 
+usuarios_col = db["usuarios"]
+analisis_col = db["analisis_usuarios"]
+resumen_col = db[incremental.COLECCION_RESUMEN]
+estado_col = db[incremental.COLECCION_ESTADO]
 
 # --- Fecha de análisis ---
 fecha_analisis = datetime.now().isoformat()
 
-# --- Total de registros ---
-total_registros = usuarios_col.count_documents({})
-print(total_registros)
-
-# --- Conteo de registros por Ciudad ---
-pipeline_ciudad = [
-    {"$group": {"_id": "$Ciudad", "cantidad": {"$sum": 1}}},
-    {"$sort": {"cantidad": -1}}
-]
-registros_por_ciudad = list(usuarios_col.aggregate(pipeline_ciudad))
-
-# --- Conteo de registros por Tipo_Pago ---
-pipeline_pago = [
-    {"$group": {"_id": "$Tipo_Pago", "cantidad": {"$sum": 1}}},
-    {"$sort": {"cantidad": -1}}
-]
-registros_por_pago = list(usuarios_col.aggregate(pipeline_pago))
-
-# --- Ventas totales por Producto ---
-pipeline_ventas_producto = [
-    {"$group": {"_id": "$Producto", "total_ventas": {"$sum": "$Total"}}},
-    {"$sort": {"total_ventas": -1}}
-]
-ventas_por_producto = list(usuarios_col.aggregate(pipeline_ventas_producto))
-
-# --- Ciudad con mayor venta total ---
-pipeline_ciudad_top_venta = [
-    {"$group": {"_id": "$Ciudad", "ventas_totales": {"$sum": "$Total"}}},
-    {"$sort": {"ventas_totales": -1}},
-    {"$limit": 1}
-]
-ciudad_top_venta = list(usuarios_col.aggregate(pipeline_ciudad_top_venta))
-ciudad_top = ciudad_top_venta[0]["_id"] if ciudad_top_venta else None
-ventas_top = ciudad_top_venta[0]["ventas_totales"] if ciudad_top_venta else 0
+# --- Total de registros, registros por Ciudad y Tipo_Pago, ventas por Producto y ciudad top ---
+if modo == "incremental":
+    actualizacion = incremental.actualizar_resumen(usuarios_col, resumen_col, estado_col)
+    if actualizacion["recalculado"]:
+        print("Resumen reconstruido desde cero.")
+    if verificar:
+        diferencias = incremental.verificar_consistencia(usuarios_col, resumen_col, estado_col)
+        if diferencias:
+            print(f"Resumen inconsistente ({len(diferencias)} combinaciones), se recalcula:", *diferencias[:10], sep="\n  ")
+            incremental.recalcular(usuarios_col, resumen_col, estado_col)
+    reporte = incremental.reporte_resumen(resumen_col)
+else:
+    # Si existe el índice del análisis, se le indica a la agregación con hint (ver mongo_comun.indices)
+    reporte = calcular_analisis(usuarios_col, motor=motor, hint=indices.indice_analisis(usuarios_col))
+print(reporte["total_registros"])
 
 # --- Crear documento de análisis ---
-analisis = {
-    "fecha_analisis": fecha_analisis,
-    "total_registros": total_registros,
-    "registros_por_ciudad": registros_por_ciudad,
-    "registros_por_pago": registros_por_pago,
-    "ventas_por_producto": ventas_por_producto,
-    "ciudad_mas_ventas": ciudad_top,
-    "total_ventas_ciudad_top": ventas_top
-}
+analisis = {"fecha_analisis": fecha_analisis, **reporte}
 
 # --- Insertar en la colección de análisis ---
 result = analisis_col.insert_one(analisis)
 print(f"Documento de análisis insertado con ID: {result.inserted_id}")
 
-SetVar('ciudad_mas_ventas',ciudad_top)
+SetVar('ciudad_mas_ventas', reporte["ciudad_mas_ventas"])
 
 # --- Cerrar conexión ---
 client.close()
@@ -0,0 +1,150 @@
+"""
+Benchmark: análisis de la colección de usuarios (analisis_nosql.py)
+===================================================================
+
+Compara el análisis original (count_documents + cuatro agregaciones, cinco
+recorridos de la colección) contra mongo_comun.analisis en una sola pasada:
+"facet" ($group por combinación + $facet) y "cliente" (un find() agregado en
+Python). Antes de medir se verifica que los tres reportes coinciden.
+
+Con --nuevos se mide además el modo incremental (mongo_comun.incremental):
+se materializa el resumen, se agregan `nuevos` documentos y se compara la
+actualización del resumen + reporte contra el análisis completo. mongomock
+no usa índices, así que ahí el $match por rango de la marca de carga también
+recorre toda la colección: la diferencia solo es representativa con --uri.
+
+Uso:
+    python bench_analisis.py --filas 10000 50000
+    python bench_analisis.py --filas 50000 --nuevos 1000
+    python bench_analisis.py --uri mongodb://localhost:27017/ --filas 1000000
+
+Con mongomock las agregaciones se ejecutan en Python, así que los tiempos
+solo sirven para comparar variantes entre sí; con --uri se mide el servidor.
+
+Autor: Fernando Blanco
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+sys.path.append(str(Path(__file__).resolve().parent))
+import generadores
+from mongo_comun import incremental
+from mongo_comun.analisis import calcular_analisis
+from mongo_comun.carga import insertar_lote, lotes
+
+
+def analisis_original(coleccion) -> dict:
+    """analisis_nosql.py original: cinco consultas independientes."""
+    total_registros = coleccion.count_documents({})
+    por_ciudad = list(coleccion.aggregate([
+        {"$group": {"_id": "$Ciudad", "cantidad": {"$sum": 1}}}, {"$sort": {"cantidad": -1}}]))
+    por_pago = list(coleccion.aggregate([
+        {"$group": {"_id": "$Tipo_Pago", "cantidad": {"$sum": 1}}}, {"$sort": {"cantidad": -1}}]))
+    por_producto = list(coleccion.aggregate([
+        {"$group": {"_id": "$Producto", "total_ventas": {"$sum": "$Total"}}}, {"$sort": {"total_ventas": -1}}]))
+    top = list(coleccion.aggregate([
+        {"$group": {"_id": "$Ciudad", "ventas_totales": {"$sum": "$Total"}}},
+        {"$sort": {"ventas_totales": -1}}, {"$limit": 1}]))
+    return {
+        "total_registros": total_registros,
+        "registros_por_ciudad": por_ciudad,
+        "registros_por_pago": por_pago,
+        "ventas_por_producto": por_producto,
+        "ciudad_mas_ventas": top[0]["_id"] if top else None,
+        "total_ventas_ciudad_top": top[0]["ventas_totales"] if top else 0,
+    }
+
+
+def _normalizar(valor):
+    """Redondea los floats (las sumas cambian de orden) y ordena las listas por _id."""
+    if isinstance(valor, float):
+        return round(valor, 6)
+    if isinstance(valor, list):
+        return sorted((_normalizar(v) for v in valor), key=lambda d: str(d.get("_id")))
+    if isinstance(valor, dict):
+        return {k: _normalizar(v) for k, v in valor.items()}
+    return valor
+
+
+def poblar(coleccion, n_filas: int, inicio_id: int = 1, vaciar: bool = True, marcar: bool = False) -> None:
+    if vaciar:
+        coleccion.drop()
+    for lote in lotes(generadores.documentos_usuarios(n_filas, semilla=inicio_id, inicio_id=inicio_id), 10_000):
+        insertar_lote(coleccion, lote, marcar=marcar)
+
+
+def medir(funcion, coleccion, repeticiones: int) -> float:
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion(coleccion)
+        tiempos.append(time.perf_counter() - inicio)
+    return min(tiempos)
+
+
+def medir_incremental(coleccion, resumen, estado, n_filas: int, nuevos: int) -> None:
+    """Actualización del resumen con `nuevos` documentos contra el análisis completo."""
+    resumen.drop()
+    estado.drop()
+    incremental.actualizar_resumen(coleccion, resumen, estado)
+    poblar(coleccion, nuevos, inicio_id=n_filas + 1, vaciar=False, marcar=True)   # Como csv_a_nosql.py
+
+    inicio = time.perf_counter()
+    incremental.actualizar_resumen(coleccion, resumen, estado)
+    reporte = incremental.reporte_resumen(resumen)
+    duracion_incremental = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    completo = calcular_analisis(coleccion)
+    duracion_completo = time.perf_counter() - inicio
+
+    assert _normalizar(reporte) == _normalizar(completo), "incremental: el reporte no coincide"
+    assert not incremental.verificar_consistencia(coleccion, resumen, estado), "incremental: resumen inconsistente"
+    print(f"+{nuevos:,} documentos nuevos: incremental {duracion_incremental:.3f}s, "
+          f"completo {duracion_completo:.3f}s")
+    coleccion.delete_many({"ID": {"$gt": n_filas}})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del análisis de la colección de usuarios")
+    parser.add_argument("--filas", type=int, nargs="+", default=[10_000, 50_000])
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--nuevos", type=int, help="Documentos agregados para medir el modo incremental")
+    parser.add_argument("--uri", help="Instancia de MongoDB (por defecto, mongomock)")
+    args = parser.parse_args()
+
+    variantes = {
+        "original (5 consultas)": analisis_original,
+        "facet (1 agregación)": lambda c: calcular_analisis(c, motor="facet"),
+        "cliente (1 find)": lambda c: calcular_analisis(c, motor="cliente"),
+    }
+    cliente = generadores.conectar(args.uri)
+    coleccion = cliente["bench_bitacora"]["usuarios_bench"]
+    resumen = cliente["bench_bitacora"]["resumen_bench"]
+    estado = cliente["bench_bitacora"]["estado_bench"]
+    print(f"Destino: {args.uri or 'mongomock'}")
+    try:
+        for n_filas in args.filas:
+            poblar(coleccion, n_filas)
+            referencia = _normalizar(analisis_original(coleccion))
+            for nombre, funcion in variantes.items():
+                assert _normalizar(funcion(coleccion)) == referencia, f"{nombre}: el reporte no coincide"
+
+            print(f"\n{n_filas:,} documentos")
+            print(f"{'variante':<26}{'tiempo':>10}{'docs/s':>13}")
+            for nombre, funcion in variantes.items():
+                duracion = medir(funcion, coleccion, args.repeticiones)
+                print(f"{nombre:<26}{duracion:>9.3f}s{n_filas / duracion:>13,.0f}")
+            if args.nuevos:
+                medir_incremental(coleccion, resumen, estado, n_filas, args.nuevos)
+    finally:
+        for c in (coleccion, resumen, estado):
+            c.drop()
+        cliente.close()
+
+
+if __name__ == "__main__":
+    main()
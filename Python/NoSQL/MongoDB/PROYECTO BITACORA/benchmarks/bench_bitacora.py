@@ -0,0 +1,138 @@
+"""
+Benchmark: eventos de inicio y fin de robots en la bitácora
+===========================================================
+
+Registra `n` ejecuciones (un evento de inicio y uno de fin cada una) con:
+
+    - scripts originales: conexión nueva por evento, inicio como texto ISO y
+      fin con find_one + update_one;
+    - scripts con en_lotes = False: conexión nueva por evento, fin en un solo
+      update con pipeline (mongo_comun.bitacora.finalizar_ejecucion);
+    - cliente persistente: la misma escritura, reutilizando el cliente;
+    - en lotes: mongo_comun.bitacora.BitacoraEnLotes, con el fin llegando
+      antes de que se escriba el inicio (un documento por ejecución) o
+      después (insert + update con pipeline en lotes distintos).
+
+Informa eventos/s y verifica que todas las ejecuciones quedaron cerradas con
+su duración. Con mongomock no hay red ni establecimiento de conexión, así
+que la ventaja del cliente persistente y de los lotes es mucho mayor con
+una instancia real (--uri).
+
+Uso:
+    python bench_bitacora.py --ejecuciones 2000
+    python bench_bitacora.py --uri mongodb://localhost:27017/ --ejecuciones 20000 --lote 500
+
+Autor: Fernando Blanco
+"""
+
+import argparse
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+sys.path.append(str(Path(__file__).resolve().parent))
+import generadores
+from mongo_comun.bitacora import BitacoraEnLotes, documento_inicio, finalizar_ejecucion
+
+BASE, COLECCION = "bench_bitacora", "bitacora_bench"
+
+
+def nueva_conexion(uri, base):
+    """Cliente nuevo, como el que abre cada script (con mongomock, sobre el mismo almacén en memoria)."""
+    if uri is None:
+        import mongomock
+        return mongomock.MongoClient(_store=base._store)
+    return generadores.conectar(uri)
+
+
+def scripts_originales(uri, base, n: int) -> None:
+    for i in range(n):
+        cliente = nueva_conexion(uri, base)
+        doc_id = cliente[BASE][COLECCION].insert_one({
+            "bot_name": f"Robot_{i % 20:02d}", "inicio": datetime.now().isoformat(), "fin": None,
+            "estado": "Iniciando", "archivo_encontrado": None, "duracion_segundos": None}).inserted_id
+        cliente.close()
+
+        cliente = nueva_conexion(uri, base)
+        coleccion = cliente[BASE][COLECCION]
+        fin = datetime.now()
+        inicio = datetime.fromisoformat(coleccion.find_one({"_id": doc_id})["inicio"])
+        coleccion.update_one({"_id": doc_id}, {"$set": {
+            "fin": fin.isoformat(), "duracion_segundos": (fin - inicio).total_seconds(), "estado": "OK"}})
+        cliente.close()
+
+
+def scripts_un_viaje(uri, base, n: int) -> None:
+    for i in range(n):
+        cliente = nueva_conexion(uri, base)
+        doc_id = cliente[BASE][COLECCION].insert_one(documento_inicio(f"Robot_{i % 20:02d}")).inserted_id
+        cliente.close()
+
+        cliente = nueva_conexion(uri, base)
+        finalizar_ejecucion(cliente[BASE][COLECCION], doc_id, ok=True)
+        cliente.close()
+
+
+def cliente_persistente(uri, base, n: int) -> None:
+    coleccion = base[BASE][COLECCION]
+    for i in range(n):
+        doc_id = coleccion.insert_one(documento_inicio(f"Robot_{i % 20:02d}")).inserted_id
+        finalizar_ejecucion(coleccion, doc_id, ok=True)
+
+
+def en_lotes_mismo_lote(tamano_lote: int):
+    def variante(uri, base, n: int) -> None:
+        bitacora = BitacoraEnLotes(base[BASE][COLECCION], tamano_lote=tamano_lote)
+        for i in range(n):
+            bitacora.finalizar(bitacora.iniciar(f"Robot_{i % 20:02d}"), ok=True)
+        bitacora.cerrar(sincronizar=True)
+    return variante
+
+
+def en_lotes_otro_lote(tamano_lote: int):
+    def variante(uri, base, n: int) -> None:
+        bitacora = BitacoraEnLotes(base[BASE][COLECCION], tamano_lote=tamano_lote)
+        ids = [bitacora.iniciar(f"Robot_{i % 20:02d}") for i in range(n)]
+        bitacora.vaciar()
+        for doc_id in ids:
+            bitacora.finalizar(doc_id, ok=True)
+        bitacora.cerrar(sincronizar=True)
+    return variante
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de eventos de la bitácora")
+    parser.add_argument("--ejecuciones", type=int, default=2_000)
+    parser.add_argument("--lote", type=int, default=500, help="tamano_lote de BitacoraEnLotes")
+    parser.add_argument("--uri", help="Instancia de MongoDB (por defecto, mongomock)")
+    args = parser.parse_args()
+
+    variantes = {
+        "scripts originales": scripts_originales,
+        "scripts (en_lotes = False)": scripts_un_viaje,
+        "cliente persistente": cliente_persistente,
+        "en lotes (fin en el mismo lote)": en_lotes_mismo_lote(args.lote),
+        "en lotes (fin en otro lote)": en_lotes_otro_lote(args.lote),
+    }
+    base = generadores.conectar(args.uri)
+    coleccion = base[BASE][COLECCION]
+    print(f"Destino: {args.uri or 'mongomock'} ({args.ejecuciones:,} ejecuciones, {2 * args.ejecuciones:,} eventos)")
+    print(f"\n{'variante':<34}{'tiempo':>10}{'eventos/s':>13}")
+    try:
+        for nombre, variante in variantes.items():
+            coleccion.drop()
+            inicio = time.perf_counter()
+            variante(args.uri, base, args.ejecuciones)
+            duracion = time.perf_counter() - inicio
+            cerradas = coleccion.count_documents({"estado": "OK", "duracion_segundos": {"$ne": None}})
+            assert cerradas == args.ejecuciones, f"{nombre}: {cerradas} de {args.ejecuciones} ejecuciones cerradas"
+            print(f"{nombre:<34}{duracion:>9.3f}s{2 * args.ejecuciones / duracion:>13,.0f}")
+    finally:
+        coleccion.drop()
+        base.close()
+
+
+if __name__ == "__main__":
+    main()
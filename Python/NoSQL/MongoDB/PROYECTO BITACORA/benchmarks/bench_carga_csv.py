@@ -0,0 +1,143 @@
+"""
+Benchmark: carga de CSV a MongoDB (csv_a_nosql.py)
+==================================================
+
+Compara la carga original (pd.read_csv completo + to_json + json.loads + un
+único insert_many) contra mongo_comun.carga.cargar_csv (lectura por
+bloques, conversión directa a documentos e insert_many(ordered=False) por
+lotes, en secuencia o en paralelo). Cada configuración de lotes se mide sin
+y con la marca de carga que usa el análisis incremental (el modo por
+defecto de cargar_csv: un find_one_and_update por lote para obtener el
+número de carga, que se agrega a los documentos antes del insert_many).
+
+Cada variante se ejecuta en un proceso propio sobre una colección vacía y
+se informan el tiempo, las filas/s y el pico de RSS del proceso. Destinos:
+
+    - nulo (por defecto): descarta los documentos; mide solo la parte del
+      cliente (lectura, conversión y armado de lotes) y su memoria.
+    - mongomock: colección en memoria (el pico incluye los documentos
+      almacenados y su inserción domina el tiempo).
+    - --uri: una instancia real de MongoDB (mide también el envío).
+
+Uso:
+    python bench_carga_csv.py --filas 100000 1000000
+    python bench_carga_csv.py --destino mongomock --filas 100000
+    python bench_carga_csv.py --uri mongodb://localhost:27017/ --hilos 1 4
+
+Autor: Fernando Blanco
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+sys.path.append(str(Path(__file__).resolve().parent))
+import generadores
+
+
+class ColeccionNula:
+    """Colección que descarta los documentos insertados (solo los cuenta)."""
+
+    name = "nula"
+
+    def __init__(self):
+        self.total = 0
+        self.cargas = 0
+        self.database = {"secuencias_carga": self}
+
+    def insert_many(self, documentos, ordered=True):
+        self.total += len(documentos)
+        return type("Resultado", (), {"inserted_ids": range(len(documentos))})()
+
+    def find_one_and_update(self, filtro, update, upsert=False, return_document=None):
+        self.cargas += 1
+        return {"_id": filtro["_id"], "valor": self.cargas}
+
+    def count_documents(self, filtro):
+        return self.total
+
+    def drop(self):
+        self.total = 0
+
+
+def carga_original(coleccion, ruta: str) -> int:
+    """csv_a_nosql.py original: todo el CSV en memoria y un solo insert_many."""
+    import pandas as pd
+    df = pd.read_csv(ruta, encoding='utf-8')
+    data = json.loads(df.to_json(orient='records'))
+    if data:
+        coleccion.insert_many(data)
+    return len(data)
+
+
+def carga_por_lotes(coleccion, ruta: str, tamano_lote: int, hilos: int, marcar: bool) -> int:
+    from mongo_comun.carga import cargar_csv
+    return cargar_csv(coleccion, ruta, tamano_lote=tamano_lote, hilos=hilos, marcar=marcar)["insertados"]
+
+
+def _ejecutar(uri, ruta, variante, tamano_lote, hilos, marcar, cola) -> None:
+    if uri == "nulo":
+        cliente, coleccion = None, ColeccionNula()
+    else:
+        cliente = generadores.conectar(uri)
+        coleccion = cliente["bench_bitacora"]["usuarios_bench"]
+    coleccion.drop()
+    inicio = time.perf_counter()
+    if variante == "original":
+        filas = carga_original(coleccion, ruta)
+    else:
+        filas = carga_por_lotes(coleccion, ruta, tamano_lote, hilos, marcar)
+    duracion = time.perf_counter() - inicio
+    assert coleccion.count_documents({}) == filas
+    coleccion.drop()
+    if cliente is not None:
+        cliente.close()
+    cola.put((duracion, filas, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024))
+
+
+def medir(uri, ruta, variante, tamano_lote=0, hilos=1, marcar=False):
+    cola = multiprocessing.Queue()
+    proceso = multiprocessing.Process(target=_ejecutar, args=(uri, ruta, variante, tamano_lote, hilos, marcar, cola))
+    proceso.start()
+    resultado = cola.get()
+    proceso.join()
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la carga de CSV a MongoDB")
+    parser.add_argument("--filas", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--lotes", type=int, nargs="+", default=[1_000, 10_000])
+    parser.add_argument("--hilos", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--destino", choices=("nulo", "mongomock"), default="nulo")
+    parser.add_argument("--uri", help="Instancia de MongoDB (reemplaza a --destino)")
+    args = parser.parse_args()
+    uri = args.uri or (None if args.destino == "mongomock" else "nulo")
+
+    print(f"Destino: {args.uri or args.destino}")
+    for n_filas in args.filas:
+        with tempfile.TemporaryDirectory() as directorio:
+            ruta = os.path.join(directorio, "usuarios.csv")
+            generadores.escribir_usuarios(ruta, n_filas)
+            print(f"\n{n_filas:,} filas ({os.path.getsize(ruta) / 1e6:.1f} MB)")
+            print(f"{'variante':<40}{'tiempo':>10}{'filas/s':>13}{'RSS pico':>12}")
+            variantes = [("original", 0, 1, False)] + [("por lotes", lote, hilos, marcar)
+                                                       for lote in args.lotes for hilos in args.hilos
+                                                       for marcar in (False, True)]
+            for variante, lote, hilos, marcar in variantes:
+                duracion, filas, rss = medir(uri, ruta, variante, lote, hilos, marcar)
+                nombre = variante if variante == "original" else f"lotes de {lote:,}, {hilos} hilo(s)"
+                if marcar:
+                    nombre += ", con marca"
+                print(f"{nombre:<40}{duracion:>9.2f}s{filas / duracion:>13,.0f}{rss / 1e6:>10.0f}MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Benchmark: consultas con y sin los índices de mongo_comun.indices
+=================================================================
+
+Sobre colecciones generadas de usuarios y de bitácora mide, primero sin
+índices y luego con los declarados en mongo_comun.indices:
+
+    - la carga de los usuarios (el índice del análisis encarece la inserción),
+    - el análisis completo ($group + $facet, con hint al índice si existe),
+    - la última ejecución de un robot (bot_name + inicio) y
+    - las ejecuciones de un robot en un mes.
+
+Con un servidor real (--uri) imprime además el reporte de explain() de los
+pipelines del análisis (si el plan queda cubierto por el índice). mongomock
+no usa índices ni implementa explain(), así que ahí ambas columnas deberían
+coincidir: solo sirve para comprobar que todo funciona.
+
+Uso:
+    python bench_indices.py --filas 20000 --bitacora 20000
+    python bench_indices.py --uri mongodb://localhost:27017/ --filas 1000000 --bitacora 200000
+
+Autor: Fernando Blanco
+"""
+
+import argparse
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+sys.path.append(str(Path(__file__).resolve().parent))
+import generadores
+from mongo_comun import indices
+from mongo_comun.analisis import calcular_analisis
+from mongo_comun.carga import lotes
+
+
+def cronometrar(funcion, repeticiones: int = 1) -> float:
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return min(tiempos)
+
+
+def poblar(coleccion, documentos) -> None:
+    for lote in lotes(documentos, 10_000):
+        coleccion.insert_many(lote, ordered=False)
+
+
+def consultas(usuarios, bitacora, repeticiones: int) -> dict:
+    robot = generadores.ROBOTS[0]
+    mes = {"$gte": datetime(2025, 3, 1, tzinfo=timezone.utc), "$lt": datetime(2025, 4, 1, tzinfo=timezone.utc)}
+    return {
+        "analisis completo": cronometrar(
+            lambda: calcular_analisis(usuarios, motor="facet", hint=indices.indice_analisis(usuarios)), repeticiones),
+        "ultima ejecucion de un robot": cronometrar(
+            lambda: list(bitacora.find({"bot_name": robot}).sort("inicio", -1).limit(1)), repeticiones),
+        "ejecuciones de un robot en un mes": cronometrar(
+            lambda: list(bitacora.find({"bot_name": robot, "inicio": mes})), repeticiones),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de consultas con y sin índices")
+    parser.add_argument("--filas", type=int, default=20_000, help="Documentos de usuarios")
+    parser.add_argument("--bitacora", type=int, default=20_000, help="Documentos de bitácora")
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--uri", help="Instancia de MongoDB (por defecto, mongomock)")
+    args = parser.parse_args()
+
+    cliente = generadores.conectar(args.uri)
+    db = cliente["bench_bitacora"]
+    usuarios, bitacora = db["usuarios_bench"], db["bitacora_bench"]
+    print(f"Destino: {args.uri or 'mongomock'} ({args.filas:,} usuarios, {args.bitacora:,} ejecuciones)")
+    try:
+        tiempos = {}
+        for con_indices in (False, True):
+            usuarios.drop()
+            bitacora.drop()
+            if con_indices:
+                indices.asegurar_indices(usuarios, "usuarios")
+                indices.asegurar_indices(bitacora, "bitacora")
+            carga = cronometrar(lambda: poblar(usuarios, generadores.documentos_usuarios(args.filas)))
+            poblar(bitacora, generadores.documentos_bitacora(args.bitacora))
+            tiempos[con_indices] = {"carga de usuarios": carga, **consultas(usuarios, bitacora, args.repeticiones)}
+
+        print(f"\n{'operacion':<36}{'sin indices':>13}{'con indices':>13}")
+        for operacion in tiempos[False]:
+            print(f"{operacion:<36}{tiempos[False][operacion]:>12.4f}s{tiempos[True][operacion]:>12.4f}s")
+
+        print("\nexplain() de los pipelines del análisis:")
+        for nombre, plan in indices.reporte_cobertura(usuarios).items():
+            if not plan["disponible"]:
+                print(f"  {nombre}: explain() no disponible en este servidor")
+                continue
+            estado = "cubierto" if plan["cubierto"] else "no cubierto"
+            print(f"  {nombre}: {estado}; etapas {' > '.join(plan['etapas'])}; índices {plan['indices'] or '-'}")
+    finally:
+        usuarios.drop()
+        bitacora.drop()
+        cliente.close()
+
+
+if __name__ == "__main__":
+    main()
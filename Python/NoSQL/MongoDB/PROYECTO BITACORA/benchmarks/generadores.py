@@ -0,0 +1,141 @@
+"""
+Datos sintéticos y conexión para los benchmarks del proyecto bitácora
+=====================================================================
+
+    - escribir_usuarios:  CSV de ventas con la forma del que carga
+                          csv_a_nosql.py (Ciudad, Producto, Total, Tipo_Pago...).
+    - documentos_usuarios: los mismos registros como documentos, para poblar
+                          una colección sin pasar por el CSV.
+    - documentos_bitacora: ejecuciones terminadas de varios robots, con la
+                          forma de los documentos de inicio/fin_robot_bitacora.py.
+    - conectar:           cliente de una instancia local de MongoDB o, si no
+                          se indica URI, de mongomock (en memoria).
+
+Todos los datos son deterministas para una misma semilla.
+
+Autor: Fernando Blanco
+"""
+
+import inspect
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Iterator, Optional
+
+BLOQUE = 100_000                        # Líneas generadas por escritura
+CIUDADES = ["Santiago", "Valparaíso", "Concepción", "Antofagasta", "Temuco",
+            "La Serena", "Rancagua", "Talca", "Arica", "Puerto Montt"]
+PRODUCTOS = {"Notebook": 650.0, "Monitor": 180.0, "Teclado": 25.0, "Mouse": 15.0,
+             "Impresora": 120.0, "Tablet": 300.0, "Audífonos": 45.0, "Disco SSD": 90.0}
+TIPOS_PAGO = ["Tarjeta de crédito", "Tarjeta de débito", "Transferencia", "Efectivo"]
+COLUMNAS = ["ID", "Nombre", "Ciudad", "Producto", "Cantidad", "Precio", "Total", "Tipo_Pago", "Fecha"]
+ROBOTS = [f"Robot_{i:02d}" for i in range(1, 21)]
+
+
+def registros_usuarios(n_filas: int, semilla: int = 0, inicio_id: int = 1) -> Iterator[list]:
+    """Genera `n_filas` registros de ventas (una lista de valores por fila, ver COLUMNAS)."""
+    rng = random.Random(semilla)
+    productos = list(PRODUCTOS.items())
+    fecha_base = datetime(2025, 1, 1)
+    for i in range(inicio_id, inicio_id + n_filas):
+        producto, precio = rng.choice(productos)
+        cantidad = rng.randint(1, 5)
+        fecha = fecha_base + timedelta(minutes=rng.randrange(525_600))
+        yield [i, f"Usuario {i}", rng.choice(CIUDADES), producto, cantidad, precio,
+               round(precio * cantidad, 2), rng.choice(TIPOS_PAGO), fecha.strftime("%Y-%m-%d %H:%M")]
+
+
+def escribir_usuarios(ruta: str, n_filas: int, semilla: int = 0) -> None:
+    """
+    Escribe un CSV de ventas de `n_filas` filas, en streaming.
+
+    Args:
+        ruta (str): Archivo destino.
+        n_filas (int): Filas a generar.
+        semilla (int): Semilla del generador aleatorio.
+    """
+    with open(ruta, "w", encoding="utf-8") as f:
+        f.write(",".join(COLUMNAS) + "\n")
+        bloque = []
+        for registro in registros_usuarios(n_filas, semilla):
+            bloque.append(",".join(str(valor) for valor in registro) + "\n")
+            if len(bloque) >= BLOQUE:
+                f.write("".join(bloque))
+                bloque.clear()
+        f.write("".join(bloque))
+
+
+def documentos_usuarios(n_filas: int, semilla: int = 0, inicio_id: int = 1) -> Iterator[dict]:
+    """Los registros de `registros_usuarios` como documentos de MongoDB."""
+    for registro in registros_usuarios(n_filas, semilla, inicio_id):
+        yield dict(zip(COLUMNAS, registro))
+
+
+def documentos_bitacora(n_documentos: int, semilla: int = 0) -> Iterator[dict]:
+    """Genera `n_documentos` ejecuciones terminadas (OK o FALLA) de los robots de ROBOTS."""
+    rng = random.Random(semilla)
+    fecha_base = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    for _ in range(n_documentos):
+        inicio = fecha_base + timedelta(seconds=rng.randrange(31_536_000))
+        duracion = rng.randint(5, 3_600)
+        ok = rng.random() < 0.9
+        yield {
+            "bot_name": rng.choice(ROBOTS),
+            "inicio": inicio,
+            "fin": inicio + timedelta(seconds=duracion),
+            "estado": "OK" if ok else "FALLA",
+            "archivo_encontrado": "usuarios.csv" if ok else None,
+            "duracion_segundos": float(duracion),
+        }
+
+
+def _compatibilizar_mongomock() -> None:
+    """
+    mongomock 4.3 no acepta los argumentos que pymongo >= 4.11 agrega al
+    armar las operaciones de bulk_write (p. ej. sort en UpdateOne): se
+    descartan los que la versión instalada no conoce. Tampoco aplica
+    partialFilterExpression al crear un índice; el filtro {campo: {"$exists":
+    True}} que usa mongo_comun.carga equivale a un índice sparse.
+    """
+    import mongomock
+    from mongomock.collection import BulkOperationBuilder, Collection
+
+    if not getattr(Collection.create_index, "compatible", False):
+        create_index = Collection.create_index
+
+        def crear_indice(self, claves, session=None, **opciones):
+            filtro = opciones.pop("partialFilterExpression", None)
+            if filtro and all(condicion == {"$exists": True} for condicion in filtro.values()):
+                opciones["sparse"] = True
+            return create_index(self, claves, session=session, **opciones)
+        crear_indice.compatible = True
+        Collection.create_index = crear_indice
+
+    for nombre in ("add_update", "add_replace", "add_delete"):
+        original = getattr(BulkOperationBuilder, nombre)
+        if getattr(original, "compatible", False):
+            continue
+        parametros = set(inspect.signature(original).parameters)
+
+        def envoltura(self, *args, _original=original, _parametros=parametros, **kwargs):
+            return _original(self, *args, **{k: v for k, v in kwargs.items() if k in _parametros})
+        envoltura.compatible = True
+        setattr(BulkOperationBuilder, nombre, envoltura)
+
+
+def conectar(uri: Optional[str] = None):
+    """
+    Cliente de MongoDB para los benchmarks.
+
+    Args:
+        uri (str | None): URI de una instancia (p. ej. mongodb://localhost:27017/).
+            Si es None se usa mongomock.
+
+    Returns:
+        pymongo.MongoClient | mongomock.MongoClient: Cliente conectado.
+    """
+    if uri is None:
+        import mongomock
+        _compatibilizar_mongomock()
+        return mongomock.MongoClient()
+    from pymongo import MongoClient
+    return MongoClient(uri)
@@ -1,33 +1,53 @@
 # Script: CSV a MongoDB
 # Descripción: Carga registros de un CSV a una colección de MongoDB y guarda estadísticas de la operación.
+# El CSV se lee por bloques y se inserta por lotes (ver mongo_comun.carga), de modo
+# que la memoria no depende del tamaño del archivo. En modo "upsert" la carga es
+# idempotente: volver a cargar el mismo archivo no duplica documentos (las filas
+# idénticas dentro del archivo se conservan como documentos distintos).
+
+import sys
+from pathlib import Path
 
-import pandas as pd
 from pymongo import MongoClient
-import json
+
+# Permite importar el paquete compartido mongo_comun (ubicado junto a este script)
+sys.path.append(str(Path(__file__).resolve().parent))
+from mongo_comun.carga import cargar_csv
+from mongo_comun.indices import asegurar_indices
 
 ruta = GetVar('_ruta_csv')
 
+# --- Configuración de la carga ---
+tamano_bloque = 100_000     # Filas del CSV leídas por bloque
+tamano_lote = 10_000        # Documentos por insert_many / bulk_write (ordered=False)
+hilos = 1                   # Lotes enviados en paralelo (1 = secuencial)
+modo = "insertar"           # "insertar" (duplica al recargar) o "upsert" (idempotente); ambos fijan la marca de carga del análisis incremental
+clave = None                # Clave natural del upsert (p. ej. "ID"); None = hash del contenido de la fila + su número de aparición entre las idénticas
+
 # Conectarse a MongoDB y seleccionar base de datos y colección
 client = MongoClient("mongodb://localhost:27017/")
 db = client["miBaseDeDatos"]
 collection = db["usuarios"]
 
-# Leer el CSV con pandas, usando codificación UTF-8
-df = pd.read_csv(ruta, encoding='utf-8')
-registros_leidos = df.count()
-
-# Convertir DataFrame a una lista de diccionarios, formato requerido por MongoDB
-data = json.loads(df.to_json(orient='records'))
+# Leer el CSV por bloques (UTF-8), convertir cada bloque en documentos y escribirlos por lotes
+# (en modo upsert se crea antes el índice único sobre la clave)
+resultado = cargar_csv(collection, ruta, tamano_bloque=tamano_bloque, tamano_lote=tamano_lote, hilos=hilos,
+                       modo=modo, clave=clave)
+registros_leidos = resultado["leidos"]
+print(f"{resultado['insertados']} documentos insertados, {resultado['actualizados']} actualizados y "
+      f"{resultado['sin_cambios']} sin cambios ({resultado['lotes']} lotes, {resultado['errores']} rechazados).")
 
-# Insertar registros en MongoDB si existen
-if data:
-    result = collection.insert_many(data)
-    print(f"{len(result.inserted_ids)} documentos insertados correctamente.")
+# Asegurar los índices que usa analisis_nosql.py (no hace nada si ya existen). Se crean
+# después de la carga: en la primera, construirlos de una vez es más barato que mantenerlos fila a fila
+asegurar_indices(collection, "usuarios")
 
 # Contar todos los documentos actuales en la colección
-registros_cargados = collection.count_documents()
+registros_cargados = collection.count_documents({})
 
 client.close()
 
 SetVar('registros_leidos', registros_leidos)
 SetVar('registros_cargados', registros_cargados)
+SetVar('registros_insertados', resultado['insertados'])
+SetVar('registros_actualizados', resultado['actualizados'])
+SetVar('registros_sin_cambios', resultado['sin_cambios'])
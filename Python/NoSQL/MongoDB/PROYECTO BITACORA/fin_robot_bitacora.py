@@ -1,48 +1,45 @@
-import json
-from datetime import datetime
+import sys
+from pathlib import Path
 from pymongo import MongoClient
-from bson import ObjectId 
+from bson import ObjectId
 
-# Obtener variables desde el entorno o desde Rocketbot
-doc_id = GetVar('doc_id')                  # ID del documento de inicio en MongoDB
-estatus_fin = GetVar('estatus_fin')        # Estado final de la ejecución ("True" o "False")
+# Permite importar el paquete compartido mongo_comun (ubicado junto a este script)
+sys.path.append(str(Path(__file__).resolve().parent))
+from mongo_comun.bitacora import finalizar_ejecucion, obtener_bitacora
+
+# Configuración
+# en_lotes = True: bitácora en lotes compartida con inicio_robot_bitacora.py; False: un update por ejecución.
+# En lotes, el fin se escribe después (a lo sumo en un segundo, o con vaciar_al_terminar) y se
+# pierde si el proceso muere antes; un error de escritura anterior se lanza en esta llamada.
+en_lotes = True
+vaciar_al_terminar = False  # En lotes: escribir ya los eventos pendientes (p. ej. en el último robot del flujo)
 
-# Conexión a MongoDB
-client = MongoClient(GetVar('client'))
-db = client[GetVar('db')]
-collection = db[GetVar('collection')]
+# Obtener variables desde el entorno o desde Rocketbot
+doc_id = GetVar('doc_id')                          # ID del documento de inicio en MongoDB
+estatus_fin = GetVar('estatus_fin')                # Estado final de la ejecución ("True" o "False")
+archivo_encontrado = GetVar('archivo_encontrado')  # Archivo procesado (se guarda solo si la ejecución fue exitosa)
 
 # Conversión de ID a tipo ObjectId
 doc_id = ObjectId(doc_id)
+ok = estatus_fin == "True"
 
-# Tiempos de ejecución
-fin = datetime.now()                                   # Fecha y hora de finalización
-ejecucion = collection.find_one({"_id": doc_id})       # Obtener el documento original
-inicio = datetime.fromisoformat(ejecucion["inicio"])   # Parsear fecha de inicio
-duracion = (fin - inicio).total_seconds()              # Calcular duración total (segundos)
-
-# Actualizar documento según el resultado de la ejecución
-if estatus_fin == "True":
-    # Caso exitoso
-    collection.update_one(
-        {"_id": doc_id},
-        {"$set": {
-            "fin": fin.isoformat(),
-            "duracion_segundos": duracion,
-            "archivo_encontrado": archivo_encontrado,
-            "estado": "OK"
-        }}
-    )
+# Actualizar documento según el resultado de la ejecución ("OK" o "FALLA").
+# fin y estado se fijan y duracion_segundos (fin - inicio) se calcula en el servidor con un
+# solo update; si inicio aún está guardado como texto, se lee el documento y se calcula aquí.
+if en_lotes:
+    # El fin se encola; si el inicio todavía no se escribió, se escriben juntos en un solo documento.
+    # Al terminar el proceso se escribe lo pendiente.
+    bitacora = obtener_bitacora(GetVar('client'), GetVar('db'), GetVar('collection'))
+    bitacora.finalizar(doc_id, ok=ok, archivo_encontrado=archivo_encontrado)
+    if vaciar_al_terminar:
+        bitacora.vaciar()
 else:
-    # Caso fallido
-    collection.update_one(
-        {"_id": doc_id},
-        {"$set": {
-            "fin": fin.isoformat(),
-            "duracion_segundos": duracion,
-            "estado": "FALLA"
-        }}
-    )
+    # Conexión a MongoDB
+    client = MongoClient(GetVar('client'))
+    db = client[GetVar('db')]
+    collection = db[GetVar('collection')]
+
+    finalizar_ejecucion(collection, doc_id, ok=ok, archivo_encontrado=archivo_encontrado)
 
-# Cerrar conexión
-client.close()
+    # Cerrar conexión
+    client.close()
@@ -2,43 +2,48 @@
 # Este script crea un documento en la colección especificada para almacenar
 # la información de inicio de ejecución de un bot, incluyendo fecha, estado
 # y duración de la ejecución (inicialmente nula).
+# En modo "en lotes" el documento se encola en una bitácora compartida por el proceso
+# (cliente persistente) y se escribe junto con otros eventos con bulk_write; el ID se
+# genera en el cliente, así que se devuelve a Rocketbot sin esperar la escritura.
 
-import json
-from datetime import datetime
+import sys
+from pathlib import Path
 from pymongo import MongoClient
 
+# Permite importar el paquete compartido mongo_comun (ubicado junto a este script)
+sys.path.append(str(Path(__file__).resolve().parent))
+from mongo_comun.bitacora import documento_inicio, obtener_bitacora
+
+# --- Configuración ---
+# en_lotes = True: bitácora en lotes (ver mongo_comun.bitacora); False: un insert_one por ejecución.
+# En lotes, doc_id se devuelve antes de que el documento exista en la base, y si el proceso de
+# Rocketbot muere sin terminar normalmente se pierden los eventos en espera (los de, a lo sumo,
+# el último segundo). Con False cada inicio queda escrito antes de continuar.
+en_lotes = True
+
 # --- Variables de entrada ---
 bot_name = GetVar('bot_name')          # bot_name = "Bitacora_NoSQL"
-
-# --- Fecha y hora de inicio de la ejecución ---
-inicio = datetime.now().isoformat()
-
-# --- Estado inicial de la ejecución ---
-estado = "Iniciando"
-
-# --- Conexión a MongoDB ---
-# Se obtienen los parámetros de conexión desde Rocketbot
-client = MongoClient(GetVar('client'))  # client = mongodb://localhost:27017/"
-db = client[GetVar('db')]               # db = "miBaseDeDatos"
-collection = db[GetVar('collection')]   # collection = "bitacora"
-
-# --- Creación del documento de ejecución ---
-# Se construye un diccionario con los campos que se almacenarán en MongoDB
-ejecucion = {
-    "bot_name": bot_name,         
-    "inicio": inicio,             
-    "fin": None,                  
-    "estado": estado,             
-    "archivo_encontrado": None,   
-    "duracion_segundos": None     
-}
-
-# --- Inserción del documento en la colección ---
-result = collection.insert_one(ejecucion)
-doc_id = result.inserted_id  # Guardar el ID generado por MongoDB
-
-# --- Cierre de la conexión ---
-client.close()
+uri = GetVar('client')                 # client = mongodb://localhost:27017/"
+nombre_db = GetVar('db')               # db = "miBaseDeDatos"
+nombre_coleccion = GetVar('collection')  # collection = "bitacora"
+
+if en_lotes:
+    # --- Encolar el inicio (fecha BSON en UTC, estado "Iniciando") ---
+    # La bitácora se crea en la primera ejecución del proceso (con sus índices) y se reutiliza
+    bitacora = obtener_bitacora(uri, nombre_db, nombre_coleccion)
+    doc_id = bitacora.iniciar(bot_name)
+else:
+    # --- Conexión a MongoDB ---
+    client = MongoClient(uri)
+    collection = client[nombre_db][nombre_coleccion]
+
+    # --- Creación e inserción del documento de ejecución ---
+    # inicio se guarda como fecha BSON en UTC para que fin_robot_bitacora.py calcule la duración en el servidor
+    result = collection.insert_one(documento_inicio(bot_name))
+    doc_id = result.inserted_id  # Guardar el ID generado por MongoDB
+
+    # --- Cierre de la conexión ---
+    client.close()
 
 # --- Variables de salida para Rocketbot ---
 SetVar('doc_id', doc_id)  # Se guarda el ID del documento insertado para su seguimiento
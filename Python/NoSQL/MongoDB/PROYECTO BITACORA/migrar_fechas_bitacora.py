@@ -0,0 +1,33 @@
+# Script: Preparación y migración de la bitácora
+# Crea los índices de la bitácora (bot_name + inicio; ver mongo_comun.indices) y convierte los campos inicio y fin guardados como texto ISO (versiones anteriores de
+# inicio/fin_robot_bitacora.py) a fechas BSON en UTC, para que fin_robot_bitacora.py
+# pueda calcular la duración en el servidor. Se ejecuta una vez al instalar o actualizar
+# los scripts (inicio_robot_bitacora.py no crea los índices); puede ejecutarse más de una vez.
+# Los textos sin zona horaria se interpretan en la hora local de esta máquina.
+
+import sys
+from pathlib import Path
+from pymongo import MongoClient
+
+# Permite importar el paquete compartido mongo_comun (ubicado junto a este script)
+sys.path.append(str(Path(__file__).resolve().parent))
+from mongo_comun.bitacora import migrar_fechas
+from mongo_comun.indices import asegurar_indices
+
+# --- Conexión a MongoDB ---
+client = MongoClient(GetVar('client'))  # client = mongodb://localhost:27017/"
+db = client[GetVar('db')]               # db = "miBaseDeDatos"
+collection = db[GetVar('collection')]   # collection = "bitacora"
+
+# --- Índices de la bitácora (no hace nada si ya existen) ---
+asegurar_indices(collection, "bitacora")
+
+# --- Conversión de las fechas guardadas como texto ---
+documentos_migrados = migrar_fechas(collection)
+print(f"{documentos_migrados} documentos de la bitácora migrados a fechas BSON.")
+
+# --- Cierre de la conexión ---
+client.close()
+
+# --- Variables de salida para Rocketbot ---
+SetVar('documentos_migrados', documentos_migrados)
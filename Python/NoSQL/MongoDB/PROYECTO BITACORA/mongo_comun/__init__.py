@@ -0,0 +1,13 @@
+"""
+Paquete mongo_comun
+===================
+
+Utilidades compartidas por los scripts del proyecto bitácora (carga de CSV,
+análisis y registro de ejecuciones de robots en MongoDB).
+
+Los scripts se ejecutan desde Rocketbot (GetVar / SetVar) y se mantienen
+breves: leen sus variables, llaman a las funciones de este paquete y
+devuelven los resultados a Rocketbot.
+
+Autor: Fernando Blanco
+"""
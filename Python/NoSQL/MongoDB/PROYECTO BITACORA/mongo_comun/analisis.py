@@ -0,0 +1,182 @@
+"""
+Análisis de la colección de usuarios en una sola pasada
+=======================================================
+
+Motor de analisis_nosql.py. El reporte (total de registros, registros por
+Ciudad y por Tipo_Pago, ventas por Producto y ciudad con más ventas) se
+calculaba con count_documents más cuatro pipelines, es decir, recorriendo la
+colección cinco veces. Aquí se recorre una sola vez:
+
+    - "facet": un $group por la combinación (Ciudad, Tipo_Pago, Producto)
+      reduce la colección a unas pocas filas con su cantidad y ventas, y un
+      $facet calcula sobre ellas todas las secciones del reporte.
+    - "cliente": para servidores sin $facet, un único find() con solo los
+      campos necesarios y la agregación en Python.
+    - "auto": "facet" y, si el servidor lo rechaza, "cliente".
+
+El documento resultante tiene la misma forma que el que generaba el script
+original. Las sumas de Total se acumulan en otro orden, por lo que pueden
+diferir en los últimos decimales.
+
+Autor: Fernando Blanco
+"""
+
+from typing import Dict, List, Optional
+
+from pymongo.errors import OperationFailure
+
+# ---------------------------------------------------------------------------
+# Configuración por defecto
+# ---------------------------------------------------------------------------
+
+MOTORES = ("auto", "facet", "cliente")
+CAMPOS = {"ciudad": "Ciudad", "pago": "Tipo_Pago", "producto": "Producto", "total": "Total"}
+
+
+# ---------------------------------------------------------------------------
+# Pipelines
+# ---------------------------------------------------------------------------
+
+def pipeline_combinaciones(campos: Dict[str, str] = CAMPOS) -> List[dict]:
+    """
+    $group por (Ciudad, Tipo_Pago, Producto) con la cantidad de registros y
+    la suma de Total de cada combinación: la única etapa que recorre la
+    colección.
+    """
+    return [{"$group": {
+        "_id": {"c": f"${campos['ciudad']}", "p": f"${campos['pago']}", "pr": f"${campos['producto']}"},
+        "cantidad": {"$sum": 1},
+        "ventas": {"$sum": f"${campos['total']}"},
+    }}]
+
+
+def pipeline_facet(campos: Dict[str, str] = CAMPOS) -> List[dict]:
+    """
+    Pipeline del reporte completo: pipeline_combinaciones seguido de un
+    $facet con una sección por cada consulta del script original.
+    """
+    return pipeline_combinaciones(campos) + [{"$facet": {
+        "total": [{"$group": {"_id": None, "n": {"$sum": "$cantidad"}}}],
+        "registros_por_ciudad": [
+            {"$group": {"_id": "$_id.c", "cantidad": {"$sum": "$cantidad"}}},
+            {"$sort": {"cantidad": -1}},
+        ],
+        "registros_por_pago": [
+            {"$group": {"_id": "$_id.p", "cantidad": {"$sum": "$cantidad"}}},
+            {"$sort": {"cantidad": -1}},
+        ],
+        "ventas_por_producto": [
+            {"$group": {"_id": "$_id.pr", "total_ventas": {"$sum": "$ventas"}}},
+            {"$sort": {"total_ventas": -1}},
+        ],
+        "ciudad_top": [
+            {"$group": {"_id": "$_id.c", "ventas_totales": {"$sum": "$ventas"}}},
+            {"$sort": {"ventas_totales": -1}},
+            {"$limit": 1},
+        ],
+    }}]
+
+
+# ---------------------------------------------------------------------------
+# Armado del reporte
+# ---------------------------------------------------------------------------
+
+def _reporte(total: int, por_ciudad: List[dict], por_pago: List[dict],
+             por_producto: List[dict], ciudad_top: List[dict]) -> dict:
+    """Documento de análisis con la forma del script original (sin la fecha)."""
+    return {
+        "total_registros": total,
+        "registros_por_ciudad": por_ciudad,
+        "registros_por_pago": por_pago,
+        "ventas_por_producto": por_producto,
+        "ciudad_mas_ventas": ciudad_top[0]["_id"] if ciudad_top else None,
+        "total_ventas_ciudad_top": ciudad_top[0]["ventas_totales"] if ciudad_top else 0,
+    }
+
+
+def reporte_desde_combinaciones(combinaciones: List[dict]) -> dict:
+    """
+    Arma el reporte a partir de las filas de pipeline_combinaciones (o de
+    cualquier lista con la misma forma: _id {c, p, pr}, cantidad, ventas).
+
+    Args:
+        combinaciones (List[dict]): Cantidad y ventas por combinación.
+
+    Returns:
+        dict: Documento de análisis (sin la fecha).
+    """
+    por_ciudad, por_pago, por_producto, ventas_ciudad = {}, {}, {}, {}
+    total = 0
+    for fila in combinaciones:
+        clave, cantidad, ventas = fila["_id"], fila["cantidad"], fila["ventas"]
+        total += cantidad
+        por_ciudad[clave.get("c")] = por_ciudad.get(clave.get("c"), 0) + cantidad
+        por_pago[clave.get("p")] = por_pago.get(clave.get("p"), 0) + cantidad
+        por_producto[clave.get("pr")] = por_producto.get(clave.get("pr"), 0) + ventas
+        ventas_ciudad[clave.get("c")] = ventas_ciudad.get(clave.get("c"), 0) + ventas
+
+    def ordenar(conteos, campo):
+        return [{"_id": k, campo: v} for k, v in sorted(conteos.items(), key=lambda kv: kv[1], reverse=True)]
+
+    return _reporte(total, ordenar(por_ciudad, "cantidad"), ordenar(por_pago, "cantidad"),
+                    ordenar(por_producto, "total_ventas"), ordenar(ventas_ciudad, "ventas_totales")[:1])
+
+
+def analisis_facet(coleccion, campos: Dict[str, str] = CAMPOS, hint: Optional[str] = None) -> dict:
+    """Reporte con una sola agregación ($group + $facet) en el servidor (opcionalmente forzando un índice)."""
+    opciones = {"hint": hint} if hint else {}
+    resultado = next(coleccion.aggregate(pipeline_facet(campos), allowDiskUse=True, **opciones), None) or {}
+    total = resultado.get("total") or [{"n": 0}]
+    return _reporte(total[0]["n"], resultado.get("registros_por_ciudad", []),
+                    resultado.get("registros_por_pago", []), resultado.get("ventas_por_producto", []),
+                    resultado.get("ciudad_top", []))
+
+
+def analisis_cliente(coleccion, campos: Dict[str, str] = CAMPOS) -> dict:
+    """Reporte con un único find() (solo los campos necesarios) agregado en Python."""
+    combinaciones = {}
+    proyeccion = {campo: 1 for campo in campos.values()}
+    proyeccion["_id"] = 0
+    for doc in coleccion.find({}, proyeccion):
+        clave = (doc.get(campos["ciudad"]), doc.get(campos["pago"]), doc.get(campos["producto"]))
+        total = doc.get(campos["total"])
+        fila = combinaciones.setdefault(clave, [0, 0])
+        fila[0] += 1
+        if isinstance(total, (int, float)) and not isinstance(total, bool):   # Igual que $sum
+            fila[1] += total
+    return reporte_desde_combinaciones([
+        {"_id": {"c": c, "p": p, "pr": pr}, "cantidad": cantidad, "ventas": ventas}
+        for (c, p, pr), (cantidad, ventas) in combinaciones.items()
+    ])
+
+
+def calcular_analisis(coleccion, motor: str = "auto", campos: Optional[Dict[str, str]] = None,
+                      hint: Optional[str] = None) -> dict:
+    """
+    Calcula el reporte de la colección de usuarios en una sola pasada.
+
+    Args:
+        coleccion (pymongo.collection.Collection): Colección de usuarios.
+        motor (str): "auto", "facet" o "cliente" (ver el encabezado del módulo).
+        campos (dict | None): Nombres de los campos ciudad, pago, producto y
+            total (por defecto, CAMPOS).
+        hint (str | None): Índice que debe usar la agregación del motor
+            "facet" (ver mongo_comun.indices.indice_analisis).
+
+    Returns:
+        dict: Documento de análisis (sin la fecha).
+
+    Raises:
+        ValueError: Si el motor no existe.
+    """
+    if motor not in MOTORES:
+        raise ValueError(f"Motor de análisis no válido: {motor} (opciones: {', '.join(MOTORES)})")
+    campos = campos or CAMPOS
+    if motor == "cliente":
+        return analisis_cliente(coleccion, campos)
+    try:
+        return analisis_facet(coleccion, campos, hint)
+    except (OperationFailure, NotImplementedError):   # Servidor sin $facet
+        if motor == "facet":
+            raise
+        return analisis_cliente(coleccion, campos)
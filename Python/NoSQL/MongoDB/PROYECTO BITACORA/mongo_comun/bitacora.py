@@ -0,0 +1,476 @@
+"""
+Registro de inicio y fin de ejecuciones en la bitácora
+======================================================
+
+Funciones de inicio_robot_bitacora.py y fin_robot_bitacora.py. Las fechas
+inicio y fin se guardan como fechas BSON en UTC (antes, como texto ISO en la
+hora local), lo que permite cerrar una ejecución con un solo viaje al
+servidor:
+
+    - finalizar_ejecucion envía un update con pipeline de agregación
+      (MongoDB >= 4.2) que fija fin y estado y calcula duracion_segundos
+      como fin - inicio ($subtract de fechas, en milisegundos), en lugar de
+      find_one + cálculo en el cliente + update_one.
+    - Si el documento aún tiene inicio como texto o el servidor no soporta
+      updates con pipeline, se usa el camino anterior (dos viajes), que
+      además convierte inicio a fecha en ese documento.
+    - migrar_fechas convierte a fecha los inicio / fin guardados como texto
+      en los documentos existentes.
+    - BitacoraEnLotes / obtener_bitacora: cliente persistente (con su pool
+      de conexiones) que acumula los eventos de inicio y fin y los escribe
+      con bulk_write al llegar a `tamano_lote` eventos o cada `intervalo`
+      segundos, en lugar de abrir una conexión y escribir un documento por
+      evento.
+
+fin se toma del reloj del cliente (el mismo que fijó inicio), no de $$NOW,
+para que la duración no dependa del desfase entre el robot y el servidor.
+
+Autor: Fernando Blanco
+"""
+
+import atexit
+import threading
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Optional
+
+from bson import ObjectId
+from pymongo import InsertOne, MongoClient, UpdateOne
+from pymongo.errors import BulkWriteError, OperationFailure, PyMongoError
+
+from .indices import asegurar_indices
+
+# ---------------------------------------------------------------------------
+# Configuración por defecto
+# ---------------------------------------------------------------------------
+
+CAMPOS_FECHA = ("inicio", "fin")
+TAMANO_LOTE = 1_000        # Documentos por bulk_write en la migración
+TAMANO_BUFFER = 500        # Eventos en espera que disparan la escritura de un lote
+INTERVALO_VACIADO = 1.0    # Segundos máximos que un evento espera en el buffer
+MAX_PENDIENTES = 10_000    # Con más eventos en espera, quien encola escribe el lote él mismo
+CLAVE_DUPLICADA = 11000    # Código de error de MongoDB (inicio ya escrito en un reintento)
+
+
+def ahora() -> datetime:
+    """Fecha y hora actual en UTC (con zona horaria, como la guarda pymongo)."""
+    return datetime.now(timezone.utc)
+
+
+def a_fecha(valor) -> Optional[datetime]:
+    """
+    Convierte una fecha de la bitácora a datetime en UTC.
+
+    Los textos ISO sin zona horaria (los que guardaba la versión anterior
+    con datetime.now().isoformat()) se interpretan en la hora local de esta
+    máquina. Los datetime sin zona son los que devuelve pymongo, en UTC.
+    """
+    if valor is None:
+        return None
+    if isinstance(valor, str):
+        valor = datetime.fromisoformat(valor)
+        return valor.astimezone(timezone.utc)
+    return valor if valor.tzinfo else valor.replace(tzinfo=timezone.utc)
+
+
+# ---------------------------------------------------------------------------
+# Inicio y fin de una ejecución
+# ---------------------------------------------------------------------------
+
+def documento_inicio(bot_name: str, inicio: Optional[datetime] = None) -> dict:
+    """Documento de una ejecución que comienza (inicio como fecha BSON en UTC)."""
+    return {
+        "bot_name": bot_name,
+        "inicio": inicio or ahora(),
+        "fin": None,
+        "estado": "Iniciando",
+        "archivo_encontrado": None,
+        "duracion_segundos": None,
+    }
+
+
+def campos_fin(ok: bool, archivo_encontrado=None, fin: Optional[datetime] = None) -> dict:
+    """Campos que se fijan al terminar una ejecución (sin la duración)."""
+    campos = {"fin": fin or ahora(), "estado": "OK" if ok else "FALLA"}
+    if ok:
+        campos["archivo_encontrado"] = archivo_encontrado
+    return campos
+
+
+def pipeline_fin(campos: dict) -> list:
+    """Update con pipeline que fija los campos de fin y calcula duracion_segundos en el servidor."""
+    return [{"$set": {
+        **{campo: {"$literal": valor} for campo, valor in campos.items()},
+        "duracion_segundos": {"$divide": [{"$subtract": [{"$literal": campos["fin"]}, "$inicio"]}, 1000]},
+    }}]
+
+
+def pipeline_inicio(doc: dict) -> list:
+    """
+    Update con pipeline que completa con los campos de inicio un documento
+    creado por un fin que llegó antes (ver BitacoraEnLotes), calculando
+    duracion_segundos en el servidor.
+    """
+    return [{"$set": {
+        "bot_name": {"$literal": doc["bot_name"]},
+        "inicio": {"$literal": doc["inicio"]},
+        "archivo_encontrado": {"$ifNull": ["$archivo_encontrado", None]},
+        "duracion_segundos": {"$divide": [{"$subtract": ["$fin", {"$literal": doc["inicio"]}]}, 1000]},
+    }}]
+
+
+def _finalizar_cliente(coleccion, doc_id, campos: dict) -> None:
+    """Camino de dos viajes: lee inicio, calcula la duración y actualiza (convirtiendo inicio a fecha)."""
+    ejecucion = coleccion.find_one({"_id": doc_id}, {"inicio": 1})
+    if ejecucion is None:
+        raise ValueError(f"No existe la ejecución {doc_id} en la bitácora")
+    inicio = a_fecha(ejecucion["inicio"])
+    duracion = (a_fecha(campos["fin"]) - inicio).total_seconds()
+    coleccion.update_one({"_id": doc_id}, {"$set": {**campos, "inicio": inicio, "duracion_segundos": duracion}})
+
+
+def finalizar_ejecucion(coleccion, doc_id, ok: bool, archivo_encontrado=None,
+                        fin: Optional[datetime] = None) -> str:
+    """
+    Cierra una ejecución de la bitácora.
+
+    Args:
+        coleccion (pymongo.collection.Collection): Colección de bitácora.
+        doc_id (ObjectId): _id del documento de inicio.
+        ok (bool): True si la ejecución terminó bien (estado "OK"), False
+            para "FALLA".
+        archivo_encontrado: Se guarda solo si ok es True.
+        fin (datetime | None): Fecha de fin (por defecto, ahora en UTC).
+
+    Returns:
+        str: "servidor" si bastó un update con pipeline, "cliente" si se
+        usó el camino de dos viajes.
+
+    Raises:
+        ValueError: Si el documento no existe.
+    """
+    campos = campos_fin(ok, archivo_encontrado, fin)
+    try:
+        # Solo coincide si inicio ya es una fecha BSON
+        resultado = coleccion.update_one({"_id": doc_id, "inicio": {"$type": "date"}}, pipeline_fin(campos))
+        if resultado.matched_count:
+            return "servidor"
+    except OperationFailure:   # Servidor sin updates con pipeline (MongoDB < 4.2)
+        pass
+    _finalizar_cliente(coleccion, doc_id, campos)
+    return "cliente"
+
+
+# ---------------------------------------------------------------------------
+# Migración de fechas guardadas como texto
+# ---------------------------------------------------------------------------
+
+def migrar_fechas(coleccion, campos: Iterable[str] = CAMPOS_FECHA, tamano_lote: int = TAMANO_LOTE) -> int:
+    """
+    Convierte a fecha BSON (UTC) los campos de fecha guardados como texto ISO.
+
+    Los textos sin zona horaria se interpretan en la hora local de la
+    máquina que ejecuta la migración (ver a_fecha), que debe ser la misma
+    que la de los robots que los escribieron. Puede ejecutarse varias veces:
+    solo toca los documentos que aún tienen texto.
+
+    Args:
+        coleccion (pymongo.collection.Collection): Colección de bitácora.
+        campos (Iterable[str]): Campos a convertir.
+        tamano_lote (int): Documentos por bulk_write.
+
+    Returns:
+        int: Documentos modificados.
+    """
+    campos = list(campos)
+    filtro = {"$or": [{campo: {"$type": "string"}} for campo in campos]}
+    modificados, operaciones = 0, []
+    for doc in coleccion.find(filtro, {campo: 1 for campo in campos}):
+        cambios = {campo: a_fecha(doc[campo]) for campo in campos if isinstance(doc.get(campo), str)}
+        operaciones.append(UpdateOne({"_id": doc["_id"]}, {"$set": cambios}))
+        if len(operaciones) >= tamano_lote:
+            modificados += coleccion.bulk_write(operaciones, ordered=False).modified_count
+            operaciones = []
+    if operaciones:
+        modificados += coleccion.bulk_write(operaciones, ordered=False).modified_count
+    return modificados
+
+
+# ---------------------------------------------------------------------------
+# Escritura en lotes con un cliente persistente
+# ---------------------------------------------------------------------------
+
+class BitacoraEnLotes:
+    """
+    Bitácora que acumula los eventos de inicio y fin y los escribe en lotes.
+
+    - iniciar() genera el _id en el cliente (ObjectId), así que lo devuelve
+      al instante aunque el documento aún no esté escrito.
+    - Si una ejecución termina antes de que se escriba su inicio, el fin se
+      aplica sobre el documento en espera (se escribe una sola vez, con la
+      duración calculada en el cliente). Si no, se encola un update con
+      pipeline (pipeline_fin) que calcula la duración en el servidor.
+    - Un hilo de fondo escribe el buffer con bulk_write(ordered=False) cada
+      `intervalo` segundos o apenas se juntan `tamano_lote` eventos. Los
+      lotes se escriben de a uno, así que el inicio de una ejecución siempre
+      llega antes que su fin.
+    - Si el fin llega a otro proceso antes de que se escriba su inicio (el
+      inicio sigue en el buffer de quien lo encoló), el fin se guarda con
+      un upsert; cuando llega el inicio (clave duplicada) se completa ese
+      documento con bot_name e inicio y se calcula la duración.
+    - Si la escritura falla (p. ej. el servidor no responde), el lote vuelve
+      al buffer y se reintenta en el siguiente vaciado; los inicios que ya
+      se habían escrito se ignoran (clave duplicada) y los fines fijan
+      valores absolutos, así que el reintento no duplica nada. Si falla el
+      hilo de fondo, el error se lanza en la siguiente llamada a iniciar()
+      o finalizar() (cuyo evento no se encola; los pendientes siguen en el
+      buffer).
+    - Durabilidad: los eventos en el buffer se pierden si el proceso muere
+      sin llegar a cerrar() (a lo sumo los de los últimos `intervalo`
+      segundos), y el _id devuelto por iniciar() puede usarse antes de que
+      el documento exista en la base.
+    - vaciar() escribe lo pendiente de forma síncrona y cerrar() detiene el
+      hilo (por defecto, vaciando antes).
+    """
+
+    def __init__(self, coleccion, tamano_lote: int = TAMANO_BUFFER, intervalo: float = INTERVALO_VACIADO,
+                 max_pendientes: int = MAX_PENDIENTES, cliente: Optional[MongoClient] = None):
+        """
+        Args:
+            coleccion (pymongo.collection.Collection): Colección de bitácora.
+            tamano_lote (int): Eventos en espera que disparan la escritura.
+            intervalo (float): Segundos máximos entre escrituras.
+            max_pendientes (int): Eventos en espera a partir de los cuales
+                iniciar() / finalizar() escriben el lote ellos mismos.
+            cliente (MongoClient | None): Cliente que cerrar() debe cerrar.
+        """
+        self.coleccion = coleccion
+        self.tamano_lote = tamano_lote
+        self.intervalo = intervalo
+        self.max_pendientes = max_pendientes
+        self.estadisticas = Counter()   # insertados, finalizados, sin_inicio, errores, lotes
+        self.ultimo_error = None        # Último error de escritura del hilo de fondo
+        self.cerrada = False
+        self._cliente = cliente
+        self._inicios: Dict[ObjectId, dict] = {}   # Documentos de inicio aún no escritos
+        self._finales = []                          # (doc_id, campos) con el inicio ya escrito
+        self._buffer = threading.Lock()
+        self._escritura = threading.Lock()
+        self._despertar = threading.Event()
+        self._hilo = threading.Thread(target=self._vaciar_periodicamente, name="bitacora-en-lotes", daemon=True)
+        self._hilo.start()
+
+    # --- Eventos ---
+
+    def iniciar(self, bot_name: str, inicio: Optional[datetime] = None) -> ObjectId:
+        """Encola el inicio de una ejecución y devuelve su _id."""
+        doc = documento_inicio(bot_name, inicio)
+        doc["_id"] = ObjectId()
+        with self._buffer:
+            self._verificar_abierta()
+            self._inicios[doc["_id"]] = doc
+        self._encolado()
+        return doc["_id"]
+
+    def finalizar(self, doc_id, ok: bool, archivo_encontrado=None, fin: Optional[datetime] = None) -> None:
+        """Encola el fin de una ejecución (mismos argumentos que finalizar_ejecucion)."""
+        doc_id = ObjectId(doc_id)
+        campos = campos_fin(ok, archivo_encontrado, fin)
+        with self._buffer:
+            self._verificar_abierta()
+            if doc_id in self._inicios:
+                self._aplicar_fin(self._inicios[doc_id], campos)
+            else:
+                self._finales.append((doc_id, campos))
+        self._encolado()
+
+    @staticmethod
+    def _aplicar_fin(doc: dict, campos: dict) -> None:
+        doc.update(campos)
+        doc["duracion_segundos"] = (a_fecha(campos["fin"]) - a_fecha(doc["inicio"])).total_seconds()
+
+    def _verificar_abierta(self) -> None:
+        if self.cerrada:
+            raise RuntimeError("La bitácora está cerrada")
+        if self.ultimo_error is not None:   # Error del hilo de fondo: se informa una sola vez
+            error, self.ultimo_error = self.ultimo_error, None
+            raise error
+
+    def _encolado(self) -> None:
+        pendientes = self.pendientes
+        if pendientes >= self.max_pendientes:
+            self.vaciar()
+        elif pendientes >= self.tamano_lote:
+            self._despertar.set()
+
+    @property
+    def pendientes(self) -> int:
+        """Eventos en espera de ser escritos."""
+        return len(self._inicios) + len(self._finales)
+
+    # --- Escritura ---
+
+    def vaciar(self) -> int:
+        """
+        Escribe de forma síncrona los eventos en espera.
+
+        Returns:
+            int: Operaciones enviadas (0 si no había nada pendiente).
+
+        Raises:
+            PyMongoError: Si la escritura falla (los eventos vuelven al buffer).
+        """
+        with self._escritura:
+            with self._buffer:
+                inicios, finales = list(self._inicios.values()), self._finales
+                self._inicios, self._finales = {}, []
+            if not inicios and not finales:
+                return 0
+            operaciones = [InsertOne(doc) for doc in inicios]
+            operaciones += [UpdateOne({"_id": doc_id, "inicio": {"$type": "date"}}, pipeline_fin(campos))
+                            for doc_id, campos in finales]
+            try:
+                detalle = self.coleccion.bulk_write(operaciones, ordered=False).bulk_api_result
+            except BulkWriteError as e:   # El resto del lote se escribió igualmente
+                detalle = e.details
+            except PyMongoError:
+                self._reencolar(inicios, finales)
+                raise
+            self._contabilizar(detalle, inicios, finales)
+            return len(operaciones)
+
+    def _reencolar(self, inicios: list, finales: list) -> None:
+        """Devuelve un lote fallido al buffer, aplicando los fines que llegaron mientras tanto."""
+        with self._buffer:
+            self._inicios = {**{doc["_id"]: doc for doc in inicios}, **self._inicios}
+            restantes = []
+            for doc_id, campos in finales + self._finales:
+                if doc_id in self._inicios:
+                    self._aplicar_fin(self._inicios[doc_id], campos)
+                else:
+                    restantes.append((doc_id, campos))
+            self._finales = restantes
+
+    def _contabilizar(self, detalle: dict, inicios: list, finales: list) -> None:
+        errores = []
+        for error in detalle.get("writeErrors", []):
+            if error["index"] >= len(inicios) or error.get("code") != CLAVE_DUPLICADA:
+                errores.append(error)
+                continue
+            # Inicio ya escrito por un intento anterior (si mientras tanto se le aplicó el fin, se
+            # reemplaza) o documento creado por un fin que llegó antes (se completa con el inicio)
+            doc = inicios[error["index"]]
+            if doc["fin"] is not None:
+                self.coleccion.replace_one({"_id": doc["_id"]}, doc)
+            else:
+                self.coleccion.update_one({"_id": doc["_id"], "inicio": {"$exists": False}}, pipeline_inicio(doc))
+        sin_coincidencia = len(finales) - detalle.get("nMatched", 0) - sum(e["index"] >= len(inicios) for e in errores)
+        if sin_coincidencia > 0:
+            self._finalizar_sin_coincidencia(finales)
+        self.estadisticas["insertados"] += detalle.get("nInserted", 0)
+        self.estadisticas["finalizados"] += detalle.get("nMatched", 0)
+        self.estadisticas["errores"] += len(errores)
+        self.estadisticas["lotes"] += 1
+
+    def _finalizar_sin_coincidencia(self, finales: list) -> None:
+        """
+        Fines que no coincidieron con un inicio como fecha: si el inicio está
+        guardado como texto, camino de dos viajes (ver finalizar_ejecucion);
+        si aún no existe (otro proceso lo tiene en su buffer), upsert del fin.
+        """
+        ids = [doc_id for doc_id, _ in finales]
+        inicios = {doc["_id"]: doc.get("inicio") for doc in self.coleccion.find({"_id": {"$in": ids}}, {"inicio": 1})}
+        sin_inicio = []
+        for doc_id, campos in finales:
+            if isinstance(inicios.get(doc_id), str):
+                _finalizar_cliente(self.coleccion, doc_id, campos)
+                self.estadisticas["finalizados"] += 1
+            elif doc_id not in inicios:
+                sin_inicio.append((doc_id, campos))
+        if not sin_inicio:
+            return
+        try:
+            # Si el inicio se escribió entre medias, el mismo pipeline calcula la duración
+            self.coleccion.bulk_write([UpdateOne({"_id": doc_id}, pipeline_fin(campos), upsert=True)
+                                       for doc_id, campos in sin_inicio], ordered=False)
+        except PyMongoError:
+            self._reencolar([], sin_inicio)
+            raise
+        self.estadisticas["sin_inicio"] += len(sin_inicio)
+
+    def _vaciar_periodicamente(self) -> None:
+        while True:
+            self._despertar.wait(self.intervalo)
+            self._despertar.clear()
+            if self.cerrada:   # cerrar() decide si se escribe lo pendiente
+                return
+            try:
+                self.vaciar()
+            except PyMongoError as e:   # Los eventos siguen en el buffer
+                self.ultimo_error = e
+
+    def cerrar(self, sincronizar: bool = True) -> None:
+        """
+        Detiene el hilo de fondo y cierra el cliente propio.
+
+        Args:
+            sincronizar (bool): Escribir antes los eventos en espera. Si es
+                False, los eventos pendientes se descartan.
+        """
+        if self.cerrada:
+            return
+        with self._buffer:
+            self.cerrada = True
+        self._despertar.set()
+        self._hilo.join()
+        try:
+            if sincronizar:
+                self.vaciar()
+        finally:
+            if self._cliente is not None:
+                self._cliente.close()
+
+
+# Bitácoras abiertas por el proceso: los scripts de Rocketbot se ejecutan en el mismo
+# intérprete, así que cada ejecución reutiliza el cliente y el buffer de la anterior
+_BITACORAS: Dict[tuple, BitacoraEnLotes] = {}
+_REGISTRO = threading.Lock()
+
+
+def obtener_bitacora(uri: str, db: str, coleccion: str, **opciones) -> BitacoraEnLotes:
+    """
+    Bitácora en lotes compartida por el proceso para una URI, base y colección.
+
+    La primera llamada crea el cliente (con su pool de conexiones) y asegura
+    los índices de la bitácora; las siguientes devuelven la misma instancia
+    (las opciones solo se aplican al crearla). Al terminar el proceso, las
+    bitácoras abiertas se vacían y se cierran (cerrar_bitacoras).
+
+    Args:
+        uri (str): URI de conexión de MongoDB.
+        db (str): Base de datos.
+        coleccion (str): Colección de bitácora.
+        **opciones: Argumentos de BitacoraEnLotes (tamano_lote, intervalo...).
+
+    Returns:
+        BitacoraEnLotes: Bitácora abierta.
+    """
+    clave = (uri, db, coleccion)
+    with _REGISTRO:
+        bitacora = _BITACORAS.get(clave)
+        if bitacora is None or bitacora.cerrada:
+            cliente = MongoClient(uri)
+            destino = cliente[db][coleccion]
+            asegurar_indices(destino, "bitacora")
+            bitacora = _BITACORAS[clave] = BitacoraEnLotes(destino, cliente=cliente, **opciones)
+        return bitacora
+
+
+@atexit.register
+def cerrar_bitacoras() -> None:
+    """Vacía y cierra todas las bitácoras abiertas por obtener_bitacora."""
+    with _REGISTRO:
+        bitacoras = list(_BITACORAS.values())
+        _BITACORAS.clear()
+    for bitacora in bitacoras:
+        bitacora.cerrar(sincronizar=True)
@@ -0,0 +1,395 @@
+"""
+Carga de archivos CSV a MongoDB por bloques
+===========================================
+
+Motor de carga de csv_a_nosql.py. En lugar de leer el CSV completo,
+serializarlo a JSON para volver a leerlo como diccionarios e insertarlo con
+un único insert_many:
+
+    - El CSV se lee por bloques de `tamano_bloque` filas (pd.read_csv con
+      chunksize), de modo que la memoria no depende del tamaño del archivo.
+    - Cada bloque se convierte directamente en documentos (to_dict con tipos
+      nativos de Python y NaN -> None, igual que hacía el paso por JSON).
+    - Los documentos se insertan en lotes de `tamano_lote` con
+      insert_many(ordered=False): un documento rechazado (p. ej. por clave
+      duplicada) no detiene el resto del lote.
+    - Opcionalmente, varios lotes se envían en paralelo desde hilos (el
+      cliente de pymongo es seguro entre hilos y libera el GIL durante la E/S).
+
+En modo "upsert" la carga es idempotente: cada lote se escribe con
+bulk_write(UpdateOne(..., upsert=True)) sobre una clave natural (o, sin
+clave, el hash del contenido de la fila y de su número de aparición entre
+las filas idénticas del archivo) con índice único, y se informan los
+documentos insertados, actualizados y sin cambios. Dos filas idénticas del
+mismo archivo siguen siendo dos documentos (son ventas distintas), y volver
+a cargar una nueva exportación con filas agregadas, reordenadas o con otro
+nombre de archivo solo inserta las filas nuevas.
+
+Marca de carga: cada lote pide al servidor un número de carga nuevo (un
+contador por colección en COLECCION_CARGAS, incrementado con
+find_one_and_update + $inc, así que crece entre hilos, procesos y
+cargadores) y cada documento insertado o modificado por el lote lo recibe
+en CAMPO_CARGA, junto con el número de escrituras (CAMPO_ESCRITURAS, 1 si
+solo se insertó). El análisis incremental usa CAMPO_CARGA como marca de
+agua: a diferencia de _id, también cambia cuando un upsert actualiza un
+documento. En modo "insertar" la marca se agrega a los documentos antes del
+insert_many, así que solo cuesta una consulta más por lote.
+
+Autor: Fernando Blanco
+"""
+
+import functools
+import hashlib
+import json
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Sequence, Union
+
+import pandas as pd
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
+
+# ---------------------------------------------------------------------------
+# Configuración por defecto
+# ---------------------------------------------------------------------------
+
+TAMANO_BLOQUE = 100_000    # Filas del CSV leídas por bloque
+TAMANO_LOTE = 10_000       # Documentos por insert_many
+HILOS = 1                  # Lotes enviados en paralelo (1 = secuencial)
+CAMPO_HASH = "_hash_fila"  # Campo con el hash del contenido (upsert sin clave natural)
+CAMPO_CARGA = "_carga"     # Número de la carga (lote) que escribió el documento por última vez
+CAMPO_ESCRITURAS = "_escrituras"   # Escrituras del documento (1 = insertado y nunca modificado)
+COLECCION_CARGAS = "secuencias_carga"   # Contador de cargas por colección (misma base de datos)
+
+
+# ---------------------------------------------------------------------------
+# Lectura y conversión
+# ---------------------------------------------------------------------------
+
+def leer_bloques(ruta: str, tamano_bloque: int = TAMANO_BLOQUE,
+                 encoding: str = "utf-8") -> Iterator[pd.DataFrame]:
+    """
+    Lee un CSV por bloques.
+
+    Args:
+        ruta (str): Archivo CSV (con encabezado).
+        tamano_bloque (int): Filas por bloque.
+        encoding (str): Codificación del archivo.
+
+    Yields:
+        pd.DataFrame: Bloque de filas.
+    """
+    yield from pd.read_csv(ruta, encoding=encoding, chunksize=tamano_bloque)
+
+
+def documentos(df: pd.DataFrame) -> List[dict]:
+    """
+    Convierte un DataFrame en documentos para MongoDB sin pasar por JSON.
+
+    Los valores faltantes (NaN / NA) se guardan como None (null), y los
+    números como int / float de Python, igual que con to_json + json.loads.
+    Cada columna se convierte de una vez con tolist() y los documentos se
+    arman con zip (varias veces más rápido que to_dict(orient="records")).
+
+    Args:
+        df (pd.DataFrame): Filas a convertir.
+
+    Returns:
+        List[dict]: Un documento por fila.
+    """
+    columnas = []
+    for nombre in df.columns:
+        serie = df[nombre]
+        if serie.hasnans:
+            serie = serie.astype(object).where(serie.notna(), None)
+        columnas.append(serie.tolist())
+    nombres = [str(nombre) for nombre in df.columns]
+    return [dict(zip(nombres, fila)) for fila in zip(*columnas)]
+
+
+def lotes(docs: Iterable[dict], tamano_lote: int = TAMANO_LOTE) -> Iterator[List[dict]]:
+    """Agrupa los documentos en listas de hasta `tamano_lote` elementos."""
+    docs = iter(docs)
+    while True:
+        lote = list(islice(docs, tamano_lote))
+        if not lote:
+            return
+        yield lote
+
+
+# ---------------------------------------------------------------------------
+# Marca de carga
+# ---------------------------------------------------------------------------
+
+def siguiente_carga(coleccion) -> int:
+    """
+    Pide al servidor un número de carga nuevo para `coleccion` ($inc sobre
+    su contador en COLECCION_CARGAS, creado en la primera carga).
+
+    Args:
+        coleccion (pymongo.collection.Collection): Colección destino.
+
+    Returns:
+        int: Número de carga, mayor que todos los entregados antes.
+    """
+    contador = coleccion.database[COLECCION_CARGAS].find_one_and_update(
+        {"_id": coleccion.name}, {"$inc": {"valor": 1}}, upsert=True, return_document=ReturnDocument.AFTER)
+    return contador["valor"]
+
+
+def marcar_documentos(coleccion) -> int:
+    """
+    Fija la marca de carga en los documentos que no la tienen (cargados
+    antes de que existiera o por otro proceso). Puede ejecutarse varias
+    veces: solo toca los documentos sin marca.
+
+    Args:
+        coleccion (pymongo.collection.Collection): Colección de usuarios.
+
+    Returns:
+        int: Documentos marcados.
+    """
+    marca = {"$set": {CAMPO_CARGA: siguiente_carga(coleccion), CAMPO_ESCRITURAS: 1}}
+    return coleccion.update_many({CAMPO_CARGA: {"$exists": False}}, marca).modified_count
+
+
+# ---------------------------------------------------------------------------
+# Escritura por lotes
+# ---------------------------------------------------------------------------
+
+def insertar_lote(coleccion, lote: List[dict], marcar: bool = False) -> Dict[str, int]:
+    """
+    Inserta un lote con insert_many(ordered=False).
+
+    Args:
+        coleccion (pymongo.collection.Collection): Colección destino.
+        lote (List[dict]): Documentos a insertar.
+        marcar (bool): Agregar a cada documento la marca de carga (un
+            número de carga nuevo para el lote, ver siguiente_carga).
+
+    Returns:
+        Dict[str, int]: Documentos insertados y rechazados.
+    """
+    if marcar:
+        carga = siguiente_carga(coleccion)
+        for doc in lote:
+            doc[CAMPO_CARGA], doc[CAMPO_ESCRITURAS] = carga, 1
+    try:
+        resultado = coleccion.insert_many(lote, ordered=False)
+        return {"insertados": len(resultado.inserted_ids), "errores": 0}
+    except BulkWriteError as e:   # El resto del lote se insertó igualmente
+        return {"insertados": e.details.get("nInserted", 0), "errores": len(e.details.get("writeErrors", []))}
+
+
+def escribir_documentos(coleccion, docs: Iterable[dict], tamano_lote: int = TAMANO_LOTE,
+                        hilos: int = HILOS, funcion_lote: Callable = insertar_lote) -> Dict[str, int]:
+    """
+    Escribe documentos por lotes, en secuencia o desde varios hilos.
+
+    Con varios hilos se mantienen como máximo 2 × `hilos` lotes en vuelo, de
+    modo que la memoria sigue acotada aunque la lectura sea más rápida que
+    la escritura.
+
+    Args:
+        coleccion (pymongo.collection.Collection): Colección destino.
+        docs (Iterable[dict]): Documentos a escribir.
+        tamano_lote (int): Documentos por operación.
+        hilos (int): Lotes enviados en paralelo.
+        funcion_lote (Callable): Función (coleccion, lote) -> conteos que
+            escribe cada lote (insertar_lote o upsert_lote).
+
+    Returns:
+        Dict[str, int]: Suma de los conteos de cada lote y lotes enviados.
+    """
+    resumen = Counter()
+
+    def acumular(conteos):
+        resumen.update(conteos)
+        resumen["lotes"] += 1
+
+    if hilos <= 1:
+        for lote in lotes(docs, tamano_lote):
+            acumular(funcion_lote(coleccion, lote))
+        return dict(resumen)
+
+    with ThreadPoolExecutor(max_workers=hilos) as executor:
+        pendientes = set()
+        for lote in lotes(docs, tamano_lote):
+            if len(pendientes) >= 2 * hilos:
+                terminados, pendientes = wait(pendientes, return_when=FIRST_COMPLETED)
+                for futuro in terminados:
+                    acumular(futuro.result())
+            pendientes.add(executor.submit(funcion_lote, coleccion, lote))
+        for futuro in pendientes:
+            acumular(futuro.result())
+    return dict(resumen)
+
+
+# ---------------------------------------------------------------------------
+# Upsert por clave natural o por hash de la fila
+# ---------------------------------------------------------------------------
+
+def hash_documento(doc: dict, aparicion: int = 0) -> str:
+    """
+    Hash (BLAKE2b, 128 bits) del contenido de un documento, independiente del
+    orden de los campos.
+
+    `aparicion` es el número de filas idénticas que la preceden en el
+    archivo (0 para la primera): dos filas iguales dan hashes distintos y
+    volver a cargar el archivo da los mismos hashes, aunque cambie la
+    posición de las filas o el nombre del archivo.
+    """
+    contenido = json.dumps(doc if not aparicion else [doc, aparicion], sort_keys=True,
+                           ensure_ascii=False, default=str)
+    return hashlib.blake2b(contenido.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def campos_clave(clave: Union[str, Sequence[str], None]) -> List[str]:
+    """Campos de la clave de upsert (CAMPO_HASH si no se indica clave)."""
+    if clave is None:
+        return [CAMPO_HASH]
+    return [clave] if isinstance(clave, str) else list(clave)
+
+
+def asegurar_indice_clave(coleccion, clave: Union[str, Sequence[str], None] = None) -> str:
+    """
+    Crea (si no existe) el índice único sobre la clave de upsert. Sin él,
+    cada upsert recorre la colección y dos cargas simultáneas podrían
+    insertar la misma clave dos veces.
+
+    El índice es parcial: solo incluye los documentos que tienen los campos
+    de la clave, así que los cargados antes en modo "insertar" (sin
+    CAMPO_HASH) no chocan entre sí. Falla (OperationFailure) si la
+    colección ya contiene valores duplicados de la clave.
+
+    Args:
+        coleccion (pymongo.collection.Collection): Colección destino.
+        clave (str | Sequence[str] | None): Clave natural, o None para el hash.
+
+    Returns:
+        str: Nombre del índice.
+    """
+    campos = campos_clave(clave)
+    return coleccion.create_index([(campo, 1) for campo in campos], unique=True,
+                                  partialFilterExpression={campo: {"$exists": True} for campo in campos})
+
+
+def pipeline_upsert(doc: dict, carga: int) -> List[dict]:
+    """
+    Update con pipeline que reemplaza los campos de `doc` y solo cambia la
+    marca de carga (CAMPO_CARGA = `carga` y CAMPO_ESCRITURAS + 1) si algún
+    campo es distinto del guardado o el documento es nuevo. Un documento
+    igual al guardado no se modifica (cuenta en nMatched pero no en
+    nModified).
+    """
+    escrituras = {"$ifNull": [f"${CAMPO_ESCRITURAS}", 0]}
+    cambio = {"$or": [{"$lt": [escrituras, 1]}] +
+                     [{"$ne": [f"${campo}", {"$literal": valor}]} for campo, valor in doc.items()]}
+    return [{"$set": {
+        **{campo: {"$literal": valor} for campo, valor in doc.items()},
+        CAMPO_CARGA: {"$cond": [cambio, carga, f"${CAMPO_CARGA}"]},
+        CAMPO_ESCRITURAS: {"$cond": [cambio, {"$add": [escrituras, 1]}, f"${CAMPO_ESCRITURAS}"]},
+    }}]
+
+
+def upsert_lote(coleccion, lote: List[dict], clave: Union[str, Sequence[str], None] = None) -> Dict[str, int]:
+    """
+    Escribe un lote con bulk_write(UpdateOne(..., upsert=True), ordered=False).
+
+    - Con clave natural, cada documento reemplaza los campos del existente
+      y recibe la marca de carga del lote solo si algún campo cambió (ver
+      pipeline_upsert): los documentos iguales a los guardados se cuentan
+      como sin cambios (coinciden pero no se modifican).
+    - Sin clave, la clave es CAMPO_HASH: el del documento si ya lo trae
+      (cargar_csv lo calcula con el contenido y el número de aparición de
+      la fila) o, si no, el hash de su contenido. Las filas ya cargadas
+      quedan sin cambios y las nuevas se insertan; no hay actualizaciones.
+
+    Args:
+        coleccion (pymongo.collection.Collection): Colección destino.
+        lote (List[dict]): Documentos a escribir.
+        clave (str | Sequence[str] | None): Clave natural, o None para el hash.
+
+    Returns:
+        Dict[str, int]: Documentos insertados, actualizados, sin cambios y
+        rechazados.
+    """
+    campos = campos_clave(clave)
+    carga = siguiente_carga(coleccion)
+    operaciones = []
+    for doc in lote:
+        if clave is None and CAMPO_HASH not in doc:
+            doc = dict(doc, **{CAMPO_HASH: hash_documento(doc)})
+        operaciones.append(UpdateOne({campo: doc.get(campo) for campo in campos}, pipeline_upsert(doc, carga),
+                                     upsert=True))
+    try:
+        detalle = coleccion.bulk_write(operaciones, ordered=False).bulk_api_result
+    except BulkWriteError as e:   # Las demás operaciones del lote se aplicaron igualmente
+        detalle = e.details
+    return {
+        "insertados": detalle.get("nUpserted", 0),
+        "actualizados": detalle.get("nModified", 0),
+        "sin_cambios": detalle.get("nMatched", 0) - detalle.get("nModified", 0),
+        "errores": len(detalle.get("writeErrors", [])),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Carga de un CSV
+# ---------------------------------------------------------------------------
+
+def cargar_csv(coleccion, ruta: str, tamano_bloque: int = TAMANO_BLOQUE,
+               tamano_lote: int = TAMANO_LOTE, hilos: int = HILOS,
+               encoding: str = "utf-8", modo: str = "insertar",
+               clave: Union[str, Sequence[str], None] = None, marcar: bool = True) -> Dict[str, int]:
+    """
+    Carga un CSV en una colección leyendo por bloques y escribiendo por lotes.
+
+    Args:
+        coleccion (pymongo.collection.Collection): Colección destino.
+        ruta (str): Archivo CSV (con encabezado).
+        tamano_bloque (int): Filas del CSV leídas por bloque.
+        tamano_lote (int): Documentos por operación.
+        hilos (int): Lotes enviados en paralelo.
+        encoding (str): Codificación del archivo.
+        modo (str): "insertar" (insert_many; volver a cargar el archivo
+            duplica los documentos) o "upsert" (idempotente, ver upsert_lote).
+        clave (str | Sequence[str] | None): En modo "upsert", clave natural
+            (p. ej. "ID"); None usa el hash del contenido de cada fila y de
+            su número de aparición (ver hash_documento). Para numerar las
+            filas repetidas se mantiene en memoria un contador por cada
+            fila distinta del archivo.
+        marcar (bool): En modo "insertar", fijar la marca de carga que usa
+            el análisis incremental (en modo "upsert" se fija siempre).
+
+    Returns:
+        Dict[str, int]: Filas leídas, lotes enviados y documentos insertados,
+        actualizados, sin cambios y rechazados.
+    """
+    if modo not in ("insertar", "upsert"):
+        raise ValueError(f"Modo de carga no válido: {modo} (opciones: insertar, upsert)")
+    funcion_lote = functools.partial(insertar_lote, marcar=marcar)
+    if modo == "upsert":
+        asegurar_indice_clave(coleccion, clave)
+        funcion_lote = functools.partial(upsert_lote, clave=clave)
+
+    leidos = [0]
+    apariciones = Counter()
+
+    def docs():
+        for bloque in leer_bloques(ruta, tamano_bloque, encoding):
+            leidos[0] += len(bloque)
+            if modo == "upsert" and clave is None:
+                for doc in documentos(bloque):
+                    hash_fila = hash_documento(doc)
+                    aparicion = apariciones[hash_fila]
+                    apariciones[hash_fila] += 1
+                    doc[CAMPO_HASH] = hash_documento(doc, aparicion) if aparicion else hash_fila
+                    yield doc
+            else:
+                yield from documentos(bloque)
+
+    resumen = escribir_documentos(coleccion, docs(), tamano_lote, hilos, funcion_lote)
+    conteos = {campo: resumen.get(campo, 0) for campo in ("insertados", "actualizados", "sin_cambios", "errores")}
+    return {"leidos": leidos[0], "lotes": resumen.get("lotes", 0), **conteos}
@@ -0,0 +1,284 @@
+"""
+Análisis incremental con un resumen materializado
+=================================================
+
+El análisis completo vuelve a recorrer la colección de usuarios entera en
+cada ejecución. En modo incremental se mantiene una colección resumen con
+una fila por combinación (Ciudad, Tipo_Pago, Producto) y su cantidad de
+registros y ventas, y en cada ejecución:
+
+    1. Se toma la marca de agua actual: el mayor valor de `campo_marca` en
+       la colección. Por defecto es la marca de carga que fija
+       mongo_comun.carga (número de carga, entregado por un contador del
+       servidor, del lote que escribió cada documento por última vez), que
+       ve tanto los documentos nuevos como los modificados por un upsert,
+       sin depender del orden de los _id.
+    2. Si algún documento del rango ya existía antes de la marca anterior
+       (CAMPO_ESCRITURAS > 1: fue modificado), su aporte anterior ya está en
+       el resumen y no puede restarse, así que el resumen se reconstruye.
+    3. Si el número de documentos de la colección que no son posteriores a
+       la marca actual no coincide con los ya resumidos más los del rango,
+       también se reconstruye: se eliminaron documentos, la colección se
+       vació y se volvió a cargar, o hay documentos sin la marca de carga.
+    4. Si no, se agregan solo los documentos entre la marca anterior y la
+       actual (pipeline_combinaciones con un $match sobre el rango, que usa
+       el índice de la marca de carga).
+    5. Los deltas se suman a las filas del resumen con $merge (o, si el
+       servidor no lo soporta, con bulk_write de $inc con upsert).
+    6. Se guardan la nueva marca y el número de documentos resumidos en la
+       colección de estado.
+
+Al reconstruir el resumen se marcan antes los documentos que no tienen marca
+de carga (cargados con una versión anterior), para que entren en él.
+
+El reporte se arma a partir del resumen (unas pocas filas) y tiene la misma
+forma que el de mongo_comun.analisis.
+
+Limitaciones: el conteo del paso 3 usa estimated_document_count (metadatos
+de la colección, sin recorrerla); si quedó desajustado tras un apagado no
+limpio del servidor, cada ejecución reconstruye el resumen hasta que se
+corrija (comando validate). Un lote cuya escritura termina después de que
+otro, iniciado más tarde, ya fijó la marca queda fuera del delta; el conteo
+lo detecta en la ejecución siguiente. verificar_consistencia compara el
+resumen con un recálculo completo hasta la marca, y recalcular lo
+reconstruye.
+Si una ejecución se interrumpe entre el paso 4 y el 6, la marca queda
+"pendiente" y la siguiente ejecución recalcula todo en lugar de sumar dos
+veces el mismo delta.
+
+Autor: Fernando Blanco
+"""
+
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from pymongo import UpdateOne
+from pymongo.errors import OperationFailure
+
+from .analisis import CAMPOS, pipeline_combinaciones, reporte_desde_combinaciones
+from .carga import CAMPO_CARGA, CAMPO_ESCRITURAS, marcar_documentos
+
+# ---------------------------------------------------------------------------
+# Configuración por defecto
+# ---------------------------------------------------------------------------
+
+COLECCION_RESUMEN = "analisis_usuarios_resumen"   # Filas (combinación, cantidad, ventas)
+COLECCION_ESTADO = "analisis_usuarios_estado"     # Marca de agua del resumen
+CAMPO_MARCA = CAMPO_CARGA                         # Marca de carga (número de carga) de mongo_comun.carga
+ID_ESTADO = "usuarios"                            # _id del documento de estado
+MOTORES = ("auto", "merge", "cliente")
+TOLERANCIA = 1e-9                                 # Diferencia relativa admitida en las ventas
+
+
+# ---------------------------------------------------------------------------
+# Marca de agua
+# ---------------------------------------------------------------------------
+
+def marca_actual(coleccion, campo_marca: str = CAMPO_MARCA):
+    """Mayor valor de `campo_marca` en la colección (None si está vacía)."""
+    cursor = coleccion.find({campo_marca: {"$exists": True}}, {campo_marca: 1}).sort(campo_marca, -1).limit(1)
+    doc = next(iter(cursor), None)
+    return doc[campo_marca] if doc else None
+
+
+def filtro_rango(desde, hasta, campo_marca: str = CAMPO_MARCA) -> dict:
+    """Filtro de los documentos con desde < campo_marca <= hasta (sin cota inferior si desde es None)."""
+    rango = {"$lte": hasta}
+    if desde is not None:
+        rango["$gt"] = desde
+    return {campo_marca: rango}
+
+
+# ---------------------------------------------------------------------------
+# Fusión de los deltas en el resumen
+# ---------------------------------------------------------------------------
+
+def _fusionar_merge(usuarios, resumen, pipeline: List[dict]) -> None:
+    """Suma los deltas al resumen en el servidor ($merge, MongoDB >= 4.2)."""
+    usuarios.aggregate(pipeline + [{"$merge": {
+        "into": {"db": resumen.database.name, "coll": resumen.name},
+        "on": "_id",
+        "whenMatched": [{"$set": {
+            "cantidad": {"$add": ["$cantidad", "$$new.cantidad"]},
+            "ventas": {"$add": ["$ventas", "$$new.ventas"]},
+        }}],
+        "whenNotMatched": "insert",
+    }}], allowDiskUse=True)
+
+
+def _fusionar_cliente(usuarios, resumen, pipeline: List[dict]) -> None:
+    """Suma los deltas al resumen con bulk_write($inc, upsert=True)."""
+    operaciones = [
+        UpdateOne({"_id": fila["_id"]}, {"$inc": {"cantidad": fila["cantidad"], "ventas": fila["ventas"]}}, upsert=True)
+        for fila in usuarios.aggregate(pipeline, allowDiskUse=True)
+    ]
+    if operaciones:
+        resumen.bulk_write(operaciones, ordered=False)
+
+
+def fusionar_delta(usuarios, resumen, desde, hasta, motor: str = "auto",
+                   campos: Dict[str, str] = CAMPOS, campo_marca: str = CAMPO_MARCA) -> None:
+    """
+    Agrega los documentos con desde < campo_marca <= hasta y suma el
+    resultado a las filas del resumen.
+
+    Args:
+        usuarios (pymongo.collection.Collection): Colección de usuarios.
+        resumen (pymongo.collection.Collection): Colección resumen.
+        desde: Marca anterior (None para agregar desde el principio).
+        hasta: Marca actual.
+        motor (str): "merge", "cliente" o "auto" ($merge y, si el servidor
+            no lo soporta, bulk_write).
+        campos (dict): Nombres de los campos ciudad, pago, producto y total.
+        campo_marca (str): Campo de la marca de agua.
+    """
+    if motor not in MOTORES:
+        raise ValueError(f"Motor de fusión no válido: {motor} (opciones: {', '.join(MOTORES)})")
+    pipeline = [{"$match": filtro_rango(desde, hasta, campo_marca)}] + pipeline_combinaciones(campos)
+    if motor == "cliente":
+        return _fusionar_cliente(usuarios, resumen, pipeline)
+    try:
+        _fusionar_merge(usuarios, resumen, pipeline)
+    except (OperationFailure, NotImplementedError):   # Servidor sin $merge
+        if motor == "merge":
+            raise
+        _fusionar_cliente(usuarios, resumen, pipeline)
+
+
+# ---------------------------------------------------------------------------
+# Actualización, recálculo y reporte
+# ---------------------------------------------------------------------------
+
+def hay_modificados(usuarios, desde, hasta, campo_marca: str = CAMPO_MARCA) -> bool:
+    """True si algún documento del rango fue escrito más de una vez (ya estaba en el resumen)."""
+    if campo_marca != CAMPO_CARGA or desde is None:
+        return False
+    return usuarios.find_one({**filtro_rango(desde, hasta, campo_marca), CAMPO_ESCRITURAS: {"$gt": 1}},
+                             {"_id": 1}) is not None
+
+
+def documentos_hasta(usuarios, hasta, campo_marca: str = CAMPO_MARCA) -> int:
+    """
+    Documentos de la colección que no son posteriores a `hasta` (incluidos
+    los que no tienen `campo_marca`). El total sale de los metadatos de la
+    colección y solo se cuentan, con el índice de la marca, los posteriores.
+    """
+    total = usuarios.estimated_document_count()
+    if hasta is None:
+        return total
+    return total - usuarios.count_documents({campo_marca: {"$gt": hasta}})
+
+
+def actualizar_resumen(usuarios, resumen, estado, motor: str = "auto",
+                       campos: Optional[Dict[str, str]] = None, campo_marca: str = CAMPO_MARCA) -> dict:
+    """
+    Incorpora al resumen los documentos nuevos desde la última ejecución.
+
+    El resumen se reconstruye desde cero si la ejecución anterior quedó a
+    medias (marca pendiente) o usó otro campo de marca, si desde entonces se
+    modificaron documentos (ver hay_modificados) o si el número de
+    documentos no cuadra con el resumido (ver documentos_hasta): borrados,
+    colección recargada o documentos sin marca.
+
+    Args:
+        usuarios (pymongo.collection.Collection): Colección de usuarios.
+        resumen (pymongo.collection.Collection): Colección resumen.
+        estado (pymongo.collection.Collection): Colección con la marca de agua.
+        motor (str): Ver fusionar_delta.
+        campos (dict | None): Nombres de los campos (por defecto, CAMPOS).
+        campo_marca (str): Campo creciente con cada carga.
+
+    Returns:
+        dict: Marca anterior ("desde"), marca actual ("hasta") y si se
+        reconstruyó el resumen ("recalculado").
+    """
+    campos = campos or CAMPOS
+    actual = estado.find_one({"_id": ID_ESTADO}) or {}
+    recalculado = "pendiente" in actual or actual.get("campo_marca", campo_marca) != campo_marca
+    desde = hasta = delta = None
+    if not recalculado and "marca" in actual:
+        desde, hasta = actual["marca"], marca_actual(usuarios, campo_marca)
+        nuevos = hasta is not None and hasta > desde
+        delta = usuarios.count_documents(filtro_rango(desde, hasta, campo_marca)) if nuevos else 0
+        recalculado = (hasta is None or hasta < desde
+                       or (nuevos and hay_modificados(usuarios, desde, hasta, campo_marca))
+                       or documentos_hasta(usuarios, hasta, campo_marca) != actual.get("documentos", -1) + delta)
+
+    if recalculado or desde is None:
+        resumen.delete_many({})
+        if campo_marca == CAMPO_CARGA:
+            marcar_documentos(usuarios)   # Documentos cargados sin marca: entran en la reconstrucción
+        desde, hasta, delta = None, marca_actual(usuarios, campo_marca), None
+        if hasta is None:
+            estado.delete_one({"_id": ID_ESTADO})
+            return {"desde": None, "hasta": None, "recalculado": recalculado}
+    if hasta == desde:
+        return {"desde": desde, "hasta": desde, "recalculado": recalculado}
+
+    documentos = (actual["documentos"] if desde is not None else 0) + (
+        delta if delta is not None else usuarios.count_documents(filtro_rango(desde, hasta, campo_marca)))
+    estado.update_one({"_id": ID_ESTADO}, {"$set": {"pendiente": hasta, "campo_marca": campo_marca}}, upsert=True)
+    fusionar_delta(usuarios, resumen, desde, hasta, motor, campos, campo_marca)
+    estado.update_one({"_id": ID_ESTADO}, {"$set": {"marca": hasta, "documentos": documentos,
+                                                    "fecha_actualizacion": datetime.now()},
+                                           "$unset": {"pendiente": ""}})
+    return {"desde": desde, "hasta": hasta, "recalculado": recalculado}
+
+
+def recalcular(usuarios, resumen, estado, motor: str = "auto",
+               campos: Optional[Dict[str, str]] = None, campo_marca: str = CAMPO_MARCA) -> dict:
+    """Reconstruye el resumen desde cero (mismos argumentos y resultado que actualizar_resumen)."""
+    resumen.delete_many({})
+    estado.delete_one({"_id": ID_ESTADO})
+    resultado = actualizar_resumen(usuarios, resumen, estado, motor, campos, campo_marca)
+    return dict(resultado, recalculado=True)
+
+
+def reporte_resumen(resumen) -> dict:
+    """Documento de análisis (sin la fecha) a partir de las filas del resumen."""
+    return reporte_desde_combinaciones(list(resumen.find()))
+
+
+# ---------------------------------------------------------------------------
+# Verificación
+# ---------------------------------------------------------------------------
+
+def _clave(id_combinacion: dict) -> tuple:
+    return tuple(sorted(id_combinacion.items(), key=lambda kv: kv[0]))
+
+
+def verificar_consistencia(usuarios, resumen, estado, campos: Optional[Dict[str, str]] = None,
+                           campo_marca: str = CAMPO_MARCA, tolerancia: float = TOLERANCIA) -> List[str]:
+    """
+    Compara el resumen con un recálculo completo de los documentos hasta la
+    marca de agua guardada (los posteriores aún no forman parte del resumen).
+
+    Args:
+        usuarios (pymongo.collection.Collection): Colección de usuarios.
+        resumen (pymongo.collection.Collection): Colección resumen.
+        estado (pymongo.collection.Collection): Colección con la marca de agua.
+        campos (dict | None): Nombres de los campos (por defecto, CAMPOS).
+        campo_marca (str): Campo de la marca de agua.
+        tolerancia (float): Diferencia relativa admitida en las ventas.
+
+    Returns:
+        List[str]: Descripción de cada combinación que no coincide (vacía si
+        el resumen es consistente).
+    """
+    marca = (estado.find_one({"_id": ID_ESTADO}) or {}).get("marca")
+    esperado = {}
+    if marca is not None:
+        pipeline = [{"$match": filtro_rango(None, marca, campo_marca)}] + pipeline_combinaciones(campos or CAMPOS)
+        esperado = {_clave(fila["_id"]): fila for fila in usuarios.aggregate(pipeline, allowDiskUse=True)}
+    actual = {_clave(fila["_id"]): fila for fila in resumen.find()}
+
+    diferencias = []
+    for clave in sorted(set(esperado) | set(actual), key=str):
+        e, a = esperado.get(clave), actual.get(clave)
+        if e is None or a is None:
+            diferencias.append(f"{dict(clave)}: {'sobra en' if e is None else 'falta en'} el resumen")
+        elif e["cantidad"] != a["cantidad"]:
+            diferencias.append(f"{dict(clave)}: cantidad {a['cantidad']} (esperado {e['cantidad']})")
+        elif abs(e["ventas"] - a["ventas"]) > tolerancia * max(abs(e["ventas"]), 1.0):
+            diferencias.append(f"{dict(clave)}: ventas {a['ventas']} (esperado {e['ventas']})")
+    return diferencias
@@ -0,0 +1,158 @@
+"""
+Índices de las colecciones de usuarios y de bitácora
+====================================================
+
+Declara los índices que necesitan los scripts, los crea de forma
+idempotente y permite comprobar con explain() si los pipelines del análisis
+los aprovechan:
+
+    - usuarios / analisis_combinacion: (Ciudad, Tipo_Pago, Producto, Total).
+      Contiene todos los campos que lee pipeline_combinaciones y
+      analisis_nosql.py se lo indica a la agregación con hint. Si el
+      servidor resuelve el análisis sin leer los documentos depende del
+      plan que elija: compruébelo con reporte_cobertura (bench_indices.py
+      --uri) sobre una instancia real.
+    - usuarios / carga: marca de carga de mongo_comun.carga, para tomar la
+      marca de agua y el rango de documentos del análisis incremental.
+    - bitacora / bot_inicio: (bot_name, inicio descendente), para consultar
+      las ejecuciones de un robot por fecha (p. ej. la última).
+
+Las búsquedas por _id (fin_robot_bitacora.py) ya usan el índice de _id que
+MongoDB crea siempre.
+
+Autor: Fernando Blanco
+"""
+
+from typing import Dict, List, Optional
+
+from pymongo.errors import OperationFailure
+
+from .analisis import CAMPOS, pipeline_combinaciones, pipeline_facet
+from .incremental import CAMPO_MARCA, filtro_rango, marca_actual
+
+# ---------------------------------------------------------------------------
+# Índices declarados
+# ---------------------------------------------------------------------------
+
+INDICE_ANALISIS = "analisis_combinacion"
+INDICE_CARGA = "secuencia_carga"
+INDICE_BITACORA = "bot_inicio"
+
+# Tipo de colección -> {nombre del índice: claves}
+INDICES = {
+    "usuarios": {
+        INDICE_ANALISIS: [(CAMPOS["ciudad"], 1), (CAMPOS["pago"], 1), (CAMPOS["producto"], 1), (CAMPOS["total"], 1)],
+        INDICE_CARGA: [(CAMPO_MARCA, 1)],
+    },
+    "bitacora": {
+        INDICE_BITACORA: [("bot_name", 1), ("inicio", -1)],
+    },
+}
+
+
+# ---------------------------------------------------------------------------
+# Creación
+# ---------------------------------------------------------------------------
+
+def asegurar_indices(coleccion, tipo: str) -> List[str]:
+    """
+    Crea los índices declarados para un tipo de colección. create_index no
+    hace nada si el índice ya existe con las mismas claves, así que puede
+    llamarse en cada carga.
+
+    Args:
+        coleccion (pymongo.collection.Collection): Colección destino.
+        tipo (str): Clave de INDICES ("usuarios" o "bitacora").
+
+    Returns:
+        List[str]: Nombres de los índices asegurados.
+
+    Raises:
+        ValueError: Si el tipo no está declarado.
+        OperationFailure: Si ya existe un índice con el mismo nombre y otras claves.
+    """
+    if tipo not in INDICES:
+        raise ValueError(f"Tipo de colección sin índices declarados: {tipo} (opciones: {', '.join(INDICES)})")
+    return [coleccion.create_index(claves, name=nombre) for nombre, claves in INDICES[tipo].items()]
+
+
+def indices_faltantes(coleccion, tipo: str) -> List[str]:
+    """Índices declarados para `tipo` que no existen en la colección."""
+    existentes = coleccion.index_information()
+    return [nombre for nombre in INDICES[tipo] if nombre not in existentes]
+
+
+def indice_analisis(coleccion) -> Optional[str]:
+    """Nombre del índice del análisis si existe en la colección (para usarlo como hint), o None."""
+    return INDICE_ANALISIS if INDICE_ANALISIS in coleccion.index_information() else None
+
+
+# ---------------------------------------------------------------------------
+# Cobertura (explain)
+# ---------------------------------------------------------------------------
+
+def _etapas(plan, etapas: List[str], indices: List[str]) -> None:
+    """Recorre un plan de explain() y junta sus etapas e índices (sin los planes descartados)."""
+    if isinstance(plan, dict):
+        if isinstance(plan.get("stage"), str):
+            etapas.append(plan["stage"])
+        if isinstance(plan.get("indexName"), str):
+            indices.append(plan["indexName"])
+        for clave, valor in plan.items():
+            if clave not in ("rejectedPlans", "allPlansExecution"):
+                _etapas(valor, etapas, indices)
+    elif isinstance(plan, list):
+        for valor in plan:
+            _etapas(valor, etapas, indices)
+
+
+def explicar(coleccion, pipeline: List[dict], hint: Optional[str] = None) -> dict:
+    """
+    Ejecuta explain() de un pipeline y resume el plan ganador.
+
+    Args:
+        coleccion (pymongo.collection.Collection): Colección consultada.
+        pipeline (List[dict]): Pipeline de agregación.
+        hint (str | None): Índice a forzar.
+
+    Returns:
+        dict: "disponible" (False si el servidor no implementa explain, p. ej.
+        mongomock), "etapas", "indices" usados y "cubierto" (True si el plan
+        recorre un índice sin leer documentos: ni COLLSCAN ni FETCH).
+    """
+    opciones = {"hint": hint} if hint else {}
+    try:
+        plan = coleccion.database.command("aggregate", coleccion.name, pipeline=pipeline, explain=True, **opciones)
+    except (OperationFailure, NotImplementedError, TypeError):   # TypeError: mongomock no implementa command(...)
+        return {"disponible": False, "etapas": [], "indices": [], "cubierto": False}
+    etapas, indices = [], []
+    _etapas(plan, etapas, indices)
+    escaneo_indice = any(etapa in ("IXSCAN", "DISTINCT_SCAN") for etapa in etapas)
+    return {
+        "disponible": True,
+        "etapas": etapas,
+        "indices": sorted(set(indices)),
+        "cubierto": escaneo_indice and "COLLSCAN" not in etapas and "FETCH" not in etapas,
+    }
+
+
+def reporte_cobertura(coleccion, campos: Optional[Dict[str, str]] = None) -> Dict[str, dict]:
+    """
+    explain() de los pipelines del análisis sobre la colección de usuarios:
+    el análisis completo (con el índice del análisis como hint, si existe) y
+    el delta del modo incremental.
+
+    Args:
+        coleccion (pymongo.collection.Collection): Colección de usuarios.
+        campos (dict | None): Nombres de los campos (por defecto, CAMPOS).
+
+    Returns:
+        Dict[str, dict]: Resultado de explicar() por pipeline.
+    """
+    campos = campos or CAMPOS
+    reporte = {"analisis completo": explicar(coleccion, pipeline_facet(campos), indice_analisis(coleccion))}
+    marca = marca_actual(coleccion)
+    if marca is not None:
+        delta = [{"$match": filtro_rango(None, marca)}] + pipeline_combinaciones(campos)
+        reporte["delta incremental"] = explicar(coleccion, delta)
+    return reporte